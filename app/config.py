@@ -2,10 +2,14 @@
 #  app/config.py
 # ===========================
 import os
+from dataclasses import replace
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 from typing import Any
 
+from app.utils.serving_state import ServingState
+
 # A classe Settings agora herda de BaseSettings.
 # Pydantic lerá automaticamente as variáveis de ambiente com o mesmo nome.
 class Settings(BaseSettings):
@@ -13,6 +17,8 @@ class Settings(BaseSettings):
     Configurações do projeto lidas a partir de variáveis de ambiente.
     """
     PROJECT_NAME: str = os.getenv("PROJECT_NAME", "Stock Prediction API - LSTM")
+    # Modo da aplicação: "full" (todas as rotas) ou "inference" (apenas predição e saúde)
+    APP_MODE: str = os.getenv("APP_MODE", "full")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "development-secret-key-change-in-production")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     HTML_CACHE_DIR: str =  os.getenv("HTML_CACHE_DIR", "./cache")
@@ -20,10 +26,97 @@ class Settings(BaseSettings):
     MODEL_REPO_ID: str =  os.getenv("MODEL_REPO_ID", "default-repo")
     MODEL_FILENAME: str =  os.getenv("MODEL_FILENAME", "lstm_model.pth")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    
-    # Objetos em memória (não são carregados de env, mas setados na inicialização)
-    MODEL: Any = None
-    SCALER: Any = None
+    # Predição em lote: número máximo de downloads simultâneos no yfinance
+    PREDICT_FETCH_CONCURRENCY: int = int(os.getenv("PREDICT_FETCH_CONCURRENCY", "16"))
+    # Micro-batching de /predict: agrupa requisições concorrentes em um único forward
+    PREDICT_BATCHING_ENABLED: bool = os.getenv("PREDICT_BATCHING_ENABLED", "true").lower() == "true"
+    PREDICT_BATCH_MAX_SIZE: int = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "32"))
+    PREDICT_BATCH_WAIT_MS: float = float(os.getenv("PREDICT_BATCH_WAIT_MS", "2"))
+    # Pools de execução fora do event loop e tempo limite (s) por etapa de /predict
+    PREDICT_FETCH_WORKERS: int = int(os.getenv("PREDICT_FETCH_WORKERS", "16"))
+    PREDICT_INFERENCE_WORKERS: int = int(os.getenv("PREDICT_INFERENCE_WORKERS", "2"))
+    PREDICT_FETCH_TIMEOUT_S: float = float(os.getenv("PREDICT_FETCH_TIMEOUT_S", "15"))
+    PREDICT_INFERENCE_TIMEOUT_S: float = float(os.getenv("PREDICT_INFERENCE_TIMEOUT_S", "5"))
+    # Cache LRU/TTL de predições por (símbolo, período, versão do modelo)
+    PREDICT_CACHE_ENABLED: bool = os.getenv("PREDICT_CACHE_ENABLED", "true").lower() == "true"
+    PREDICT_CACHE_MAX_ENTRIES: int = int(os.getenv("PREDICT_CACHE_MAX_ENTRIES", "1024"))
+    PREDICT_CACHE_TTL_S: float = float(os.getenv("PREDICT_CACHE_TTL_S", "300"))
+
+    # Backend de inferência: "torch" (padrão), "onnx" (onnxruntime em CPU) ou "numpy" (sem PyTorch)
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "torch")
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))
+    # Serve a variante int8 (quantização dinâmica) quando aprovada no gate de MAPE
+    USE_QUANTIZED_MODEL: bool = os.getenv("USE_QUANTIZED_MODEL", "false").lower() == "true"
+    # Inferência incremental: mantém o estado LSTM por símbolo e avança 1 passo por novo fechamento
+    PREDICT_STATEFUL_ENABLED: bool = os.getenv("PREDICT_STATEFUL_ENABLED", "false").lower() == "true"
+    PREDICT_STATEFUL_RESYNC_STEPS: int = int(os.getenv("PREDICT_STATEFUL_RESYNC_STEPS", "20"))
+    PREDICT_STATEFUL_MAX_SYMBOLS: int = int(os.getenv("PREDICT_STATEFUL_MAX_SYMBOLS", "1024"))
+    # Warmup: lotes sintéticos executados antes de publicar o modelo (inicialização e hot-reload)
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_BATCH_SIZES: str = os.getenv("WARMUP_BATCH_SIZES", "1,8,32")
+    WARMUP_RUNS: int = int(os.getenv("WARMUP_RUNS", "2"))
+    # Carregamento do modelo em segundo plano: a API aceita tráfego enquanto o modelo carrega
+    MODEL_BACKGROUND_LOADING: bool = os.getenv("MODEL_BACKGROUND_LOADING", "true").lower() == "true"
+    MODEL_LOADING_RETRY_AFTER_S: int = int(os.getenv("MODEL_LOADING_RETRY_AFTER_S", "5"))
+    # Pesos do bundle mapeados do arquivo (mmap): uma cópia física compartilhada entre os workers
+    MODEL_SHARED_WEIGHTS: bool = os.getenv("MODEL_SHARED_WEIGHTS", "true").lower() == "true"
+    # Registro de modelos por símbolo: bundles carregados sob demanda com residência LRU
+    MODEL_REGISTRY_ENABLED: bool = os.getenv("MODEL_REGISTRY_ENABLED", "true").lower() == "true"
+    MODEL_REGISTRY_DIR: str = os.getenv("MODEL_REGISTRY_DIR", "app/artifacts/models")
+    MODEL_REGISTRY_MAX_MODELS: int = int(os.getenv("MODEL_REGISTRY_MAX_MODELS", "8"))
+    MODEL_REGISTRY_MAX_MB: float = float(os.getenv("MODEL_REGISTRY_MAX_MB", "256"))
+    # Bundles por símbolo no HuggingFace Hub, baixados sob demanda para um cache local limitado
+    MODEL_STORE_ENABLED: bool = os.getenv("MODEL_STORE_ENABLED", "false").lower() == "true"
+    MODEL_STORE_REPO_ID: str = os.getenv("MODEL_STORE_REPO_ID", "")
+    MODEL_STORE_REVISION: str = os.getenv("MODEL_STORE_REVISION", "")
+    MODEL_STORE_PREFIX: str = os.getenv("MODEL_STORE_PREFIX", "models")
+    MODEL_STORE_CACHE_DIR: str = os.getenv("MODEL_STORE_CACHE_DIR", "app/artifacts/hub_cache")
+    MODEL_STORE_MAX_MB: float = float(os.getenv("MODEL_STORE_MAX_MB", "1024"))
+    MODEL_STORE_OFFLINE: bool = os.getenv("MODEL_STORE_OFFLINE", os.getenv("HF_HUB_OFFLINE", "0")).lower() in ("1", "true")
+    MODEL_STORE_MISS_TTL_S: float = float(os.getenv("MODEL_STORE_MISS_TTL_S", "600"))
+    # Previsões diárias pré-calculadas após o fechamento para uma lista fixa de símbolos (vazia = desligado)
+    FORECAST_WATCHLIST: str = os.getenv("FORECAST_WATCHLIST", "")
+    FORECAST_RUN_TIME: str = os.getenv("FORECAST_RUN_TIME", "16:30")
+    FORECAST_TIMEZONE: str = os.getenv("FORECAST_TIMEZONE", "America/New_York")
+    FORECAST_DB_PATH: str = os.getenv("FORECAST_DB_PATH", "app/artifacts/daily_forecasts.sqlite")
+    # Com vários workers, só um grava a tabela; os demais a releem a cada FORECAST_REFRESH_S segundos
+    FORECAST_REFRESH_S: float = float(os.getenv("FORECAST_REFRESH_S", "60"))
+    # Símbolos que falharam são tentados de novo após FORECAST_RETRY_BASE_S, dobrando até FORECAST_RETRY_MAX_S
+    FORECAST_RETRY_ATTEMPTS: int = int(os.getenv("FORECAST_RETRY_ATTEMPTS", "5"))
+    FORECAST_RETRY_BASE_S: float = float(os.getenv("FORECAST_RETRY_BASE_S", "60"))
+    FORECAST_RETRY_MAX_S: float = float(os.getenv("FORECAST_RETRY_MAX_S", "1800"))
+
+    # Objetos em memória (não são carregados de env, mas setados na inicialização).
+    # Modelo, scaler, config e versão formam um snapshot imutável trocado de uma só vez
+    # (publish_serving_state); MODEL, SCALER e MODEL_VERSION são vistas desse snapshot.
+    SERVING_STATE: Any = Field(default_factory=ServingState)
+
+    @property
+    def MODEL(self) -> Any:
+        """Modelo em serviço (campo do snapshot atual)."""
+        return self.SERVING_STATE.model
+
+    @MODEL.setter
+    def MODEL(self, value: Any) -> None:
+        self.SERVING_STATE = replace(self.SERVING_STATE, model=value)
+
+    @property
+    def SCALER(self) -> Any:
+        """Scaler do modelo em serviço (campo do snapshot atual)."""
+        return self.SERVING_STATE.scaler
+
+    @SCALER.setter
+    def SCALER(self, value: Any) -> None:
+        self.SERVING_STATE = replace(self.SERVING_STATE, scaler=value)
+
+    @property
+    def MODEL_VERSION(self) -> Any:
+        """Versão do modelo em serviço (hash dos pesos), usada nas chaves de cache."""
+        return self.SERVING_STATE.version
+
+    @MODEL_VERSION.setter
+    def MODEL_VERSION(self, value: Any) -> None:
+        self.SERVING_STATE = replace(self.SERVING_STATE, version=value)
 
 @lru_cache()
 def get_settings() -> Settings:
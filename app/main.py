@@ -4,19 +4,23 @@
 import joblib
 import os
 import joblib
-import torch
 import sys
 import os
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
+from app.utils.serving_state import ServingState, publish_serving_state
+from app.utils.warmup import warm_serving_state
+from app.utils.model_loading import get_model_loader
+from app.utils.daily_forecast import create_forecast_scheduler
+from src.resource_tracker import ResourceTracker
 from huggingface_hub import hf_hub_download
 from contextlib import asynccontextmanager
-# Importa as rotas de pacientes e auditoria
-from app.routes.audit_route import router as audit_router
-from app.routes.train_route import router as train_router
+from typing import Any, Optional
+# Rotas de predição e saúde (presentes em todos os modos)
 from app.routes.predict_route import router as predict_router
+from app.routes.health_route import router as health_router
 
 import logging
 
@@ -33,169 +37,239 @@ __model__ = None
 scaler = None
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+def load_initial_serving_state(tracker: Optional[ResourceTracker] = None) -> ServingState:
     """
-    Gerenciador de contexto para a API.
-    Carrega o modelo na inicialização e pode liberar recursos no desligamento.
+    Carrega modelo, scaler e versão do modelo para a inicialização da API.
+
+    Prefere o bundle em arquivo único; na falta dele, usa os artefatos legados
+    (lstm_model.pth ou HuggingFace, model_config.json e scaler.pkl). Nada é
+    publicado aqui: o chamador publica o snapshot completo de uma só vez.
+
+    Args:
+        tracker (ResourceTracker, opcional): Acumula a duração de cada fase
+            (bundle, weights, hf_download, backend, scaler).
+
+    Returns:
+        ServingState: Snapshot carregado (com model/scaler None no que falhar).
     """
-    # Startup
-    logger.info("=" * 80)
-    logger.info("INICIALIZANDO API DE PREDIÇÃO DE PREÇOS - TECH CHALLENGE FASE 4")
-    logger.info("=" * 80)
-    
-    environment = os.getenv("ENVIRONMENT", "development")
-    logger.info(f"Ambiente: {environment.upper()}")
-    
-    if environment == "production":
-        logger.info("URLs em Produção:")
-        logger.info("  - API Docs: /api/docs")
-        logger.info("  - Landing Page: /")
-    else:
-        logger.info("URLs em Desenvolvimento:")
-        logger.info("  - API: http://localhost:8000")
-        logger.info("  - API Docs: http://localhost:8000/docs")
-        logger.info("  - Streamlit (local opcional): http://localhost:8501")
-    
+    tracker = tracker or ResourceTracker()
+    serving_model = None
+    serving_scaler = None
+    serving_config = None
+    serving_version = None
     try:
-        # Import necessário para instanciar o modelo
         sys.path.append(os.path.abspath("src"))
-        from src.lstm_model import LSTMModel
 
         # Tenta baixar/carregar modelo do HuggingFace ou local
         # Se não existir, a API deve subir mesmo assim para permitir o treino
+        bundle = None
         try:
-            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            if __SETTINGS__.INFERENCE_BACKEND.lower() in ("onnx", "numpy"):
+                # Backends ONNX e NumPy rodam em CPU direto do bundle: o PyTorch não é importado
+                device = "cpu"
+            else:
+                import torch
+                device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
             print(f"Dispositivo de inferência selecionado: {device}")
 
-            # Carregar configuração do modelo (se existir)
-            model_config_path = "app/artifacts/model_config.json"
-            if os.path.exists(model_config_path):
-                import json
-                with open(model_config_path, 'r') as f:
-                    model_config = json.load(f)
-                print(f"Configuração do modelo carregada: {model_config}")
+            # Bundle em arquivo único (pesos + config + scaler) tem prioridade
+            from app.utils.inference_backend import load_serving_model
+            from app.utils.model_loader import load_serving_bundle
+            with tracker.stage("bundle"):
+                bundle = load_serving_bundle(device=device)
+            if bundle is not None:
+                serving_scaler = bundle.scaler
+                with tracker.stage("backend"):
+                    serving_model = load_serving_model(bundle.model, version=bundle.version)
+                serving_config = bundle.config
+                serving_version = bundle.version
+                print(f"Modelo e scaler carregados do bundle {bundle.path} (versão {bundle.version})")
             else:
-                # Fallback para configuração padrão
-                model_config = {
-                    "input_size": 1,
-                    "hidden_layer_size": 16,
-                    "output_size": 1,
-                    "num_layers": 1,
-                    "dropout": 0.3
-                }
-                print("Usando configuração padrão do modelo")
+                # Carregar configuração do modelo (se existir)
+                model_config_path = "app/artifacts/model_config.json"
+                if os.path.exists(model_config_path):
+                    import json
+                    with open(model_config_path, 'r') as f:
+                        model_config = json.load(f)
+                    print(f"Configuração do modelo carregada: {model_config}")
+                else:
+                    # Fallback para configuração padrão
+                    model_config = {
+                        "input_size": 1,
+                        "hidden_layer_size": 16,
+                        "output_size": 1,
+                        "num_layers": 1,
+                        "dropout": 0.3
+                    }
+                    print("Usando configuração padrão do modelo")
             
-            # Instancia o modelo com a configuração correta
-            model = LSTMModel(
-                input_size=model_config["input_size"],
-                hidden_layer_size=model_config["hidden_layer_size"],
-                output_size=model_config["output_size"],
-                num_layers=model_config["num_layers"],
-                dropout=model_config["dropout"]
-            )
-            model.to(device)
+                # Artefatos legados (.pth) exigem o PyTorch
+                import torch
+                from src.lstm_model import build_model
+
+                # Instancia o modelo com a configuração correta (LSTM único ou ensemble)
+                model = build_model(model_config)
+                model.to(device)
             
-            # Primeiro tenta local
-            local_model_path = "app/artifacts/lstm_model.pth"
+                # Primeiro tenta local
+                local_model_path = "app/artifacts/lstm_model.pth"
             
-            state_dict = None
-            if os.path.exists(local_model_path):
-                 print(f"Carregando modelo local de {local_model_path}...")
-                 state_dict = torch.load(local_model_path, map_location=device)
-            else:
-                # Fallback para HuggingFace se configurado
-                 print("Modelo local não encontrado. Tentando HuggingFace...")
-                 model_path = hf_hub_download(repo_id=__SETTINGS__.MODEL_REPO_ID, filename=__SETTINGS__.MODEL_FILENAME)
-
-                 loaded = joblib.load(model_path)
-                 if isinstance(loaded, dict):
-                     state_dict = loaded
-                 else:
-                     model = loaded
-                     model.to(device)
+                state_dict = None
+                weights_path = local_model_path
+                if os.path.exists(local_model_path):
+                     print(f"Carregando modelo local de {local_model_path}...")
+                     with tracker.stage("weights"):
+                         state_dict = torch.load(local_model_path, map_location=device)
+                else:
+                    # Fallback para HuggingFace se configurado
+                     print("Modelo local não encontrado. Tentando HuggingFace...")
+                     with tracker.stage("hf_download"):
+                         model_path = hf_hub_download(repo_id=__SETTINGS__.MODEL_REPO_ID, filename=__SETTINGS__.MODEL_FILENAME)
+                     weights_path = model_path
+
+                     with tracker.stage("weights"):
+                         loaded = joblib.load(model_path)
+                     if isinstance(loaded, dict):
+                         state_dict = loaded
+                     else:
+                         model = loaded
+                         model.to(device)
             
-            if state_dict:
-                try:
-                    model.load_state_dict(state_dict)
-                except RuntimeError as re:
-                    print(f"ERRO DE COMPATIBILIDADE: O modelo salvo não corresponde à arquitetura atual ({re}). \n"
-                          "Isso é esperado se você mudou a arquitetura (ex: adicionou camadas). \n"
-                          "O modelo foi inicializado com pesos aleatórios. TREINE O MODELO NOVAMENTE VIA /train.")
+                if state_dict:
+                    try:
+                        model.load_state_dict(state_dict)
+                    except RuntimeError as re:
+                        print(f"ERRO DE COMPATIBILIDADE: O modelo salvo não corresponde à arquitetura atual ({re}). \n"
+                              "Isso é esperado se você mudou a arquitetura (ex: adicionou camadas). \n"
+                              "O modelo foi inicializado com pesos aleatórios. TREINE O MODELO NOVAMENTE VIA /train.")
             
-            model.eval() # Coloca em modo de inferência
-            __SETTINGS__.MODEL = model
-            print("Modelo carregado com sucesso!")
+                model.eval() # Coloca em modo de inferência
+                # Versão do modelo (hash dos pesos) usada nas chaves do cache de predições
+                from app.utils.prediction_cache import compute_model_version
+                serving_version = compute_model_version(weights_path)
+                # Backend de inferência configurado (torch, onnxruntime ou NumPy)
+                with tracker.stage("backend"):
+                    serving_model = load_serving_model(model, version=serving_version)
+                serving_config = model_config
+                print("Modelo carregado com sucesso!")
         except Exception as e:
             print(f"Aviso: Não foi possível carregar o modelo ({e}). A API funcionará, mas /predict retornará erro até que o modelo seja treinado.")
-            __SETTINGS__.MODEL = None
+            serving_model = None
+            serving_version = None
 
-        # Tenta carregar o scaler localmente
+        # Tenta carregar o scaler localmente (se não veio do bundle)
         scaler_path = "app/artifacts/scaler.pkl"
-        if os.path.exists(scaler_path):
-            __SETTINGS__.SCALER = joblib.load(scaler_path)
+        if bundle is not None:
+            print("Scaler carregado do bundle (sem sklearn).")
+        elif os.path.exists(scaler_path):
+            with tracker.stage("scaler"):
+                serving_scaler = joblib.load(scaler_path)
             print("Scaler carregado com sucesso!")
         else:
             print(f"Aviso: Scaler não encontrado em {scaler_path}. Predições podem falhar.")
-            __SETTINGS__.SCALER = None
 
     except Exception as e:
         print(f"Erro crítico no lifespan: {e}")
-        __SETTINGS__.MODEL = None
-        __SETTINGS__.SCALER = None
+        return ServingState()
+
+    return ServingState(model=serving_model, scaler=serving_scaler, config=serving_config, version=serving_version)
+
+
+def load_warm_serving_state(tracker: Optional[ResourceTracker] = None) -> ServingState:
+    """
+    Carrega o snapshot inicial e o aquece antes da publicação.
+
+    Args:
+        tracker (ResourceTracker, opcional): Acumula a duração de cada fase
+            do carregamento e do warmup.
+
+    Returns:
+        ServingState: Snapshot carregado e aquecido.
+    """
+    tracker = tracker or ResourceTracker()
+    state = load_initial_serving_state(tracker)
+    with tracker.stage("warmup"):
+        return warm_serving_state(state)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Gerenciador de contexto para a API.
+    Carrega o modelo na inicialização e pode liberar recursos no desligamento.
+    """
+    # Startup
+    logger.info("=" * 80)
+    logger.info("INICIALIZANDO API DE PREDIÇÃO DE PREÇOS - TECH CHALLENGE FASE 4")
+    logger.info("=" * 80)
+    
+    environment = os.getenv("ENVIRONMENT", "development")
+    logger.info(f"Ambiente: {environment.upper()}")
+    
+    if environment == "production":
+        logger.info("URLs em Produção:")
+        logger.info("  - API Docs: /api/docs")
+        logger.info("  - Landing Page: /")
+    else:
+        logger.info("URLs em Desenvolvimento:")
+        logger.info("  - API: http://localhost:8000")
+        logger.info("  - API Docs: http://localhost:8000/docs")
+        logger.info("  - Streamlit (local opcional): http://localhost:8501")
+    
+    # O modelo só é publicado (e /ready só responde 200) depois do warmup.
+    # Em segundo plano, a API aceita tráfego já durante o carregamento:
+    # /predict responde 503 com Retry-After até o snapshot ser publicado.
+    if __SETTINGS__.MODEL_BACKGROUND_LOADING:
+        get_model_loader().start(__SETTINGS__, load_warm_serving_state)
+        logger.info("Carregamento do modelo iniciado em segundo plano.")
+    else:
+        publish_serving_state(__SETTINGS__, load_warm_serving_state())
+
+    # Previsões diárias da lista de acompanhamento, calculadas após o fechamento
+    forecast_scheduler = create_forecast_scheduler()
+    if forecast_scheduler is not None:
+        forecast_scheduler.start()
+        logger.info(f"Previsões diárias agendadas para {forecast_scheduler.symbols} às {forecast_scheduler.run_time}.")
     
     yield
+    get_model_loader().stop()
+    if forecast_scheduler is not None:
+        forecast_scheduler.stop()
+    from app.utils.executors import shutdown_executors
+    shutdown_executors()
     print("API desligada. Recursos liberados.")
 
 
-app = FastAPI(
-    title=__SETTINGS__.PROJECT_NAME,
-    description=(
-        "## Tech Challenge Fase 4 - Predição de Preços de Ações com LSTM\n\n"
-        "Bem-vindo ao desafio! Você aprendeu sobre aprendizado profundo com redes neurais "
-        "Long Short Term Memory (LSTM) e chegou o momento de colocar isso em prática.\n\n"
-        "### Objetivo\n"
-        "Criar um modelo preditivo de redes neurais LSTM para predizer o valor de fechamento "
-        "da bolsa de valores de uma empresa à sua escolha. Este projeto abrange toda a pipeline "
-        "de desenvolvimento, desde a criação do modelo até o deploy em API.\n\n"
-        "### Requisitos do Tech Challenge\n\n"
-        "1. **Coleta e Pré-processamento dos Dados**\n"
-        "   - Utiliza dataset de preços históricos de ações (Yahoo Finance via yfinance)\n"
-        "   - Normalização e tratamento dos dados\n\n"
-        "2. **Desenvolvimento do Modelo LSTM**\n"
-        "   - Arquitetura com camada LSTM e camada linear\n"
-        "   - Treinamento com otimização Adam\n"
-        "   - Validação e avaliação com métricas (MAE, RMSE, MAPE)\n\n"
-        "3. **API REST para Predições**\n"
-        "   - Endpoints para predição de preços de ações\n"
-        "   - Autenticação JWT para segurança\n"
-        "   - Documentação interativa com Swagger UI\n\n"
-        "### Tecnologias\n"
-        "- **FastAPI**: Framework web moderno\n"
-        "- **PyTorch**: Implementação do modelo LSTM\n"
-        "- **MLflow**: Rastreamento de experimentos\n"
-        "- **yfinance**: Coleta de dados de ações\n"
-    ),
-    version="1.0.0",
-    root_path="/api" if os.getenv("ENVIRONMENT") == "production" else "",
-    lifespan=lifespan
+APP_DESCRIPTION = (
+    "## Tech Challenge Fase 4 - Predição de Preços de Ações com LSTM\n\n"
+    "Bem-vindo ao desafio! Você aprendeu sobre aprendizado profundo com redes neurais "
+    "Long Short Term Memory (LSTM) e chegou o momento de colocar isso em prática.\n\n"
+    "### Objetivo\n"
+    "Criar um modelo preditivo de redes neurais LSTM para predizer o valor de fechamento "
+    "da bolsa de valores de uma empresa à sua escolha. Este projeto abrange toda a pipeline "
+    "de desenvolvimento, desde a criação do modelo até o deploy em API.\n\n"
+    "### Requisitos do Tech Challenge\n\n"
+    "1. **Coleta e Pré-processamento dos Dados**\n"
+    "   - Utiliza dataset de preços históricos de ações (Yahoo Finance via yfinance)\n"
+    "   - Normalização e tratamento dos dados\n\n"
+    "2. **Desenvolvimento do Modelo LSTM**\n"
+    "   - Arquitetura com camada LSTM e camada linear\n"
+    "   - Treinamento com otimização Adam\n"
+    "   - Validação e avaliação com métricas (MAE, RMSE, MAPE)\n\n"
+    "3. **API REST para Predições**\n"
+    "   - Endpoints para predição de preços de ações\n"
+    "   - Autenticação JWT para segurança\n"
+    "   - Documentação interativa com Swagger UI\n\n"
+    "### Tecnologias\n"
+    "- **FastAPI**: Framework web moderno\n"
+    "- **PyTorch**: Implementação do modelo LSTM\n"
+    "- **MLflow**: Rastreamento de experimentos\n"
+    "- **yfinance**: Coleta de dados de ações\n"
 )
 
+APP_MODES = ("full", "inference")
 
-# Configurar CORS (mantido como estava)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(audit_router)
-app.include_router(train_router)
-app.include_router(predict_router)
 
-@app.get("/", tags=["Home"])
 async def root():
     """
     Endpoint inicial da API de Predição de Preços de Ações.
@@ -209,3 +283,73 @@ async def root():
         "documentação": "/docs",
         "versão": "1.0.0"
     }
+
+
+def create_app(mode: Optional[str] = None) -> FastAPI:
+    """
+    Cria a aplicação FastAPI.
+
+    No modo "full" a API expõe todas as rotas (auditoria, treino, predição e
+    saúde). No modo "inference", usado pelas réplicas que só servem
+    predições, apenas /predict, /health, /ready e a raiz são montadas: os
+    módulos de treino e auditoria nem são importados, reduzindo a memória
+    residente de cada worker.
+
+    Uso com uvicorn (sem argumentos, o modo vem de APP_MODE):
+        APP_MODE=inference uvicorn app.main:create_app --factory --workers 4
+
+    Args:
+        mode (str, opcional): "full" ou "inference". Padrão: APP_MODE.
+
+    Returns:
+        FastAPI: Aplicação configurada.
+
+    Raises:
+        ValueError: Se o modo não for suportado.
+    """
+    mode = (mode or __SETTINGS__.APP_MODE).lower()
+    if mode not in APP_MODES:
+        raise ValueError(f"Modo de aplicação inválido: {mode}. Use um de {APP_MODES}.")
+
+    application = FastAPI(
+        title=__SETTINGS__.PROJECT_NAME,
+        description=APP_DESCRIPTION,
+        version="1.0.0",
+        root_path="/api" if os.getenv("ENVIRONMENT") == "production" else "",
+        lifespan=lifespan
+    )
+    application.state.mode = mode
+
+    # Configurar CORS (mantido como estava)
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    if mode == "full":
+        # Importados apenas no modo completo: réplicas de inferência não carregam treino nem auditoria
+        from app.routes.audit_route import router as audit_router
+        from app.routes.train_route import router as train_router
+        application.include_router(audit_router)
+        application.include_router(train_router)
+    application.include_router(predict_router)
+    application.include_router(health_router)
+    application.add_api_route("/", root, methods=["GET"], tags=["Home"])
+    return application
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Cria `app` (modo definido por APP_MODE) no primeiro acesso.
+
+    Importar `create_app` ou `lifespan` não monta a aplicação; `uvicorn
+    app.main:app` e `from app.main import app` montam uma única vez.
+    """
+    if name == "app":
+        application = create_app()
+        globals()["app"] = application
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.config import get_settings
+from app.utils.serving_state import current_serving_state
+from app.utils.model_loading import get_model_loader
+from src.resource_tracker import get_memory_usage_mb
+from datetime import datetime
+
+router = APIRouter(
+    tags=["Saúde"]
+)
+
+__SETTINGS__ = get_settings()
+
+
+@router.get("/health", status_code=status.HTTP_200_OK)
+async def health():
+    """
+    Liveness: indica apenas que o processo da API está respondendo.
+
+    Sempre retorna 200, mesmo sem modelo carregado (a API continua aceitando
+    /train). Para saber se /predict pode ser atendido, use /ready.
+    """
+    state = current_serving_state(__SETTINGS__)
+    return {
+        "status": "ok",
+        "model_loaded": state.model is not None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/ready", status_code=status.HTTP_200_OK)
+async def ready():
+    """
+    Readiness: indica se o modelo está carregado, aquecido e pronto para /predict.
+
+    Retorna 503 enquanto não houver modelo e scaler publicados. O modelo só é
+    publicado depois do warmup, na inicialização e no hot-reload. Durante o
+    carregamento em segundo plano o status é "loading" e o campo `loading`
+    traz o tempo decorrido e a duração de cada fase; se o carregamento
+    falhou, o status é "failed" e `loading.error` traz o motivo. O campo
+    `memory` mostra RSS e PSS deste worker (o PSS reflete os pesos
+    compartilhados via mmap).
+    """
+    state = current_serving_state(__SETTINGS__)
+    loader = get_model_loader()
+    if state.ready:
+        readiness = "ready"
+    elif loader.loading:
+        readiness = "loading"
+    elif loader.status == "failed":
+        readiness = "failed"
+    else:
+        readiness = "not_ready"
+    body = {
+        "status": readiness,
+        "model_loaded": state.model is not None,
+        "scaler_loaded": state.scaler is not None,
+        "model_version": state.version,
+        "warmup": state.warmup,
+        "loading": loader.stats(),
+        "memory": get_memory_usage_mb(),
+        "timestamp": datetime.now().isoformat()
+    }
+    if not state.ready:
+        headers = {"Retry-After": str(get_settings().MODEL_LOADING_RETRY_AFTER_S)} if loader.loading else None
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body, headers=headers)
+    return body
@@ -1,8 +1,23 @@
 from fastapi import APIRouter, HTTPException, status
-from app.schemas import PredictRequest, PredictResponse
+from app.schemas import (
+    PredictRequest, PredictResponse, BatchPredictRequest, BatchPredictResponse,
+    HorizonPredictRequest, HorizonPredictResponse
+)
 from app.config import get_settings
+from app.utils.inference_batcher import get_inference_batcher
+from app.utils.executors import run_stage, StageTimeoutError
+from app.utils.prediction_cache import get_prediction_cache, make_prediction_key
+from app.utils.single_flight import SingleFlight
+from app.utils.inference_backend import InferenceBackend
+from app.utils.stateful_inference import get_stateful_predictor
+from app.utils.model_registry import get_model_registry
+from app.utils.model_store import get_model_store
+from app.utils.model_loading import get_model_loader
+from app.utils.daily_forecast import get_forecast_scheduler
+from app.utils.serving_state import current_serving_state
 from datetime import datetime
-import torch
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
 import numpy as np
 
 router = APIRouter(
@@ -11,99 +26,337 @@ router = APIRouter(
 
 __SETTINGS__ = get_settings()
 
-@router.post("/predict", response_model=PredictResponse, status_code=status.HTTP_200_OK)
-async def predict_stock_price(request: PredictRequest):
+SEQUENCE_LENGTH = 60
+
+# Downloads concorrentes do mesmo (símbolo, período) compartilham uma única busca
+FETCH_FLIGHTS = SingleFlight()
+
+
+def fetch_recent_prices(symbol: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[float]:
     """
-    Prevê o próximo preço de fechamento com base nos últimos 60 dias.
+    Busca os últimos 60 preços de fechamento de um símbolo no Yahoo Finance.
+
+    Args:
+        symbol (str): Símbolo da ação (ex: AAPL).
+        start_date (str, opcional): Data inicial (YYYY-MM-DD).
+        end_date (str, opcional): Data final (YYYY-MM-DD).
+
+    Returns:
+        List[float]: Os 60 fechamentos mais recentes do período.
+
+    Raises:
+        HTTPException: 400 se não houver dados suficientes no período.
+    """
+    import yfinance as yf
+    print(f"Buscando dados automáticos para: {symbol}")
+
+    # Definição do período de busca
+    if start_date and end_date:
+        # Se ambas as datas fornecidas, usa intervalo explícito
+        # Adicionamos uma margem de segurança no start_date se o usuário não der
+        # Mas aqui confiamos que o usuário quer este intervalo.
+        # Para garantir 60 dias, o start_date precisaria ser bem anterior ao end_date.
+        # O ideal é usar o end_date como referência e pegar para trás.
+        # Se o usuário passar start/end fixos, pode não ter 60 dias.
+        # ESTRETÉGIA: Usar download com start/end fornecidos.
+        data = yf.download(symbol, start=start_date, end=end_date, progress=False)
+    elif end_date:
+        # Se só end_date, pegamos um periodo longo para trás
+        import pandas as pd
+        end_dt = pd.to_datetime(end_date)
+        start_dt = end_dt - pd.Timedelta(days=150) # ~5 meses para garantir 60 dias úteis
+        data = yf.download(symbol, start=start_dt, end=end_dt, progress=False)
+    else:
+        # Default: últimos 6 meses até hoje
+        data = yf.download(symbol, period="6mo", progress=False)
+
+    if len(data) < SEQUENCE_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Não há dados históricos suficientes para {symbol} no período solicitado. Encontrado: {len(data)}, Necessário: 60."
+        )
+
+    # Pega os últimos 60 fechamentos
+    # O yfinance pode retornar MultiIndex ou Series, garantindo pegar 'Close'
+    if 'Close' in data.columns:
+        prices_data = data['Close'].iloc[-SEQUENCE_LENGTH:].values.flatten().tolist()
+    else:
+        # Fallback se estrutura for diferente (ex: apenas series)
+        prices_data = data.iloc[-SEQUENCE_LENGTH:].values.flatten().tolist()
+
+    print(f"Dados recuperados: {len(prices_data)} registros.")
+    return prices_data
+
+
+async def fetch_recent_prices_shared(symbol: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[float]:
+    """
+    Busca os preços recentes, reaproveitando uma busca idêntica em andamento.
+
+    Args:
+        symbol (str): Símbolo da ação (ex: AAPL).
+        start_date (str, opcional): Data inicial (YYYY-MM-DD).
+        end_date (str, opcional): Data final (YYYY-MM-DD).
+
+    Returns:
+        List[float]: Os 60 fechamentos mais recentes do período.
+    """
+    key = (symbol.strip().upper(), start_date, end_date)
+    return await FETCH_FLIGHTS.do(
+        key, lambda: run_stage("fetch", fetch_recent_prices, symbol, start_date, end_date)
+    )
+
+
+def _normalize_windows(scaler: Any, windows: List[List[float]]) -> np.ndarray:
+    """
+    Normaliza as janelas de uma vez (o scaler é de uma única feature).
+
+    Args:
+        scaler (Any): Scaler usado no treino (MinMaxScaler).
+        windows (List[List[float]]): Janelas com 60 preços cada.
+
+    Returns:
+        np.ndarray: Array float32 com shape (N, 60, 1).
+    """
+    input_data = np.array(windows, dtype=np.float64).reshape(-1, 1)
+    normalized_data = np.asarray(scaler.transform(input_data), dtype=np.float32)
+    return normalized_data.reshape(len(windows), SEQUENCE_LENGTH, 1)
+
+
+def _model_device(model: Any) -> Any:
+    """
+    Identifica o dispositivo do modelo.
+
+    Modelos quantizados não expõem parâmetros float e rodam em CPU.
+    """
+    import torch
+
+    first_param = next(model.parameters(), None)
+    return first_param.device if first_param is not None else torch.device("cpu")
+
+
+def _forward_normalized(model: Any, normalized_data: np.ndarray) -> np.ndarray:
+    """
+    Executa um forward sobre janelas já normalizadas.
+
+    Args:
+        model (Any): Modelo LSTM carregado ou backend de inferência (InferenceBackend).
+        normalized_data (np.ndarray): Janelas com shape (N, 60, 1) em float32.
+
+    Returns:
+        np.ndarray: Predições normalizadas, uma por janela.
     """
-    model = __SETTINGS__.MODEL
-    scaler = getattr(__SETTINGS__, "SCALER", None)
-    
+    if isinstance(model, InferenceBackend):
+        # Backends sem PyTorch (ex: onnxruntime) operam diretamente sobre NumPy
+        return np.asarray(model.predict(normalized_data), dtype=np.float32).reshape(-1)
+
+    # PyTorch só é importado quando o modelo em serviço é um nn.Module
+    import torch
+
+    # Cria tensor (Batch size N, Sequence Length 60, Features 1)
+    input_tensor = torch.from_numpy(np.ascontiguousarray(normalized_data)).to(_model_device(model))
+
+    # Predição
+    model.eval()
+    with torch.no_grad():
+        return model(input_tensor).cpu().numpy().reshape(-1)
+
+
+def predict_windows(model: Any, scaler: Any, windows: List[List[float]]) -> np.ndarray:
+    """
+    Executa a predição de várias janelas em um único forward do modelo.
+
+    Args:
+        model (Any): Modelo LSTM carregado ou backend de inferência (InferenceBackend).
+        scaler (Any): Scaler usado no treino (MinMaxScaler).
+        windows (List[List[float]]): Janelas com 60 preços cada.
+
+    Returns:
+        np.ndarray: Preços previstos (desnormalizados), um por janela.
+    """
+    predicted_scaled = _forward_normalized(model, _normalize_windows(scaler, windows))
+
+    # Desnormaliza
+    predicted = scaler.inverse_transform(predicted_scaled.reshape(-1, 1))
+    return np.asarray(predicted, dtype=np.float64).reshape(-1)
+
+
+def predict_horizon_windows(model: Any, scaler: Any, windows: List[List[float]], horizon: int) -> np.ndarray:
+    """
+    Prevê recursivamente os próximos `horizon` fechamentos de cada janela.
+
+    A cada passo a janela desliza: sai o dia mais antigo e entra a predição
+    anterior, de modo que o modelo sempre vê 60 passos, como no treino. A
+    semântica é a mesma para todos os backends (PyTorch, onnxruntime, NumPy)
+    e para ensembles.
+
+    Args:
+        model (Any): Modelo LSTM carregado ou backend de inferência (InferenceBackend).
+        scaler (Any): Scaler usado no treino (MinMaxScaler).
+        windows (List[List[float]]): Janelas com 60 preços cada.
+        horizon (int): Número de passos a prever.
+
+    Returns:
+        np.ndarray: Preços previstos (desnormalizados) com shape (N, horizon).
+    """
+    window = _normalize_windows(scaler, windows)
+    steps = []
+    for _ in range(horizon):
+        prediction = _forward_normalized(model, window).reshape(-1, 1)
+        steps.append(prediction)
+        window = np.concatenate([window[:, 1:], prediction[:, :, None]], axis=1)
+    predicted_scaled = np.concatenate(steps, axis=1)
+
+    predicted = scaler.inverse_transform(predicted_scaled.reshape(-1, 1))
+    return np.asarray(predicted, dtype=np.float64).reshape(len(windows), horizon)
+
+
+def resolve_serving_model(symbol: Optional[str]) -> Tuple[Any, Any, Hashable]:
+    """
+    Escolhe o modelo que atende um símbolo.
+
+    Símbolos com bundle próprio usam o modelo do registro por símbolo; os
+    demais (e janelas manuais) usam o snapshot do modelo global.
+
+    Args:
+        symbol (str, opcional): Símbolo da requisição.
+
+    Returns:
+        Tuple[Any, Any, Hashable]: Modelo, scaler e versão do modelo.
+    """
+    registry = get_model_registry() if symbol else None
+    if registry is not None:
+        entry = registry.get(symbol)
+        if entry is not None:
+            return entry.model, entry.scaler, entry.version
+    # Uma única leitura do snapshot: modelo, scaler e versão sempre do mesmo carregamento
+    state = current_serving_state(__SETTINGS__)
+    return state.model, state.scaler, state.version or id(state.model)
+
+
+async def resolve_serving_model_async(symbol: Optional[str]) -> Tuple[Any, Any, Hashable]:
+    """
+    Versão de `resolve_serving_model` para os handlers assíncronos.
+
+    No primeiro uso de um símbolo o registro lê o bundle do disco; a busca roda
+    no pool de I/O para não bloquear o event loop. Sem registro, o snapshot é
+    lido no próprio loop.
+
+    Args:
+        symbol (str, opcional): Símbolo da requisição.
+
+    Returns:
+        Tuple[Any, Any, Hashable]: Modelo, scaler e versão do modelo.
+
+    Raises:
+        HTTPException: 504 se o carregamento exceder o tempo limite.
+    """
+    if not symbol or get_model_registry() is None:
+        return resolve_serving_model(symbol)
+    try:
+        return await run_stage("fetch", resolve_serving_model, symbol)
+    except StageTimeoutError as te:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(te)
+        )
+
+
+def _check_model_loaded(model: Any, scaler: Any) -> None:
+    """
+    Garante que modelo e scaler estão disponíveis para predição.
+
+    Raises:
+        HTTPException: 503 se o modelo ou o scaler não estiverem carregados
+            (com Retry-After enquanto o carregamento em segundo plano estiver em andamento).
+    """
+    if (model is None or scaler is None) and get_model_loader().loading:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Modelo em carregamento. Tente novamente em instantes.",
+            headers={"Retry-After": str(get_settings().MODEL_LOADING_RETRY_AFTER_S)}
+        )
+
     if model is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Modelo ainda não foi carregado. Tente novamente mais tarde."
         )
-    
+
     if scaler is None:
          raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Scaler de normalização não está disponível. Realize o treinamento primeiro."
         )
 
+
+@router.post("/predict", response_model=PredictResponse, status_code=status.HTTP_200_OK)
+async def predict_stock_price(request: PredictRequest):
+    """
+    Prevê o próximo preço de fechamento com base nos últimos 60 dias.
+
+    A busca de dados e a inferência rodam em pools de threads limitados, com
+    tempo limite por etapa (504 se excedido), mantendo o event loop livre.
+    Predições por símbolo ficam em cache por (símbolo, período, versão do
+    modelo) até expirar o TTL ou um novo modelo ser carregado. Com
+    PREDICT_STATEFUL_ENABLED, o estado LSTM do símbolo avança um passo por
+    novo fechamento, com ressincronização periódica pela janela completa.
+    Símbolos com modelo próprio (registro por símbolo) são atendidos por ele.
+    Pedidos do próximo fechamento (sem datas) de símbolos da FORECAST_WATCHLIST
+    são servidos da tabela de previsões diárias, calculada após o fechamento.
+    """
+    model, scaler, model_version = await resolve_serving_model_async(request.symbol)
+    _check_model_loaded(model, scaler)
+
+    forecasts = get_forecast_scheduler() if request.symbol and not request.start_date and not request.end_date else None
+    if forecasts is not None:
+        precomputed_price = forecasts.lookup(request.symbol, model_version)
+        if precomputed_price is not None:
+            return {
+                "predicted_price": precomputed_price,
+                "timestamp": datetime.now().isoformat()
+            }
+
+    cache = get_prediction_cache() if request.symbol else None
+    cache_key = None
+    if cache is not None:
+        cache_key = make_prediction_key(request.symbol, request.start_date, request.end_date, model_version)
+        cached_price = cache.get(cache_key)
+        if cached_price is not None:
+            return {
+                "predicted_price": cached_price,
+                "timestamp": datetime.now().isoformat()
+            }
+
     try:
         # Lógica Híbrida: Busca automática ou Uso de dados manuais
         prices_data = []
 
         if request.symbol:
-            import yfinance as yf
-            print(f"Buscando dados automáticos para: {request.symbol}")
-            
-            # Definição do período de busca
-            if request.start_date and request.end_date:
-                # Se ambas as datas fornecidas, usa intervalo explícito
-                # Adicionamos uma margem de segurança no start_date se o usuário não der
-                # Mas aqui confiamos que o usuário quer este intervalo.
-                # Para garantir 60 dias, o start_date precisaria ser bem anterior ao end_date.
-                # O ideal é usar o end_date como referência e pegar para trás.
-                # Se o usuário passar start/end fixos, pode não ter 60 dias.
-                # ESTRETÉGIA: Usar download com start/end fornecidos.
-                data = yf.download(request.symbol, start=request.start_date, end=request.end_date, progress=False)
-            elif request.end_date:
-                # Se só end_date, pegamos um periodo longo para trás
-                import pandas as pd
-                end_dt = pd.to_datetime(request.end_date)
-                start_dt = end_dt - pd.Timedelta(days=150) # ~5 meses para garantir 60 dias úteis
-                data = yf.download(request.symbol, start=start_dt, end=end_dt, progress=False)
-            else:
-                 # Default: últimos 6 meses até hoje
-                 data = yf.download(request.symbol, period="6mo", progress=False)
-            
-            if len(data) < 60:
-                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Não há dados históricos suficientes para {request.symbol} no período solicitado. Encontrado: {len(data)}, Necessário: 60."
-                )
-            
-            # Pega os últimos 60 fechamentos
-            # O yfinance pode retornar MultiIndex ou Series, garantindo pegar 'Close'
-            if 'Close' in data.columns:
-                prices_data = data['Close'].iloc[-60:].values.flatten().tolist()
-            else:
-                 # Fallback se estrutura for diferente (ex: apenas series)
-                 prices_data = data.iloc[-60:].values.flatten().tolist()
-                 
-            print(f"Dados recuperados: {len(prices_data)} registros.")
-
+            prices_data = await fetch_recent_prices_shared(request.symbol, request.start_date, request.end_date)
         elif request.last_60_days_prices:
             prices_data = request.last_60_days_prices
-        
+
         # Garante que temos dados
-        if not prices_data or len(prices_data) != 60:
+        if not prices_data or len(prices_data) != SEQUENCE_LENGTH:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Dados de entrada inválidos. Esperados 60 preços, obtidos {len(prices_data)}."
             )
 
-        # Prepara os dados
-        input_data = np.array(prices_data).reshape(-1, 1)
-        
-        # Normaliza
-        normalized_data = scaler.transform(input_data)
-        
-        # Cria tensor (Batch size 1, Sequence Length 60, Features 1)
-        # Identifica dispositivo do modelo
-        device = next(model.parameters()).device
-        input_tensor = torch.FloatTensor(normalized_data).view(1, 60, 1).to(device)
-        
-        # Predição
-        model.eval()
-        with torch.no_grad():
-            predicted_scaled = model(input_tensor)
-            
-        # Desnormaliza (move para CPU antes de converter para numpy)
-        predicted_price = scaler.inverse_transform(predicted_scaled.cpu().numpy())[0][0]
-        
+        # Modo incremental: avança o estado LSTM do símbolo em vez de reprocessar 60 dias
+        stateful = get_stateful_predictor() if request.symbol else None
+        # Com micro-batching, requisições concorrentes compartilham um único forward
+        batcher = get_inference_batcher(predict_windows)
+        if stateful is not None and stateful.supports(model):
+            predicted_price = await run_stage("inference", stateful.predict, request.symbol.strip().upper(), prices_data, model, scaler)
+        elif batcher is not None:
+            predicted_price = await batcher.submit(model, scaler, prices_data)
+        else:
+            predicted_price = (await run_stage("inference", predict_windows, model, scaler, [prices_data]))[0]
+
+        if cache_key is not None:
+            cache.set(cache_key, float(predicted_price))
+
         return {
             "predicted_price": float(predicted_price),
             "timestamp": datetime.now().isoformat()
@@ -111,9 +364,203 @@ async def predict_stock_price(request: PredictRequest):
 
     except HTTPException as he:
         raise he
+    except StageTimeoutError as te:
+        print(f"Timeout na predição: {te}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(te)
+        )
     except Exception as e:
         print(f"Erro na predição: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro interno ao processar predição: {str(e)}"
         )
+
+
+@router.get("/predict/cache/stats", status_code=status.HTTP_200_OK)
+async def get_prediction_cache_stats():
+    """
+    Retorna as estatísticas do cache de predições (tamanho, acertos, taxa de acerto).
+    """
+    cache = get_prediction_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/predict/models/stats", status_code=status.HTTP_200_OK)
+async def get_model_registry_stats():
+    """
+    Retorna as estatísticas do registro de modelos por símbolo (residentes, memória, despejos)
+    e do cache de bundles do HuggingFace Hub, se habilitado.
+    """
+    registry = get_model_registry()
+    if registry is None:
+        return {"enabled": False}
+    store = get_model_store()
+    return {"enabled": True, **registry.stats(), "hub_store": store.stats() if store is not None else None}
+
+
+@router.get("/predict/forecasts", status_code=status.HTTP_200_OK)
+async def get_daily_forecasts():
+    """
+    Retorna a tabela de previsões diárias: última previsão de cada símbolo da
+    lista de acompanhamento, pregão atual e resultado da última execução do job.
+    """
+    scheduler = get_forecast_scheduler()
+    if scheduler is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "session": scheduler.current_session().isoformat(),
+        "forecasts": scheduler.table.latest(),
+        "last_run": scheduler.last_report,
+        **scheduler.table.stats()
+    }
+
+
+async def _collect_batch_windows(request: BatchPredictRequest) -> Tuple[List[Dict[str, Any]], List[Optional[List[float]]]]:
+    """
+    Busca os símbolos em paralelo e valida as janelas manuais de um lote.
+
+    Args:
+        request (BatchPredictRequest): Requisição com símbolos e/ou janelas.
+
+    Returns:
+        Tuple: Itens de resposta (index, symbol, error) e a janela de cada item
+            (None quando o item falhou).
+    """
+    symbols = request.symbols or []
+    items = [{"index": i, "symbol": symbol, "error": None} for i, symbol in enumerate(symbols)]
+    items += [{"index": len(symbols) + i, "symbol": None, "error": None} for i in range(len(request.windows or []))]
+    windows: List[Optional[List[float]]] = [None] * len(items)
+
+    # 1. Busca concorrente dos dados de cada símbolo
+    semaphore = asyncio.Semaphore(max(1, __SETTINGS__.PREDICT_FETCH_CONCURRENCY))
+
+    async def fetch(symbol: str) -> List[float]:
+        async with semaphore:
+            return await fetch_recent_prices_shared(symbol, request.start_date, request.end_date)
+
+    fetched = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+    for i, outcome in enumerate(fetched):
+        if isinstance(outcome, HTTPException):
+            items[i]["error"] = outcome.detail
+        elif isinstance(outcome, Exception):
+            items[i]["error"] = f"Erro ao buscar dados: {outcome}"
+        else:
+            windows[i] = outcome
+
+    # 2. Validação das janelas manuais
+    for offset, window in enumerate(request.windows or []):
+        i = len(symbols) + offset
+        if len(window) != SEQUENCE_LENGTH:
+            items[i]["error"] = f"Dados de entrada inválidos. Esperados 60 preços, obtidos {len(window)}."
+        else:
+            windows[i] = window
+
+    return items, windows
+
+
+async def _group_by_model(items: List[Dict[str, Any]], windows: List[Optional[List[float]]]) -> List[Tuple[Any, Any, List[int]]]:
+    """
+    Agrupa os itens válidos de um lote pelo modelo que os atende.
+
+    Args:
+        items (List[Dict[str, Any]]): Itens de resposta (com o símbolo de cada um).
+        windows (List[Optional[List[float]]]): Janela de cada item (None se falhou).
+
+    Returns:
+        List[Tuple[Any, Any, List[int]]]: (modelo, scaler, índices) de cada grupo.
+
+    Raises:
+        HTTPException: 503 se algum grupo não tiver modelo ou scaler carregado.
+    """
+    groups: Dict[int, Tuple[Any, Any, List[int]]] = {}
+    resolved: Dict[Optional[str], Tuple[Any, Any, Hashable]] = {}
+    for i, window in enumerate(windows):
+        if window is None:
+            continue
+        symbol = items[i]["symbol"]
+        if symbol not in resolved:
+            resolved[symbol] = await resolve_serving_model_async(symbol)
+        model, scaler, _ = resolved[symbol]
+        groups.setdefault(id(model), (model, scaler, []))[2].append(i)
+    for model, scaler, _ in groups.values():
+        _check_model_loaded(model, scaler)
+    return list(groups.values())
+
+
+async def _run_batch_inference(fn: Callable[..., np.ndarray], *args: Any) -> np.ndarray:
+    """
+    Executa a inferência de um lote no pool de inferência.
+
+    Raises:
+        HTTPException: 504 se exceder o tempo limite, 500 em caso de erro.
+    """
+    try:
+        return await run_stage("inference", fn, *args)
+    except StageTimeoutError as te:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(te)
+        )
+    except Exception as e:
+        print(f"Erro na predição em lote: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro interno ao processar predição: {str(e)}"
+        )
+
+
+@router.post("/predict/batch", response_model=BatchPredictResponse, status_code=status.HTTP_200_OK)
+async def predict_stock_price_batch(request: BatchPredictRequest):
+    """
+    Prevê o próximo fechamento de vários símbolos e/ou janelas em uma única chamada.
+
+    Os dados dos símbolos são buscados em paralelo (limitado por
+    PREDICT_FETCH_CONCURRENCY) e as janelas válidas são empilhadas em um único
+    tensor por modelo (um só forward quando todos usam o modelo global).
+    Erros são reportados por item, sem falhar a requisição inteira.
+    """
+    results, windows = await _collect_batch_windows(request)
+    for item in results:
+        item["predicted_price"] = None
+
+    # 3. Um forward por modelo para todas as janelas válidas
+    for model, scaler, valid in await _group_by_model(results, windows):
+        predictions = await _run_batch_inference(predict_windows, model, scaler, [windows[i] for i in valid])
+        for i, price in zip(valid, predictions):
+            results[i]["predicted_price"] = float(price)
+
+    return {
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.post("/predict/horizon", response_model=HorizonPredictResponse, status_code=status.HTTP_200_OK)
+async def predict_stock_price_horizon(request: HorizonPredictRequest):
+    """
+    Prevê os próximos N fechamentos de vários símbolos e/ou janelas.
+
+    A previsão é recursiva e feita no servidor: cada predição entra no fim
+    da janela de 60 dias (que desliza) para o passo seguinte, com a mesma
+    semântica em todos os backends, e todas as séries do mesmo modelo
+    avançam juntas no mesmo forward.
+    """
+    results, windows = await _collect_batch_windows(request)
+    for item in results:
+        item["predicted_prices"] = None
+
+    for model, scaler, valid in await _group_by_model(results, windows):
+        forecasts = await _run_batch_inference(predict_horizon_windows, model, scaler, [windows[i] for i in valid], request.horizon)
+        for i, prices in zip(valid, forecasts):
+            results[i]["predicted_prices"] = [float(price) for price in prices]
+
+    return {
+        "horizon": request.horizon,
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
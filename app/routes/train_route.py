@@ -1,23 +1,46 @@
 from fastapi import APIRouter, BackgroundTasks, HTTPException, status
 from app.schemas import TrainRequest, TrainResponse, TrainingJobStatus
+from app.utils.training_cache import TrainingResultCache, compute_request_fingerprint
+from app.utils.prediction_cache import compute_model_version, invalidate_prediction_cache
+from app.utils.inference_backend import load_serving_model
+from app.utils.model_loader import load_serving_bundle
+from app.utils.model_registry import invalidate_model_registry
+from app.utils.serving_state import ServingState, publish_serving_state
+from app.utils.warmup import warm_serving_state
 import sys
 import os
 import uuid
+import threading
 from typing import Dict
 
 # Store em memória para os jobs (Global)
 # Em produção, use um banco de dados (Redis/Postgres)
 JOBS: Dict[str, Dict] = {}
 
+# Cache de resultados: requisições idênticas reaproveitam o job existente
+TRAINING_CACHE = TrainingResultCache()
+
+# Sinais de cancelamento por job (acionados via DELETE /train/{job_id})
+CANCEL_EVENTS: Dict[str, threading.Event] = {}
+
 sys.path.append(os.path.abspath("src"))
 
-try:
-    from src.train import run_training_pipeline
-except ImportError as e:
-    print(f"Erro ao importar modulo de treino: {e}")
+from src.training_errors import TrainingCancelledError
+
+
+def run_training_pipeline(**kwargs):
+    """
+    Executa o pipeline de treino, importando src.train apenas no primeiro uso.
 
-    def run_training_pipeline(**kwargs):
-        raise ImportError("Não foi possível importar run_training_pipeline de src.train")
+    src.train carrega mlflow, matplotlib, sklearn e yfinance; importá-lo junto
+    com a rota faria todo worker da API pagar esse custo de memória e de
+    inicialização mesmo sem nunca treinar.
+
+    Raises:
+        ImportError: Se o módulo de treino (ou suas dependências) não puder ser importado.
+    """
+    from src.train import run_training_pipeline as _run_training_pipeline
+    return _run_training_pipeline(**kwargs)
 
 router = APIRouter(
     tags=["Treinamento"]
@@ -27,7 +50,13 @@ def train_model_task(job_id: str, request: TrainRequest):
     """
     Função wrapper para rodar o pipeline de treino e atualizar o status.
     """
+    fingerprint = JOBS.get(job_id, {}).get("fingerprint")
+    stop_event = CANCEL_EVENTS.get(job_id)
     try:
+        if stop_event is not None and stop_event.is_set():
+            print(f"Job {job_id} cancelado antes de iniciar.")
+            return
+
         print(f"Iniciando job de treino {job_id} para {request.symbol}")
         # Atualiza status para rodando
         if job_id in JOBS:
@@ -43,7 +72,9 @@ def train_model_task(job_id: str, request: TrainRequest):
             num_layers=request.num_layers,
             dropout=request.dropout,
             hidden_layer_size=request.hidden_layer_size,
-            seed=request.seed
+            seed=request.seed,
+            stop_event=stop_event,
+            ensemble_size=request.ensemble_size
         )
         
         if job_id in JOBS:
@@ -51,10 +82,25 @@ def train_model_task(job_id: str, request: TrainRequest):
                  print(f"Job {job_id} falhou: {result['error']}")
                  JOBS[job_id]["status"] = "failed"
                  JOBS[job_id]["error"] = result["error"]
+                 if fingerprint:
+                     TRAINING_CACHE.release(fingerprint, job_id)
+            elif JOBS[job_id]["status"] == "cancelling" or (stop_event is not None and stop_event.is_set()):
+                 # Cancelado depois do pipeline: o modelo deste job não é publicado
+                 print(f"Job {job_id} cancelado após o treino; resultado descartado.")
+                 JOBS[job_id]["status"] = "cancelled"
+                 JOBS[job_id]["error"] = "Treinamento cancelado"
+                 if fingerprint:
+                     TRAINING_CACHE.release(fingerprint, job_id)
             else:
                  print(f"Job {job_id} completado com sucesso. Métricas: {result}")
                  JOBS[job_id]["status"] = "completed"
                  JOBS[job_id]["result"] = result
+                 if fingerprint:
+                     TRAINING_CACHE.complete(fingerprint, job_id)
+
+                 # Modelo do símbolo foi regravado: o registro recarrega no próximo uso
+                 if result.get("is_best_symbol_model", False):
+                     invalidate_model_registry(request.symbol)
 
                  # === HOT RELOAD ===
                  # Só recarrega se o modelo for o melhor (foi salvo em lstm_model.pth)
@@ -64,37 +110,62 @@ def train_model_task(job_id: str, request: TrainRequest):
                          import torch
                          import joblib
                          from app.config import get_settings
-                         from src.lstm_model import LSTMModel
+                         from src.lstm_model import build_model
                          
                          settings = get_settings()
                          device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
                          
-                         # Carrega Scaler
-                         scaler_path = "app/artifacts/scaler.pkl"
-                         if os.path.exists(scaler_path):
-                             settings.SCALER = joblib.load(scaler_path)
-                             print("Scaler recarregado.")
-                         else:
-                             print(f"Aviso: Scaler não encontrado em {scaler_path}")
-                         
-                         # Carrega Modelo
-                         model_path = "app/artifacts/lstm_model.pth"
-                         if os.path.exists(model_path):
-                             # Instancia com os mesmos parâmetros do treino
-                             new_model = LSTMModel(
-                                 input_size=1, 
-                                 hidden_layer_size=request.hidden_layer_size, 
-                                 output_size=1, 
-                                 num_layers=request.num_layers, 
-                                 dropout=request.dropout
+                         # Monta o snapshot novo por completo (modelo e scaler do mesmo
+                         # treino) antes de publicá-lo; requisições em andamento seguem
+                         # com o snapshot anterior até a troca, sem bloquear.
+                         new_state = None
+                         bundle = load_serving_bundle(device=device)
+                         if bundle is not None:
+                             new_state = ServingState(
+                                 model=load_serving_model(bundle.model, version=bundle.version),
+                                 scaler=bundle.scaler,
+                                 config=bundle.config,
+                                 version=bundle.version
                              )
-                             new_model.to(device)
-                             new_model.load_state_dict(torch.load(model_path, map_location=device))
-                             new_model.eval()
-                             settings.MODEL = new_model
-                             print(f"Modelo recarregado com sucesso no dispositivo {device}.")
                          else:
-                             print(f"Aviso: Modelo não encontrado em {model_path}")
+                             scaler_path = "app/artifacts/scaler.pkl"
+                             model_path = "app/artifacts/lstm_model.pth"
+                             if not os.path.exists(scaler_path):
+                                 print(f"Aviso: Scaler não encontrado em {scaler_path}")
+                             elif not os.path.exists(model_path):
+                                 print(f"Aviso: Modelo não encontrado em {model_path}")
+                             else:
+                                 new_scaler = joblib.load(scaler_path)
+                                 # Instancia com os mesmos parâmetros do treino
+                                 model_config = {
+                                     "input_size": 1,
+                                     "hidden_layer_size": request.hidden_layer_size,
+                                     "output_size": 1,
+                                     "num_layers": request.num_layers,
+                                     "dropout": request.dropout,
+                                     "ensemble_size": request.ensemble_size
+                                 }
+                                 new_model = build_model(model_config)
+                                 new_model.to(device)
+                                 new_model.load_state_dict(torch.load(model_path, map_location=device))
+                                 new_model.eval()
+                                 new_version = compute_model_version(model_path)
+                                 new_state = ServingState(
+                                     model=load_serving_model(new_model, version=new_version),
+                                     scaler=new_scaler,
+                                     config=model_config,
+                                     version=new_version
+                                 )
+
+                         if new_state is not None:
+                             # Aquecido antes da troca: a primeira requisição não paga o custo
+                             new_state = warm_serving_state(new_state)
+                             publish_serving_state(settings, new_state)
+                             # Predições em cache pertencem ao modelo anterior
+                             invalidate_prediction_cache()
+                             print(f"Modelo e scaler recarregados no dispositivo {device} (versão {new_state.version}).")
+                         else:
+                             print("Hot-Reload não executado: mantendo o modelo anterior.")
                              
                      except Exception as reload_error:
                          print(f"Erro no Hot-Reload: {reload_error}")
@@ -104,11 +175,22 @@ def train_model_task(job_id: str, request: TrainRequest):
                  else:
                      print("Modelo não é o melhor. Hot-Reload não executado (mantendo modelo anterior).")
              
+    except TrainingCancelledError as e:
+        print(f"Job {job_id} cancelado: {e}")
+        if job_id in JOBS:
+            JOBS[job_id]["status"] = "cancelled"
+            JOBS[job_id]["error"] = str(e)
+        if fingerprint:
+            TRAINING_CACHE.release(fingerprint, job_id)
     except Exception as e:
         print(f"Job {job_id} falhou com exceção: {e}")
         if job_id in JOBS:
             JOBS[job_id]["status"] = "failed"
             JOBS[job_id]["error"] = str(e)
+        if fingerprint:
+            TRAINING_CACHE.release(fingerprint, job_id)
+    finally:
+        CANCEL_EVENTS.pop(job_id, None)
 
 @router.post("/train", response_model=TrainResponse, status_code=status.HTTP_202_ACCEPTED)
 async def trigger_training(request: TrainRequest, background_tasks: BackgroundTasks):
@@ -117,16 +199,32 @@ async def trigger_training(request: TrainRequest, background_tasks: BackgroundTa
     
     Este endpoint aceita parâmetros de treinamento, inicia o processo em segundo plano
     e retorna imediatamente um ID de job.
+
+    Requisições idênticas (mesmos parâmetros e snapshot de dados) não disparam
+    um novo treino: retornam o job já concluído ou o job ainda em andamento.
     """
     job_id = f"train-{uuid.uuid4()}"
-    
+    fingerprint = compute_request_fingerprint(request.model_dump())
+
+    # Jobs que já saíram de JOBS não são reaproveitados: o novo job assume o fingerprint
+    existing_job_id = TRAINING_CACHE.claim(fingerprint, job_id, known_jobs=JOBS)
+    if existing_job_id is not None:
+        print(f"Requisição idêntica ao job {existing_job_id}. Reutilizando resultado.")
+        return {
+            "message": "Treinamento idêntico já realizado ou em andamento. Reutilizando job existente",
+            "job_id": existing_job_id,
+            "status": JOBS[existing_job_id]["status"]
+        }
+
     # Registra o job inicial
     JOBS[job_id] = {
         "job_id": job_id,
         "status": "pending",
         "result": None,
-        "error": None
+        "error": None,
+        "fingerprint": fingerprint
     }
+    CANCEL_EVENTS[job_id] = threading.Event()
     
     background_tasks.add_task(train_model_task, job_id, request)
     
@@ -148,3 +246,43 @@ async def get_training_status(job_id: str):
         )
     
     return JOBS[job_id]
+
+
+@router.delete("/train/{job_id}", response_model=TrainingJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_training(job_id: str):
+    """
+    Cancela um job de treinamento pendente ou em execução.
+
+    O treino é interrompido na fronteira do próximo batch. Jobs pendentes são
+    marcados como cancelados imediatamente; jobs em execução passam para
+    "cancelling" até o loop de treino parar. Requisições idênticas anexadas
+    ao mesmo job também são canceladas.
+    """
+    if job_id not in JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} não encontrado."
+        )
+
+    job = JOBS[job_id]
+    if job["status"] in ("completed", "failed", "cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} já finalizado com status '{job['status']}'."
+        )
+
+    stop_event = CANCEL_EVENTS.get(job_id)
+    if stop_event is not None:
+        stop_event.set()
+
+    if job["status"] == "pending":
+        job["status"] = "cancelled"
+        job["error"] = "Treinamento cancelado antes de iniciar"
+    else:
+        job["status"] = "cancelling"
+
+    # Novas requisições idênticas não devem ser anexadas a um job cancelado
+    if job.get("fingerprint"):
+        TRAINING_CACHE.release(job["fingerprint"], job_id)
+
+    return job
@@ -12,6 +12,7 @@ class TrainRequest(BaseModel):
     dropout: float = Field(default=0.2, ge=0.0, le=1.0, description="Taxa de dropout")
     hidden_layer_size: int = Field(default=64, ge=0, description="Tamanho da camada oculta")
     seed: int = Field(default=42, ge=0, description="Seed para reprodutibilidade (garante resultados idênticos)")
+    ensemble_size: int = Field(default=1, ge=1, le=32, description="Número de réplicas (seeds seed, seed+1, ...) treinadas juntas e servidas como ensemble")
 
 class TrainResponse(BaseModel):
     message: str
@@ -21,7 +22,7 @@ class TrainResponse(BaseModel):
 from typing import Dict, Any
 class TrainingJobStatus(BaseModel):
     job_id: str
-    status: str = Field(..., description="Status atual do job: pending, running, completed, failed")
+    status: str = Field(..., description="Status atual do job: pending, running, cancelling, completed, failed, cancelled")
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
@@ -44,3 +45,44 @@ class PredictRequest(BaseModel):
 class PredictResponse(BaseModel):
     predicted_price: float
     timestamp: str
+
+
+class BatchPredictRequest(BaseModel):
+    symbols: Optional[List[str]] = Field(None, description="Lista de símbolos (ex: AAPL, MSFT). Os dados são buscados automaticamente e em paralelo.")
+    windows: Optional[List[List[float]]] = Field(None, description="Lista de janelas manuais, cada uma com exatamente 60 preços de fechamento.")
+    start_date: Optional[str] = Field(None, description="Data inicial para busca automática (YYYY-MM-DD), aplicada a todos os símbolos. Opcional.")
+    end_date: Optional[str] = Field(None, description="Data final para busca automática (YYYY-MM-DD), aplicada a todos os símbolos. Opcional.")
+
+    @model_validator(mode='after')
+    def check_items(self):
+        total = len(self.symbols or []) + len(self.windows or [])
+        if total == 0:
+            raise ValueError('Deve fornecer ao menos um item em "symbols" ou "windows".')
+        if total > 500:
+            raise ValueError(f'Máximo de 500 itens por requisição. Recebidos: {total}.')
+        return self
+
+class BatchPredictItem(BaseModel):
+    index: int = Field(..., description="Posição do item na requisição (símbolos primeiro, depois janelas)")
+    symbol: Optional[str] = Field(None, description="Símbolo do item, se buscado automaticamente")
+    predicted_price: Optional[float] = None
+    error: Optional[str] = None
+
+class BatchPredictResponse(BaseModel):
+    results: List[BatchPredictItem]
+    timestamp: str
+
+
+class HorizonPredictRequest(BatchPredictRequest):
+    horizon: int = Field(default=5, ge=1, le=60, description="Número de pregões à frente a prever (previsão recursiva)")
+
+class HorizonPredictItem(BaseModel):
+    index: int = Field(..., description="Posição do item na requisição (símbolos primeiro, depois janelas)")
+    symbol: Optional[str] = Field(None, description="Símbolo do item, se buscado automaticamente")
+    predicted_prices: Optional[List[float]] = Field(None, description="Preços previstos para os próximos `horizon` pregões")
+    error: Optional[str] = None
+
+class HorizonPredictResponse(BaseModel):
+    horizon: int
+    results: List[HorizonPredictItem]
+    timestamp: str
@@ -0,0 +1,587 @@
+"""
+Módulo da tabela de previsões diárias pré-calculadas.
+
+A maior parte do tráfego de /predict pede o fechamento de amanhã de uma lista
+fixa de símbolos (FORECAST_WATCHLIST), recalculado a cada requisição. Um job
+agendado no próprio processo roda após o fechamento do mercado, busca os
+dados dos símbolos da lista, executa um forward por modelo para todos eles e
+grava os resultados em uma tabela SQLite indexada por (símbolo, pregão). A
+última previsão de cada símbolo fica também em um dicionário em memória,
+trocado de uma só vez a cada execução, e /predict a serve em O(1) quando a
+requisição pede o próximo fechamento (sem datas) e o modelo em serviço é o
+mesmo que gerou a previsão. Quando o modelo em serviço muda (hot-reload ou
+novo modelo de um símbolo), o job recalcula a lista inteira com o modelo novo.
+Falhas são por símbolo: os demais são gravados e os que falharam são tentados
+de novo com espera exponencial (FORECAST_RETRY_*), sem esperar o próximo
+fechamento. A tabela e o agendador são criados no lifespan da API, nunca no
+caminho de uma requisição.
+
+Com vários workers do uvicorn, cada processo tem o seu agendador, mas só um
+grava a tabela: o que obtiver o lock exclusivo do arquivo `<FORECAST_DB_PATH>.lock`.
+Os demais apenas releem do SQLite as previsões gravadas por ele e assumem o
+job se o processo com o lock terminar (o sistema libera o lock).
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from datetime import time as dt_time
+from typing import IO, Any, Dict, Hashable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from app.config import get_settings
+from app.utils.serving_state import add_serving_model_listener, remove_serving_model_listener
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_forecasts (
+    symbol TEXT NOT NULL,
+    as_of TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    predicted_price REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (symbol, as_of)
+)
+"""
+
+
+def parse_watchlist(value: str) -> List[str]:
+    """
+    Converte uma lista separada por vírgulas (ex: "AAPL, msft") em símbolos.
+
+    Args:
+        value (str): Símbolos separados por vírgula.
+
+    Returns:
+        List[str]: Símbolos em maiúsculas, sem repetição, na ordem informada.
+    """
+    symbols = [part.strip().upper() for part in value.split(",") if part.strip()]
+    return list(dict.fromkeys(symbols))
+
+
+def last_session_date(now: datetime, run_time: dt_time) -> date:
+    """
+    Último pregão cujo fechamento já foi processado pelo job.
+
+    Antes do horário do job, o pregão do dia ainda não conta. Fins de semana
+    são pulados (feriados não são considerados).
+
+    Args:
+        now (datetime): Instante atual no fuso do mercado.
+        run_time (time): Horário do job após o fechamento.
+
+    Returns:
+        date: Data do pregão.
+    """
+    session = now.date() if now.time() >= run_time else now.date() - timedelta(days=1)
+    while session.weekday() >= 5:
+        session -= timedelta(days=1)
+    return session
+
+
+def next_run_at(now: datetime, run_time: dt_time) -> datetime:
+    """
+    Próximo horário de execução do job (dias úteis, após o fechamento).
+
+    Args:
+        now (datetime): Instante atual no fuso do mercado.
+        run_time (time): Horário do job.
+
+    Returns:
+        datetime: Próxima execução, no mesmo fuso de `now`.
+    """
+    candidate = datetime.combine(now.date(), run_time, tzinfo=now.tzinfo)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def seconds_until(now: datetime, target: datetime) -> float:
+    """
+    Segundos reais entre dois instantes, medidos em UTC.
+
+    Subtrair dois datetimes com o mesmo ZoneInfo ignora a troca de horário de
+    verão (a diferença sai em hora de parede); convertê-los para UTC antes
+    evita dormir uma hora a mais ou a menos.
+
+    Args:
+        now (datetime): Instante atual (com fuso).
+        target (datetime): Instante alvo (com fuso).
+
+    Returns:
+        float: Segundos até `target` (nunca negativo).
+    """
+    delta = target.astimezone(dt_timezone.utc) - now.astimezone(dt_timezone.utc)
+    return max(0.0, delta.total_seconds())
+
+
+class ForecastTable:
+    """
+    Tabela SQLite de previsões diárias com a última previsão de cada símbolo em memória.
+
+    Atributos:
+        path (str): Arquivo do banco SQLite.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Abre (ou cria) a tabela e carrega a última previsão de cada símbolo.
+
+        Args:
+            path (str): Arquivo do banco SQLite.
+        """
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(_SCHEMA)
+        # Snapshot imutável: substituído por inteiro a cada gravação, lido sem lock
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        """Relê do banco a última previsão de cada símbolo (ex: gravada por outro worker)."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT symbol, as_of, model_version, predicted_price, created_at FROM daily_forecasts AS d "
+                "WHERE as_of = (SELECT MAX(as_of) FROM daily_forecasts WHERE symbol = d.symbol)"
+            ).fetchall()
+        with self._write_lock:
+            self._latest = {row[0]: self._row_to_dict(row) for row in rows}
+
+    def upsert(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """
+        Grava (ou substitui) previsões e atualiza a última previsão em memória.
+
+        Args:
+            rows (Sequence[Dict[str, Any]]): Registros com symbol, as_of,
+                model_version e predicted_price.
+        """
+        created_at = datetime.now().isoformat()
+        records = [
+            (row["symbol"], row["as_of"], str(row["model_version"]), float(row["predicted_price"]), created_at)
+            for row in rows
+        ]
+        with self._write_lock:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO daily_forecasts (symbol, as_of, model_version, predicted_price, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    records
+                )
+            latest = dict(self._latest)
+            for record in records:
+                current = latest.get(record[0])
+                if current is None or record[1] >= current["as_of"]:
+                    latest[record[0]] = self._row_to_dict(record)
+            self._latest = latest
+
+    def lookup(self, symbol: str, as_of: date, model_version: Hashable) -> Optional[float]:
+        """
+        Retorna a previsão pré-calculada de um símbolo, se ainda válida.
+
+        Args:
+            symbol (str): Símbolo da ação.
+            as_of (date): Pregão esperado (último fechamento processado).
+            model_version (Hashable): Versão do modelo que atenderia a requisição.
+
+        Returns:
+            Optional[float]: Preço previsto, ou None se não houver previsão do
+                pregão com o mesmo modelo.
+        """
+        row = self._latest.get(symbol.strip().upper())
+        if row is not None and row["as_of"] == as_of.isoformat() and row["model_version"] == str(model_version):
+            self._hits += 1
+            return row["predicted_price"]
+        self._misses += 1
+        return None
+
+    def missing(self, symbols: Sequence[str], as_of: date) -> List[str]:
+        """
+        Lista os símbolos sem previsão para o pregão.
+
+        Args:
+            symbols (Sequence[str]): Símbolos da lista de acompanhamento.
+            as_of (date): Pregão.
+
+        Returns:
+            List[str]: Símbolos sem previsão desse pregão.
+        """
+        latest = self._latest
+        return [symbol for symbol in symbols if latest.get(symbol, {}).get("as_of") != as_of.isoformat()]
+
+    def latest(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna a última previsão de cada símbolo."""
+        return dict(self._latest)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas da tabela.
+
+        Returns:
+            Dict[str, Any]: Símbolos com previsão, acertos e faltas nas consultas.
+        """
+        return {"symbols": sorted(self._latest), "hits": self._hits, "misses": self._misses}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre uma conexão (uma por operação: o job e a API rodam em threads diferentes)."""
+        return sqlite3.connect(self.path, timeout=5)
+
+    @staticmethod
+    def _row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+        """Converte uma linha (symbol, as_of, model_version, predicted_price, created_at) em dicionário."""
+        return {
+            "symbol": row[0],
+            "as_of": row[1],
+            "model_version": row[2],
+            "predicted_price": float(row[3]),
+            "created_at": row[4]
+        }
+
+
+async def run_daily_forecast(table: ForecastTable, symbols: Sequence[str], as_of: date) -> Dict[str, Any]:
+    """
+    Calcula e grava a previsão do próximo fechamento de cada símbolo.
+
+    Os dados são buscados em paralelo e cada modelo executa um único forward
+    para todos os símbolos que atende.
+
+    Args:
+        table (ForecastTable): Tabela de destino.
+        symbols (Sequence[str]): Símbolos a prever.
+        as_of (date): Pregão cujo fechamento é o último dado da janela.
+
+    Returns:
+        Dict[str, Any]: Pregão, símbolos gravados, falhas por símbolo e duração (s).
+    """
+    from app.routes.predict_route import fetch_recent_prices_shared, predict_windows, resolve_serving_model_async
+    from app.utils.executors import run_stage
+
+    started = time.perf_counter()
+    windows = await asyncio.gather(*(fetch_recent_prices_shared(symbol) for symbol in symbols), return_exceptions=True)
+
+    failed: Dict[str, str] = {}
+    groups: Dict[int, Dict[str, Any]] = {}
+    for symbol, window in zip(symbols, windows):
+        if isinstance(window, BaseException):
+            failed[symbol] = str(getattr(window, "detail", window))
+            continue
+        try:
+            model, scaler, version = await resolve_serving_model_async(symbol)
+        except Exception as e:
+            # Ex: HTTPException do carregamento do modelo do símbolo; os demais seguem
+            failed[symbol] = str(getattr(e, "detail", e))
+            continue
+        if model is None or scaler is None:
+            failed[symbol] = "modelo não carregado"
+            continue
+        group = groups.setdefault(id(model), {"model": model, "scaler": scaler, "version": version, "symbols": [], "windows": []})
+        group["symbols"].append(symbol)
+        group["windows"].append(window)
+
+    rows = []
+    for group in groups.values():
+        try:
+            predictions = await run_stage("inference", predict_windows, group["model"], group["scaler"], group["windows"])
+        except Exception as e:
+            failed.update({symbol: str(e) for symbol in group["symbols"]})
+            continue
+        rows.extend(
+            {"symbol": symbol, "as_of": as_of.isoformat(), "model_version": group["version"], "predicted_price": float(price)}
+            for symbol, price in zip(group["symbols"], predictions)
+        )
+    if rows:
+        table.upsert(rows)
+
+    report = {
+        "as_of": as_of.isoformat(),
+        "scored": [row["symbol"] for row in rows],
+        "failed": failed,
+        "duration_s": time.perf_counter() - started
+    }
+    print(f"Previsões diárias de {report['as_of']}: {len(rows)} gravadas, {len(failed)} falhas em {report['duration_s']:.2f}s.")
+    return report
+
+
+class DailyForecastScheduler:
+    """
+    Agenda o job de previsões diárias no event loop da API.
+
+    Atributos:
+        table (ForecastTable): Tabela de previsões.
+        symbols (List[str]): Lista de acompanhamento.
+        run_time (time): Horário do job no fuso do mercado.
+        timezone (ZoneInfo): Fuso do mercado.
+        last_report (Dict[str, Any], opcional): Resultado da última execução.
+        retry_attempts (int): Novas tentativas dos símbolos que falharam.
+        retry_base_s (float): Espera antes da primeira nova tentativa (dobra a cada uma).
+        retry_max_s (float): Espera máxima entre tentativas.
+    """
+
+    def __init__(
+        self,
+        table: ForecastTable,
+        symbols: Sequence[str],
+        run_time: dt_time,
+        timezone: str,
+        refresh_s: float = 60.0,
+        retry_attempts: int = 5,
+        retry_base_s: float = 60.0,
+        retry_max_s: float = 1800.0
+    ) -> None:
+        """
+        Inicializa o agendador (sem iniciar o job).
+
+        Args:
+            table (ForecastTable): Tabela de previsões.
+            symbols (Sequence[str]): Lista de acompanhamento.
+            run_time (time): Horário do job após o fechamento.
+            timezone (str): Fuso do mercado (ex: America/New_York).
+            refresh_s (float): Intervalo (s) em que um worker que não grava a
+                tabela a relê. Padrão: 60
+            retry_attempts (int): Novas tentativas dos símbolos que falharam. Padrão: 5
+            retry_base_s (float): Espera (s) antes da primeira nova tentativa. Padrão: 60
+            retry_max_s (float): Espera máxima (s) entre tentativas. Padrão: 1800
+        """
+        self.table = table
+        self.symbols = list(symbols)
+        self.run_time = run_time
+        self.timezone = ZoneInfo(timezone)
+        self.refresh_s = refresh_s
+        self.retry_attempts = max(0, retry_attempts)
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._model_changed: Optional[asyncio.Event] = None
+        self._listener: Optional[Any] = None
+        self._writer_file: Optional[IO[str]] = None
+
+    @property
+    def is_writer(self) -> bool:
+        """Indica se este processo é o que grava a tabela."""
+        return self._writer_file is not None
+
+    def now(self) -> datetime:
+        """Instante atual no fuso do mercado."""
+        return datetime.now(self.timezone)
+
+    def current_session(self) -> date:
+        """Pregão cujas previsões devem estar na tabela agora."""
+        return last_session_date(self.now(), self.run_time)
+
+    def lookup(self, symbol: str, model_version: Hashable) -> Optional[float]:
+        """
+        Consulta a previsão do próximo fechamento de um símbolo.
+
+        Args:
+            symbol (str): Símbolo da ação.
+            model_version (Hashable): Versão do modelo que atenderia a requisição.
+
+        Returns:
+            Optional[float]: Preço previsto, ou None se não houver previsão válida.
+        """
+        return self.table.lookup(symbol, self.current_session(), model_version)
+
+    async def run_once(self, symbols: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Executa o job imediatamente para o pregão atual.
+
+        Args:
+            symbols (Sequence[str], opcional): Símbolos a prever. Padrão: toda a lista.
+
+        Returns:
+            Dict[str, Any]: Relatório de run_daily_forecast.
+        """
+        self.last_report = await run_daily_forecast(self.table, symbols or self.symbols, self.current_session())
+        return self.last_report
+
+    def start(self) -> asyncio.Task:
+        """Inicia o laço do agendador no event loop atual."""
+        loop = asyncio.get_running_loop()
+        self._model_changed = asyncio.Event()
+        model_changed = self._model_changed
+
+        def on_model_changed() -> None:
+            # Chamado de qualquer thread (ex: hot-reload na thread do treino)
+            try:
+                loop.call_soon_threadsafe(model_changed.set)
+            except RuntimeError:
+                pass
+
+        self._listener = on_model_changed
+        add_serving_model_listener(on_model_changed)
+        self._task = loop.create_task(self._loop())
+        return self._task
+
+    def stop(self) -> None:
+        """Cancela o laço do agendador."""
+        if self._listener is not None:
+            remove_serving_model_listener(self._listener)
+            self._listener = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer_file is not None:
+            # Fechar o arquivo libera o lock para outro worker
+            self._writer_file.close()
+            self._writer_file = None
+
+    def acquire_writer(self) -> bool:
+        """
+        Tenta se tornar o único processo que grava a tabela.
+
+        Usa um lock exclusivo e não bloqueante (flock) em `<FORECAST_DB_PATH>.lock`,
+        liberado pelo sistema se o processo terminar. Sem fcntl (Windows), cada
+        processo grava a tabela.
+
+        Returns:
+            bool: True se este processo grava a tabela.
+        """
+        if self._writer_file is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        lock_file = open(self.table.path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._writer_file = lock_file
+        print(f"Este worker (pid {os.getpid()}) grava as previsões diárias.")
+        return True
+
+    def retry_delay(self, attempt: int) -> float:
+        """
+        Espera antes da nova tentativa de número `attempt` (0 = primeira).
+
+        Args:
+            attempt (int): Tentativas já feitas desde a execução original.
+
+        Returns:
+            float: Segundos até a nova tentativa (retry_base_s dobrando, até retry_max_s).
+        """
+        return min(self.retry_max_s, self.retry_base_s * (2 ** attempt))
+
+    async def _loop(self) -> None:
+        """
+        Recupera o pregão atual se faltar previsão e depois roda a cada fechamento.
+
+        Se o modelo em serviço mudar, acorda antes e recalcula a lista inteira:
+        as previsões gravadas são do modelo anterior e deixariam de ser servidas.
+        Símbolos que falharam são tentados de novo após retry_delay, até
+        retry_attempts vezes; depois, só no próximo fechamento.
+        Um worker sem o lock de gravação só relê a tabela a cada refresh_s.
+        """
+        from app.utils.model_loading import get_model_loader
+
+        # As previsões só fazem sentido com o modelo publicado
+        await get_model_loader().wait()
+        # A publicação inicial já é coberta pela recuperação abaixo
+        self._model_changed.clear()
+        model_changed = False
+        retry: List[str] = []
+        attempt = 0
+        while True:
+            failed: List[str] = []
+            try:
+                if self.acquire_writer():
+                    if model_changed:
+                        symbols = self.symbols
+                    else:
+                        # Falhas de um recálculo completo podem ter previsão antiga na tabela
+                        symbols = list(dict.fromkeys(retry + self.table.missing(self.symbols, self.current_session())))
+                    if symbols:
+                        try:
+                            report = await self.run_once(symbols)
+                        except Exception:
+                            # Falha da execução inteira (ex: gravação no SQLite): todos são tentados de novo
+                            failed = symbols
+                            raise
+                        failed = [symbol for symbol in symbols if symbol in report.get("failed", {})]
+                else:
+                    # Outro worker grava a tabela: só relê o que ele gravou
+                    self.table.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Erro no job de previsões diárias: {e}")
+            now = self.now()
+            delay = seconds_until(now, next_run_at(now, self.run_time))
+            if not self.is_writer:
+                delay = min(delay, self.refresh_s)
+            # A contagem recomeça quando nada falha ou quando o modelo muda
+            attempt = attempt + 1 if failed and retry and not model_changed else 0
+            retry = failed if attempt < self.retry_attempts else []
+            if retry:
+                delay = min(delay, self.retry_delay(attempt))
+                print(f"Nova tentativa das previsões de {retry} em {delay:.0f}s.")
+            model_changed = await self._wait(delay)
+
+    async def _wait(self, delay: float) -> bool:
+        """Dorme até o próximo fechamento ou até o modelo mudar; retorna True se o modelo mudou."""
+        try:
+            await asyncio.wait_for(self._model_changed.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            return False
+        # Várias trocas seguidas resultam em um único recálculo
+        self._model_changed.clear()
+        return True
+
+
+_scheduler: Optional[DailyForecastScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def create_forecast_scheduler() -> Optional[DailyForecastScheduler]:
+    """
+    Cria (uma vez) o agendador global de previsões diárias e a sua tabela.
+
+    Chamado no lifespan da API: abrir o SQLite e ler as previsões gravadas
+    nunca fica no caminho de uma requisição.
+
+    Returns:
+        Optional[DailyForecastScheduler]: O agendador, ou None se FORECAST_WATCHLIST
+            estiver vazia.
+    """
+    global _scheduler
+    settings = get_settings()
+    symbols = parse_watchlist(settings.FORECAST_WATCHLIST)
+    if not symbols:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DailyForecastScheduler(
+                table=ForecastTable(settings.FORECAST_DB_PATH),
+                symbols=symbols,
+                run_time=dt_time.fromisoformat(settings.FORECAST_RUN_TIME),
+                timezone=settings.FORECAST_TIMEZONE,
+                refresh_s=settings.FORECAST_REFRESH_S,
+                retry_attempts=settings.FORECAST_RETRY_ATTEMPTS,
+                retry_base_s=settings.FORECAST_RETRY_BASE_S,
+                retry_max_s=settings.FORECAST_RETRY_MAX_S
+            )
+    return _scheduler
+
+
+def get_forecast_scheduler() -> Optional[DailyForecastScheduler]:
+    """
+    Retorna o agendador global de previsões diárias criado no lifespan.
+
+    Returns:
+        Optional[DailyForecastScheduler]: O agendador, ou None se ainda não foi
+            criado ou se FORECAST_WATCHLIST estiver vazia.
+    """
+    return _scheduler
@@ -0,0 +1,114 @@
+"""
+Módulo de pools de execução para o caminho de predição.
+
+As etapas bloqueantes de /predict (download no yfinance e inferência com
+sklearn/torch) rodam em pools de threads dedicados e limitados, com tempo
+limite por etapa, para que o event loop continue atendendo outras
+requisições enquanto uma busca lenta está em andamento.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.config import get_settings
+
+
+class StageTimeoutError(TimeoutError):
+    """
+    Exceção lançada quando uma etapa excede seu tempo limite.
+
+    Atributos:
+        stage (str): Nome da etapa ("fetch" ou "inference").
+        timeout (float): Tempo limite configurado, em segundos.
+    """
+
+    def __init__(self, stage: str, timeout: float) -> None:
+        """
+        Inicializa a exceção.
+
+        Args:
+            stage (str): Nome da etapa.
+            timeout (float): Tempo limite em segundos.
+        """
+        super().__init__(f"Tempo limite excedido na etapa '{stage}' ({timeout}s).")
+        self.stage = stage
+        self.timeout = timeout
+
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def _stage_config(stage: str) -> Dict[str, float]:
+    """
+    Retorna número de workers e tempo limite configurados para a etapa.
+
+    Args:
+        stage (str): "fetch" ou "inference".
+
+    Returns:
+        Dict[str, float]: {"workers": ..., "timeout": ...}
+
+    Raises:
+        ValueError: Se a etapa não for conhecida.
+    """
+    settings = get_settings()
+    if stage == "fetch":
+        return {"workers": settings.PREDICT_FETCH_WORKERS, "timeout": settings.PREDICT_FETCH_TIMEOUT_S}
+    if stage == "inference":
+        return {"workers": settings.PREDICT_INFERENCE_WORKERS, "timeout": settings.PREDICT_INFERENCE_TIMEOUT_S}
+    raise ValueError(f"Etapa desconhecida: {stage}")
+
+
+def get_executor(stage: str) -> ThreadPoolExecutor:
+    """
+    Retorna o pool de threads da etapa, criando-o na primeira chamada.
+
+    Args:
+        stage (str): "fetch" ou "inference".
+
+    Returns:
+        ThreadPoolExecutor: Pool limitado ao número de workers configurado.
+    """
+    if stage not in _executors:
+        workers = max(1, int(_stage_config(stage)["workers"]))
+        _executors[stage] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"predict-{stage}")
+    return _executors[stage]
+
+
+async def run_stage(stage: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Executa uma função bloqueante no pool da etapa, com tempo limite.
+
+    Args:
+        stage (str): "fetch" ou "inference".
+        fn (Callable): Função bloqueante.
+        *args: Argumentos posicionais de `fn`.
+        **kwargs: Argumentos nomeados de `fn`.
+
+    Returns:
+        Any: Retorno de `fn`.
+
+    Raises:
+        StageTimeoutError: Se a etapa exceder o tempo limite. A thread não é
+            interrompida (Python não permite), mas o chamador é liberado.
+    """
+    timeout = float(_stage_config(stage)["timeout"])
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(stage), functools.partial(fn, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        raise StageTimeoutError(stage, timeout)
+
+
+def shutdown_executors() -> None:
+    """
+    Encerra os pools de execução, descartando tarefas ainda não iniciadas.
+
+    Chamado no desligamento da API.
+    """
+    for executor in _executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
@@ -0,0 +1,311 @@
+"""
+Módulo de backends de inferência alternativos ao PyTorch.
+
+Por padrão a API serve o modelo PyTorch carregado no lifespan. Com
+INFERENCE_BACKEND=onnx, o modelo exportado em ONNX é executado com o
+onnxruntime em CPU; com INFERENCE_BACKEND=numpy, o forward do LSTM roda em
+NumPy puro, sem PyTorch. Ao carregar do bundle, esses dois backends são
+montados sem importar o PyTorch (load_torchless_backend). Backends expõem
+`predict(batch)` sobre arrays NumPy já normalizados e são identificados em
+predict_windows por isinstance.
+Com USE_QUANTIZED_MODEL=true (backend torch), a variante int8 aprovada no
+treino é servida no lugar do modelo float32.
+"""
+
+import os
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from src.model_bundle import artifact_matches_version
+
+ONNX_MODEL_PATH = "app/artifacts/lstm_model.onnx"
+QUANTIZED_MODEL_PATH = "app/artifacts/lstm_model_int8.pth"
+NUMPY_WEIGHTS_PATH = "app/artifacts/lstm_model.npz"
+
+
+class InferenceBackend:
+    """
+    Interface comum dos backends de inferência sem PyTorch.
+
+    Atributos:
+        name (str): Nome do backend.
+    """
+
+    name = "base"
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o forward do modelo.
+
+        Args:
+            batch (np.ndarray): Entrada normalizada com shape (batch, seq_length, input_size).
+
+        Returns:
+            np.ndarray: Predições normalizadas com shape (batch, output_size).
+        """
+        raise NotImplementedError
+
+    def eval(self) -> "InferenceBackend":
+        """Compatibilidade com nn.Module: backends já estão em modo de inferência."""
+        return self
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    Backend que executa o modelo exportado em ONNX com o onnxruntime (CPU).
+
+    Atributos:
+        path (str): Caminho do arquivo .onnx.
+        session (onnxruntime.InferenceSession): Sessão de inferência.
+    """
+
+    name = "onnx"
+
+    def __init__(self, path: str, intra_op_num_threads: int = 1) -> None:
+        """
+        Cria a sessão do onnxruntime.
+
+        Args:
+            path (str): Caminho do arquivo .onnx.
+            intra_op_num_threads (int): Threads por operação. Padrão: 1
+                (o paralelismo vem dos workers do pool de inferência).
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, intra_op_num_threads)
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o forward no onnxruntime.
+
+        Args:
+            batch (np.ndarray): Entrada normalizada com shape (batch, seq_length, input_size).
+
+        Returns:
+            np.ndarray: Predições normalizadas com shape (batch, output_size).
+        """
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self._input_name: batch})[0]
+
+
+class NumpyBackend(InferenceBackend):
+    """
+    Backend que executa o LSTMModel em NumPy puro (sem PyTorch).
+
+    Atributos:
+        model (NumpyLSTM): Implementação NumPy do forward.
+    """
+
+    name = "numpy"
+
+    def __init__(self, model: Any) -> None:
+        """
+        Inicializa o backend.
+
+        Args:
+            model (NumpyLSTM): Modelo NumPy já carregado.
+        """
+        self.model = model
+
+    @classmethod
+    def from_npz(cls, path: str) -> "NumpyBackend":
+        """
+        Carrega os pesos exportados em .npz.
+
+        Args:
+            path (str): Caminho do arquivo .npz.
+
+        Returns:
+            NumpyBackend: Backend pronto para inferência.
+        """
+        from src.numpy_lstm import NumpyLSTM
+        return cls(NumpyLSTM.from_npz(path))
+
+    @classmethod
+    def from_bundle(cls, bundle: Any) -> "NumpyBackend":
+        """
+        Monta o backend a partir dos tensores de um bundle, sem PyTorch.
+
+        Args:
+            bundle (ModelBundle): Bundle carregado (LSTMModel, sem ensemble).
+
+        Returns:
+            NumpyBackend: Backend pronto para inferência.
+        """
+        from src.numpy_lstm import NumpyLSTM
+        return cls(NumpyLSTM(bundle.tensors, num_layers=bundle.config.get("num_layers")))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o forward em NumPy.
+
+        Args:
+            batch (np.ndarray): Entrada normalizada com shape (batch, seq_length, input_size).
+
+        Returns:
+            np.ndarray: Predições normalizadas com shape (batch, output_size).
+        """
+        return self.model.forward(batch)
+
+
+def _load_onnx_backend(version: Optional[str] = None) -> Optional[OnnxBackend]:
+    """
+    Carrega o backend ONNX, se o arquivo existir e for dos pesos em serviço.
+
+    Args:
+        version (str, opcional): Versão dos pesos em serviço. Se informada, o
+            .onnx só é usado se tiver sido exportado desses mesmos pesos.
+
+    Returns:
+        Optional[OnnxBackend]: Backend pronto, ou None se não puder ser carregado.
+    """
+    if not os.path.exists(ONNX_MODEL_PATH):
+        print(f"Aviso: {ONNX_MODEL_PATH} não encontrado.")
+        return None
+    if version is not None and not artifact_matches_version(ONNX_MODEL_PATH, version):
+        print(f"Aviso: {ONNX_MODEL_PATH} não corresponde ao modelo em serviço (versão {version}).")
+        return None
+    try:
+        backend = OnnxBackend(ONNX_MODEL_PATH, intra_op_num_threads=get_settings().ONNX_INTRA_OP_THREADS)
+    except Exception as e:
+        print(f"Aviso: não foi possível carregar o backend ONNX ({e}).")
+        return None
+    print(f"Backend de inferência: onnxruntime ({ONNX_MODEL_PATH})")
+    return backend
+
+
+def load_torchless_backend(version: str, bundle: Any = None) -> Optional[InferenceBackend]:
+    """
+    Monta o backend configurado (onnx ou numpy) sem importar o PyTorch.
+
+    Usado no carregamento do bundle: com INFERENCE_BACKEND=onnx o modelo
+    exportado é aberto direto no onnxruntime e, com INFERENCE_BACKEND=numpy, o
+    NumpyLSTM é montado dos tensores do bundle. O LSTMModel nem é instanciado.
+
+    Args:
+        version (str): Versão do bundle em serviço (os artefatos derivados
+            precisam ter sido gerados dela).
+        bundle (ModelBundle, opcional): Bundle carregado (tensores e configuração).
+
+    Returns:
+        Optional[InferenceBackend]: Backend pronto, ou None se o backend for
+            torch ou não puder ser montado sem o PyTorch.
+    """
+    backend = get_settings().INFERENCE_BACKEND.lower()
+    if backend == "onnx":
+        return _load_onnx_backend(version)
+    if backend == "numpy" and bundle is not None and bundle.config.get("ensemble_size", 1) <= 1:
+        try:
+            return NumpyBackend.from_bundle(bundle)
+        except Exception as e:
+            print(f"Aviso: não foi possível montar o backend NumPy do bundle ({e}).")
+    return None
+
+
+def _load_numpy_backend(torch_model: Any, version: Optional[str] = None) -> Any:
+    """
+    Carrega o backend NumPy a partir do .npz ou, na falta dele, do modelo PyTorch.
+
+    Args:
+        torch_model (Any): Modelo PyTorch já carregado (pode ser None).
+        version (str, opcional): Versão dos pesos em serviço. Se informada, o
+            .npz só é usado se tiver sido exportado desses mesmos pesos.
+
+    Returns:
+        Any: NumpyBackend, ou o modelo PyTorch se a conversão não for possível.
+    """
+    from src.numpy_lstm import NumpyLSTM
+
+    try:
+        if os.path.exists(NUMPY_WEIGHTS_PATH) and (version is None or artifact_matches_version(NUMPY_WEIGHTS_PATH, version)):
+            backend = NumpyBackend.from_npz(NUMPY_WEIGHTS_PATH)
+        elif torch_model is None:
+            raise ValueError(f"{NUMPY_WEIGHTS_PATH} ausente ou de outro modelo")
+        else:
+            # Converte os pesos do modelo já carregado (apenas LSTMModel)
+            from src.lstm_model import LSTMModel
+            if not isinstance(torch_model, LSTMModel):
+                raise ValueError(f"{NUMPY_WEIGHTS_PATH} ausente ou de outro modelo e o modelo não é um LSTMModel")
+            state_dict = {key: value.detach().cpu().numpy() for key, value in torch_model.state_dict().items()}
+            backend = NumpyBackend(NumpyLSTM(state_dict, num_layers=torch_model.num_layers))
+    except Exception as e:
+        print(f"Aviso: não foi possível carregar o backend NumPy ({e}). Usando backend torch.")
+        return torch_model
+    print("Backend de inferência: NumPy")
+    return backend
+
+
+def load_serving_model(torch_model: Any, version: Optional[str] = None) -> Any:
+    """
+    Retorna o modelo a ser servido conforme INFERENCE_BACKEND.
+
+    Se o backend configurado não puder ser carregado (arquivo ausente,
+    gerado a partir de outros pesos ou dependência não instalada), mantém o
+    modelo PyTorch.
+
+    Args:
+        torch_model (Any): Modelo PyTorch já carregado.
+        version (str, opcional): Versão dos pesos em serviço. Se informada, o
+            .onnx/.npz/int8 só é usado se tiver sido gerado desses mesmos pesos.
+
+    Returns:
+        Any: Backend alternativo ou o próprio modelo PyTorch.
+    """
+    if isinstance(torch_model, InferenceBackend):
+        # Já montado sem PyTorch (ex: ONNX ou NumPy direto do bundle)
+        return torch_model
+
+    settings = get_settings()
+    backend = settings.INFERENCE_BACKEND.lower()
+
+    if backend == "onnx":
+        onnx_backend = _load_onnx_backend(version)
+        if onnx_backend is None:
+            print("Usando backend torch.")
+            return torch_model
+        return onnx_backend
+
+    if backend == "numpy":
+        return _load_numpy_backend(torch_model, version)
+
+    if backend != "torch":
+        print(f"Aviso: backend de inferência desconhecido '{backend}'. Usando backend torch.")
+    if settings.USE_QUANTIZED_MODEL:
+        return _load_quantized_or_float(torch_model, version)
+    return torch_model
+
+
+def _load_quantized_or_float(torch_model: Any, version: Optional[str] = None) -> Any:
+    """
+    Carrega a variante int8 do modelo, se ela existir.
+
+    Args:
+        torch_model (Any): Modelo PyTorch float32 já carregado.
+        version (str, opcional): Versão dos pesos em serviço. Se informada, a
+            variante só é usada se tiver sido gerada desses mesmos pesos.
+
+    Returns:
+        Any: Modelo quantizado, ou o modelo float32 se a variante não estiver disponível.
+    """
+    from src.lstm_model import LSTMModel
+
+    if not isinstance(torch_model, LSTMModel) or not os.path.exists(QUANTIZED_MODEL_PATH):
+        print(f"Aviso: variante int8 indisponível ({QUANTIZED_MODEL_PATH}). Usando modelo float32.")
+        return torch_model
+    if version is not None and not artifact_matches_version(QUANTIZED_MODEL_PATH, version):
+        print(f"Aviso: {QUANTIZED_MODEL_PATH} não corresponde ao modelo em serviço (versão {version}). Usando modelo float32.")
+        return torch_model
+    try:
+        from src.quantization import load_quantized_model
+        quantized = load_quantized_model(torch_model, QUANTIZED_MODEL_PATH)
+    except Exception as e:
+        print(f"Aviso: não foi possível carregar o modelo int8 ({e}). Usando modelo float32.")
+        return torch_model
+    print(f"Modelo int8 carregado de {QUANTIZED_MODEL_PATH}")
+    return quantized
@@ -0,0 +1,170 @@
+"""
+Módulo de micro-batching dinâmico para inferência.
+
+Requisições /predict concorrentes que chegam dentro de uma pequena janela de
+tempo (ou até atingir o tamanho máximo de lote) são agrupadas e avaliadas em
+um único forward do modelo. Cada chamador recebe o resultado da sua janela
+por meio de um future, sem alterar o contrato da API.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.utils.executors import run_stage
+
+# (model, scaler, janela de preços, future do chamador)
+_PendingItem = Tuple[Any, Any, List[float], asyncio.Future]
+
+
+class InferenceBatcher:
+    """
+    Agrupa predições concorrentes em lotes para um único forward.
+
+    Um worker é iniciado sob demanda quando há itens na fila e encerra quando
+    ela esvazia, portanto nenhuma tarefa fica ativa com o servidor ocioso.
+    Itens de modelos diferentes (ex: durante um hot-reload) nunca são
+    misturados no mesmo forward.
+
+    Atributos:
+        max_batch_size (int): Tamanho máximo de cada lote.
+        max_wait_s (float): Tempo máximo de espera por novos itens após o primeiro.
+        batches_run (int): Número de forwards executados.
+        items_processed (int): Número de predições atendidas.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[Any, Any, List[List[float]]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0
+    ) -> None:
+        """
+        Inicializa o batcher.
+
+        Args:
+            predict_fn (Callable): Função síncrona (model, scaler, windows) -> np.ndarray
+                que executa o forward em lote.
+            max_batch_size (int): Tamanho máximo do lote. Padrão: 32
+            max_wait_ms (float): Janela de coleta em milissegundos. Padrão: 2.0
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.batches_run = 0
+        self.items_processed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, model: Any, scaler: Any, window: List[float]) -> float:
+        """
+        Enfileira uma janela e aguarda a predição do lote correspondente.
+
+        Args:
+            model (Any): Modelo a ser usado.
+            scaler (Any): Scaler correspondente ao modelo.
+            window (List[float]): Janela com 60 preços.
+
+        Returns:
+            float: Preço previsto para a janela.
+        """
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            # Fila e worker pertencem ao event loop em que foram criados
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+
+        future = loop.create_future()
+        self._queue.put_nowait((model, scaler, window, future))
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        """Coleta e processa lotes enquanto houver itens na fila."""
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            deadline = loop.time() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._process(batch)
+
+    async def _process(self, batch: List[_PendingItem]) -> None:
+        """
+        Executa um forward por modelo presente no lote e resolve os futures.
+
+        Args:
+            batch (List[_PendingItem]): Itens coletados.
+        """
+        groups: Dict[Tuple[int, int], List[_PendingItem]] = {}
+        for item in batch:
+            groups.setdefault((id(item[0]), id(item[1])), []).append(item)
+
+        for items in groups.values():
+            model, scaler = items[0][0], items[0][1]
+            try:
+                predictions = await run_stage("inference", self.predict_fn, model, scaler, [item[2] for item in items])
+            except Exception as e:
+                for item in items:
+                    if not item[3].done():
+                        item[3].set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.items_processed += len(items)
+            for item, price in zip(items, predictions):
+                if not item[3].done():
+                    item[3].set_result(float(price))
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Retorna estatísticas de uso do batcher.
+
+        Returns:
+            Dict[str, float]: Lotes executados, itens atendidos e tamanho médio do lote.
+        """
+        return {
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "avg_batch_size": self.items_processed / self.batches_run if self.batches_run else 0.0,
+        }
+
+
+_batcher: Optional[InferenceBatcher] = None
+
+
+def get_inference_batcher(predict_fn: Callable[[Any, Any, List[List[float]]], np.ndarray]) -> Optional[InferenceBatcher]:
+    """
+    Retorna o batcher global, criando-o na primeira chamada.
+
+    Args:
+        predict_fn (Callable): Função de forward em lote usada pelo batcher.
+
+    Returns:
+        Optional[InferenceBatcher]: O batcher, ou None se PREDICT_BATCHING_ENABLED for falso.
+    """
+    global _batcher
+    settings = get_settings()
+    if not settings.PREDICT_BATCHING_ENABLED:
+        return None
+    if _batcher is None:
+        _batcher = InferenceBatcher(
+            predict_fn,
+            max_batch_size=settings.PREDICT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.PREDICT_BATCH_WAIT_MS
+        )
+    return _batcher
@@ -0,0 +1,83 @@
+"""
+Módulo de carregamento do modelo de serviço a partir do bundle.
+
+O bundle (src/model_bundle.py) reúne pesos, configuração e parâmetros do
+scaler em um único arquivo, lido em uma passada e sem unpickling do sklearn.
+Usado pelo lifespan e pelo hot-reload do treino; se o bundle não existir ou
+for inválido, os chamadores recorrem aos artefatos legados
+(lstm_model.pth + model_config.json + scaler.pkl).
+
+Com MODEL_SHARED_WEIGHTS, os pesos em CPU são views do memmap do arquivo: os
+workers do uvicorn que carregam o mesmo bundle compartilham uma única cópia
+física no page cache em vez de uma cópia privada cada. Com
+INFERENCE_BACKEND=onnx ou numpy, o backend é montado direto do bundle (sessão
+do onnxruntime ou NumpyLSTM), sem importar o PyTorch.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+
+MODEL_BUNDLE_PATH = "app/artifacts/model_bundle.lstmb"
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    Modelo de serviço carregado de um bundle.
+
+    Atributos:
+        model (Any): Modelo PyTorch em modo de avaliação (ou OnnxBackend/NumpyBackend).
+        scaler (ScalerParams): Parâmetros de normalização (transform/inverse_transform).
+        config (Dict[str, Any]): Configuração da arquitetura.
+        version (str): Identificador do modelo (hash dos pesos).
+        path (str): Arquivo de origem.
+        nbytes (int): Tamanho dos pesos em bytes (usado no limite de memória do registro).
+    """
+
+    model: Any
+    scaler: Any
+    config: Dict[str, Any]
+    version: str
+    path: str
+    nbytes: int = 0
+
+
+def load_serving_bundle(
+    path: str = MODEL_BUNDLE_PATH,
+    device: Any = "cpu",
+    share_weights: Optional[bool] = None
+) -> Optional[LoadedModel]:
+    """
+    Carrega o modelo de serviço a partir do bundle, se disponível.
+
+    Args:
+        path (str): Caminho do bundle. Padrão: MODEL_BUNDLE_PATH
+        device (Any): Dispositivo de inferência. Padrão: "cpu"
+        share_weights (bool, opcional): Mantém os pesos mapeados do arquivo
+            (compartilhados entre processos). Padrão: MODEL_SHARED_WEIGHTS.
+
+    Returns:
+        Optional[LoadedModel]: Modelo, scaler e versão, ou None se o bundle não
+            existir ou não puder ser carregado.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        from src.model_bundle import load_bundle, bundle_to_torch_model
+
+        if share_weights is None:
+            share_weights = get_settings().MODEL_SHARED_WEIGHTS
+        bundle = load_bundle(path)
+        from app.utils.inference_backend import load_torchless_backend
+        # Backends onnx/numpy não precisam do LSTMModel: o PyTorch não é importado
+        model = load_torchless_backend(bundle.version, bundle)
+        if model is None:
+            model = bundle_to_torch_model(bundle, device, share_weights=share_weights)
+    except Exception as e:
+        print(f"Aviso: não foi possível carregar o bundle {path} ({e}).")
+        return None
+    nbytes = sum(int(array.nbytes) for array in bundle.tensors.values())
+    return LoadedModel(model=model, scaler=bundle.scaler, config=bundle.config, version=bundle.version, path=path, nbytes=nbytes)
@@ -0,0 +1,129 @@
+"""
+Módulo de carregamento do modelo em segundo plano.
+
+Carregar o modelo (possivelmente baixando do HuggingFace), o scaler e
+executar o warmup antes de a API começar a escutar atrasa a inicialização, e
+um hub lento trava o boot. O carregador roda essas etapas em uma thread
+enquanto a API já aceita tráfego: /health responde, /train funciona e
+/predict retorna 503 com Retry-After até o snapshot ser publicado. O tempo de
+cada fase é registrado em log.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.serving_state import ServingState, publish_serving_state_if
+from src.resource_tracker import ResourceTracker
+
+
+class BackgroundModelLoader:
+    """
+    Carrega e publica o snapshot de serviço fora do caminho de inicialização.
+
+    Atributos:
+        status (str): "idle", "loading", "loaded" ou "failed".
+        error (str, opcional): Mensagem de erro, se o carregamento falhou.
+        phase_durations (Dict[str, float]): Tempo de parede (s) de cada fase.
+    """
+
+    def __init__(self) -> None:
+        """Inicializa o carregador ocioso."""
+        self.status = "idle"
+        self.error: Optional[str] = None
+        self.phase_durations: Dict[str, float] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def loading(self) -> bool:
+        """Indica se um carregamento está em andamento."""
+        return self.status == "loading"
+
+    def start(self, settings: Any, load_fn: Callable[[ResourceTracker], ServingState]) -> asyncio.Task:
+        """
+        Inicia o carregamento em uma thread e retorna imediatamente.
+
+        Args:
+            settings (Any): Instância de Settings onde o snapshot será publicado.
+            load_fn (Callable): Função bloqueante que recebe um ResourceTracker
+                (para medir as fases) e retorna o snapshot carregado.
+
+        Returns:
+            asyncio.Task: Tarefa que publica o snapshot ao terminar.
+        """
+        self.status = "loading"
+        self.error = None
+        self.phase_durations = {}
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+        # Snapshot visto no início: o resultado só é publicado se ninguém publicou depois
+        expected = getattr(settings, "SERVING_STATE", None)
+        self._task = asyncio.get_running_loop().create_task(self._run(settings, load_fn, expected))
+        return self._task
+
+    async def _run(self, settings: Any, load_fn: Callable[[ResourceTracker], ServingState], expected: Any) -> None:
+        """Executa `load_fn` no executor padrão e publica o resultado."""
+        tracker = ResourceTracker()
+        try:
+            state = await asyncio.get_running_loop().run_in_executor(None, load_fn, tracker)
+            if not state.ready:
+                # load_fn captura os próprios erros para a API subir sem modelo
+                raise RuntimeError("modelo ou scaler não carregado (veja o log do carregamento)")
+            if not publish_serving_state_if(settings, state, expected):
+                print("Snapshot carregado descartado: um modelo mais novo foi publicado durante o carregamento.")
+            self.status = "loaded"
+        except Exception as e:
+            print(f"Erro no carregamento do modelo em segundo plano: {e}")
+            # Um snapshot vazio nunca substitui um modelo pronto
+            if not (isinstance(expected, ServingState) and expected.ready):
+                publish_serving_state_if(settings, ServingState(), expected)
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self._finished_at = time.perf_counter()
+            self.phase_durations = {name: round(duration, 4) for name, duration in tracker.stage_durations.items()}
+            print(f"Carregamento do modelo: {self.status} em {self._finished_at - self._started_at:.3f}s. "
+                  f"Fases (s): {self.phase_durations}")
+
+    def stop(self) -> None:
+        """Cancela um carregamento em andamento (desligamento da API): nada é publicado."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.status = "idle"
+
+    async def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Aguarda o fim do carregamento em andamento, se houver.
+
+        Args:
+            timeout (float, opcional): Tempo máximo de espera em segundos.
+        """
+        if self._task is not None:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do carregamento.
+
+        Returns:
+            Dict[str, Any]: Status, tempo decorrido (s), fases e erro.
+        """
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        return {
+            "status": self.status,
+            "elapsed_s": elapsed,
+            "phases_s": dict(self.phase_durations),
+            "error": self.error
+        }
+
+
+_loader = BackgroundModelLoader()
+
+
+def get_model_loader() -> BackgroundModelLoader:
+    """Retorna o carregador global do modelo de serviço."""
+    return _loader
@@ -0,0 +1,257 @@
+"""
+Módulo do registro de modelos por símbolo.
+
+Cada símbolo treinado tem o seu bundle em app/artifacts/models/<SÍMBOLO>.lstmb.
+O registro carrega o bundle de um símbolo no primeiro uso e mantém os mais
+usados residentes, com despejo LRU limitado por quantidade e por memória. Um
+bundle regravado pelo treino (mtime diferente) é recarregado no acesso
+seguinte. Sem bundle local, o símbolo pode vir do HuggingFace Hub
+(app/utils/model_store.py). Símbolos sem bundle próprio usam o modelo global
+(Settings.MODEL). Como o modelo global, cada modelo entra no registro já no
+backend configurado (INFERENCE_BACKEND) e aquecido. Requisições simultâneas
+de um símbolo ainda não residente esperam um único carregamento
+(single-flight por símbolo), como app/utils/single_flight.py faz com os
+downloads.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.utils.inference_backend import load_serving_model
+from app.utils.model_loader import LoadedModel, load_serving_bundle
+from app.utils.model_store import get_model_store
+from app.utils.serving_state import ServingState, notify_serving_model_changed
+from app.utils.warmup import warm_serving_state
+from src.model_bundle import symbol_bundle_path
+
+
+def load_registry_model(path: str) -> Optional[LoadedModel]:
+    """
+    Carrega o bundle de um símbolo no backend configurado e o aquece.
+
+    Args:
+        path (str): Caminho do bundle.
+
+    Returns:
+        Optional[LoadedModel]: Modelo pronto para servir, ou None se o bundle
+            não puder ser carregado.
+    """
+    loaded = load_serving_bundle(path)
+    if loaded is None:
+        return None
+    state = ServingState(
+        model=load_serving_model(loaded.model, version=loaded.version),
+        scaler=loaded.scaler,
+        config=loaded.config,
+        version=loaded.version
+    )
+    # Aquecido antes de entrar no registro: a primeira requisição do símbolo não paga o custo
+    state = warm_serving_state(state)
+    return replace(loaded, model=state.model)
+
+
+class ModelRegistry:
+    """
+    Registro thread-safe de modelos por símbolo com residência LRU.
+
+    Atributos:
+        models_dir (str): Diretório dos bundles por símbolo.
+        max_models (int): Número máximo de modelos residentes.
+        max_bytes (int): Memória máxima (pesos) dos modelos residentes.
+    """
+
+    def __init__(
+        self,
+        models_dir: str,
+        max_models: int = 8,
+        max_bytes: int = 256 * 1024 * 1024,
+        loader: Callable[[str], Optional[LoadedModel]] = load_registry_model,
+        resolver: Optional[Callable[[str], Optional[str]]] = None
+    ) -> None:
+        """
+        Inicializa o registro vazio.
+
+        Args:
+            models_dir (str): Diretório dos bundles por símbolo.
+            max_models (int): Número máximo de modelos residentes. Padrão: 8
+            max_bytes (int): Limite de memória dos pesos residentes. Padrão: 256 MB
+            loader (Callable): Função que carrega o bundle de um caminho.
+            resolver (Callable, opcional): Fonte alternativa para símbolos sem
+                bundle local; recebe o símbolo e retorna o caminho do bundle ou None.
+        """
+        self.models_dir = models_dir
+        self.max_models = max(1, max_models)
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._resolver = resolver
+        # símbolo -> (modelo carregado, mtime do bundle)
+        self._entries: "OrderedDict[str, Tuple[LoadedModel, int]]" = OrderedDict()
+        # símbolo -> (caminho, mtime, carregamento em andamento)
+        self._loading: Dict[str, Tuple[str, int, "Future[Optional[LoadedModel]]"]] = {}
+        self._resident_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._shared_loads = 0
+        self._evictions = 0
+
+    def get(self, symbol: str) -> Optional[LoadedModel]:
+        """
+        Retorna o modelo do símbolo, carregando o bundle no primeiro uso.
+
+        Args:
+            symbol (str): Símbolo da ação (ex: AAPL).
+
+        Returns:
+            Optional[LoadedModel]: Modelo, scaler e versão do símbolo, ou None se
+                o símbolo não tiver bundle próprio.
+        """
+        key = symbol.strip().upper()
+        path = symbol_bundle_path(key, self.models_dir)
+        if self._resolver is not None and not os.path.exists(path):
+            # Bundles treinados localmente têm prioridade sobre os do Hub
+            path = self._resolver(key) or path
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._misses += 1
+                self._drop(key)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == mtime:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            inflight = self._loading.get(key)
+            if inflight is not None and inflight[:2] == (path, mtime):
+                # Mesmo bundle já carregando: espera o resultado (ou a exceção) dele
+                self._shared_loads += 1
+                future = inflight[2]
+            else:
+                future = Future()
+                self._loading[key] = (path, mtime, future)
+                inflight = None
+        if inflight is not None:
+            return future.result()
+
+        try:
+            # Carrega fora do lock: leituras de outros símbolos não esperam o disco
+            loaded = self._loader(path)
+        except BaseException as e:
+            with self._lock:
+                self._forget_loading(key, future)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if loaded is not None:
+                self._drop(key)
+                self._entries[key] = (loaded, mtime)
+                self._resident_bytes += loaded.nbytes
+                self._loads += 1
+                self._evict()
+            self._forget_loading(key, future)
+        future.set_result(loaded)
+        if loaded is not None:
+            print(f"Modelo de {key} carregado no registro (versão {loaded.version}).")
+        return loaded
+
+    def _forget_loading(self, key: str, future: "Future[Optional[LoadedModel]]") -> None:
+        """Libera o símbolo para um novo carregamento, se `future` ainda for o dele (chamado com o lock adquirido)."""
+        inflight = self._loading.get(key)
+        if inflight is not None and inflight[2] is future:
+            del self._loading[key]
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        Remove um símbolo (ou todos) dos modelos residentes.
+
+        Args:
+            symbol (str, opcional): Símbolo a remover. Se None, limpa o registro.
+        """
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                self._resident_bytes = 0
+            else:
+                self._drop(symbol.strip().upper())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas do registro.
+
+        Returns:
+            Dict[str, Any]: Modelos residentes, memória, acertos, carregamentos,
+                esperas por um carregamento em andamento e despejos.
+        """
+        with self._lock:
+            return {
+                "resident_models": list(self._entries.keys()),
+                "resident_bytes": self._resident_bytes,
+                "max_models": self.max_models,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "loads": self._loads,
+                "shared_loads": self._shared_loads,
+                "loading": sorted(self._loading),
+                "evictions": self._evictions
+            }
+
+    def _drop(self, key: str) -> None:
+        """Remove uma entrada (chamado com o lock adquirido)."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._resident_bytes -= entry[0].nbytes
+
+    def _evict(self) -> None:
+        """Despeja os menos usados até respeitar os limites, mantendo ao menos um."""
+        while len(self._entries) > 1 and (len(self._entries) > self.max_models or self._resident_bytes > self.max_bytes):
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._resident_bytes -= evicted.nbytes
+            self._evictions += 1
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> Optional[ModelRegistry]:
+    """
+    Retorna o registro global de modelos por símbolo, criando-o na primeira chamada.
+
+    Returns:
+        Optional[ModelRegistry]: O registro, ou None se MODEL_REGISTRY_ENABLED for falso.
+    """
+    global _registry
+    settings = get_settings()
+    if not settings.MODEL_REGISTRY_ENABLED:
+        return None
+    with _registry_lock:
+        if _registry is None:
+            store = get_model_store()
+            _registry = ModelRegistry(
+                models_dir=settings.MODEL_REGISTRY_DIR,
+                max_models=settings.MODEL_REGISTRY_MAX_MODELS,
+                max_bytes=int(settings.MODEL_REGISTRY_MAX_MB * 1024 * 1024),
+                resolver=store.resolve if store is not None else None
+            )
+    return _registry
+
+
+def invalidate_model_registry(symbol: Optional[str] = None) -> None:
+    """Remove um símbolo (ou todos) do registro global, se existir."""
+    if _registry is not None:
+        _registry.invalidate(symbol)
+        # O modelo que atende o símbolo mudou para quem guarda resultados derivados
+        notify_serving_model_changed()
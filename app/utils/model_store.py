@@ -0,0 +1,279 @@
+"""
+Módulo do repositório de modelos por símbolo no HuggingFace Hub com cache em disco.
+
+Símbolos sem bundle treinado localmente podem ter o bundle publicado no Hub
+(`<MODEL_STORE_PREFIX>/<SÍMBOLO>.lstmb` em MODEL_STORE_REPO_ID). O
+repositório baixa o bundle no primeiro uso do símbolo, confere a integridade
+(sha256 dos tensores registrado no cabeçalho) e o guarda em um cache local
+limitado por tamanho, com despejo dos bundles usados há mais tempo. O cache é
+consultado antes da rede: com o Hub fora do ar ou em modo offline, os
+símbolos já baixados continuam sendo servidos.
+
+O download nunca bloqueia /predict: no primeiro pedido de um símbolo ele
+roda em uma thread e, até terminar, o símbolo é atendido pelo modelo global.
+A integridade é conferida uma única vez, nessa thread, ao instalar o bundle
+(recém-baixado ou já presente no disco, ex: de outro worker); depois disso,
+cada requisição apenas consulta um dicionário em memória, que também guarda a
+ordem de uso para o despejo, e confere que o arquivo ainda existe (outro
+worker pode tê-lo despejado).
+"""
+
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.config import get_settings
+from src.model_bundle import load_bundle, symbol_bundle_path
+
+
+class HubModelStore:
+    """
+    Resolve bundles por símbolo a partir do HuggingFace Hub, com cache local.
+
+    Atributos:
+        repo_id (str): Repositório do Hub com os bundles.
+        cache_dir (str): Diretório do cache local de bundles.
+        max_bytes (int): Tamanho máximo do cache em disco.
+        offline (bool): Se True, usa apenas o cache (nunca acessa a rede).
+    """
+
+    def __init__(
+        self,
+        repo_id: str,
+        cache_dir: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        offline: bool = False,
+        prefix: str = "models",
+        revision: Optional[str] = None,
+        miss_ttl_s: float = 600.0,
+        downloader: Optional[Callable[..., str]] = None
+    ) -> None:
+        """
+        Inicializa o repositório.
+
+        Args:
+            repo_id (str): Repositório do Hub com os bundles.
+            cache_dir (str): Diretório do cache local.
+            max_bytes (int): Tamanho máximo do cache. Padrão: 1 GB
+            offline (bool): Usa apenas o cache. Padrão: False
+            prefix (str): Pasta dos bundles no repositório. Padrão: "models"
+            revision (str, opcional): Branch, tag ou commit do repositório.
+            miss_ttl_s (float): Tempo (s) sem tentar de novo um símbolo ausente
+                no Hub ou uma falha de rede. Padrão: 600
+            downloader (Callable, opcional): Função de download com a assinatura
+                de huggingface_hub.hf_hub_download. Padrão: hf_hub_download.
+        """
+        self.repo_id = repo_id
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.prefix = prefix.strip("/")
+        self.revision = revision
+        self.miss_ttl_s = miss_ttl_s
+        self._downloader = downloader
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._failures: Dict[str, float] = {}
+        # caminho -> tamanho dos bundles verificados, do usado há mais tempo ao mais recente
+        self._installed: "OrderedDict[str, int]" = OrderedDict()
+        self._downloads = 0
+        self._cache_hits = 0
+        self._rejected = 0
+        self._evictions = 0
+
+    def resolve(self, symbol: str, wait: bool = False) -> Optional[str]:
+        """
+        Retorna o caminho local do bundle de um símbolo, buscando-o no Hub se preciso.
+
+        Args:
+            symbol (str): Símbolo da ação (ex: AAPL).
+            wait (bool): Se True, baixa na thread atual e aguarda. Se False,
+                agenda o download em segundo plano e retorna None. Padrão: False
+
+        Returns:
+            Optional[str]: Caminho do bundle íntegro no cache, ou None se ainda
+                não estiver disponível.
+        """
+        key = symbol.strip().upper()
+        path = symbol_bundle_path(key, self.cache_dir)
+        with self._lock:
+            if path in self._installed:
+                # Caminho quente: só um stat, sem ler nem verificar o bundle
+                if os.path.exists(path):
+                    self._installed.move_to_end(path)
+                    self._cache_hits += 1
+                    return path
+                # Removido por outro worker (despejo) ou pelo operador: baixa de novo
+                del self._installed[path]
+            failed_at = self._failures.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < self.miss_ttl_s:
+                return None
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+
+        if wait:
+            return self._fetch(key)
+        threading.Thread(target=self._fetch, args=(key,), name=f"hub-fetch-{key}", daemon=True).start()
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas do repositório.
+
+        Returns:
+            Dict[str, Any]: Bundles e bytes no cache, downloads, acertos, rejeições e despejos.
+        """
+        files = self._cached_files()
+        with self._lock:
+            return {
+                "repo_id": self.repo_id,
+                "offline": self.offline,
+                "cached_symbols": sorted(os.path.basename(path)[:-len(".lstmb")] for path in files),
+                "cached_bytes": sum(os.path.getsize(path) for path in files),
+                "max_bytes": self.max_bytes,
+                "downloads": self._downloads,
+                "cache_hits": self._cache_hits,
+                "rejected": self._rejected,
+                "evictions": self._evictions,
+                "pending": sorted(self._pending)
+            }
+
+    def _fetch(self, key: str) -> Optional[str]:
+        """Verifica o bundle já em cache ou o baixa, e o instala no cache."""
+        staging_dir = os.path.join(self.cache_dir, ".staging", key)
+        path = symbol_bundle_path(key, self.cache_dir)
+        try:
+            if os.path.exists(path) and self._verify_cached(path):
+                self._install(key, path)
+                return path
+            if self.offline:
+                raise FileNotFoundError(f"{path} não está no cache (modo offline)")
+            downloaded = self._download(key, staging_dir)
+            # Integridade: sha256 dos tensores confere com o cabeçalho
+            load_bundle(downloaded, mmap=False, verify=True)
+            os.replace(downloaded, path)
+            with self._lock:
+                self._downloads += 1
+            print(f"Bundle de {key} baixado do Hub ({self.repo_id}).")
+            self._install(key, path)
+            self._evict(keep=path)
+            return path
+        except ValueError as e:
+            print(f"Aviso: bundle de {key} no Hub rejeitado ({e}).")
+            with self._lock:
+                self._rejected += 1
+                self._failures[key] = time.monotonic()
+            return None
+        except Exception as e:
+            print(f"Aviso: bundle de {key} indisponível no Hub ({e}).")
+            with self._lock:
+                self._failures[key] = time.monotonic()
+            return None
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            with self._lock:
+                self._pending.discard(key)
+
+    def _download(self, key: str, staging_dir: str) -> str:
+        """Baixa o bundle para o diretório temporário e retorna o caminho do arquivo."""
+        downloader = self._downloader
+        if downloader is None:
+            from huggingface_hub import hf_hub_download
+            downloader = hf_hub_download
+        os.makedirs(staging_dir, exist_ok=True)
+        filename = os.path.basename(symbol_bundle_path(key, ""))
+        if self.prefix:
+            filename = f"{self.prefix}/{filename}"
+        return downloader(repo_id=self.repo_id, filename=filename, revision=self.revision, local_dir=staging_dir)
+
+    def _verify_cached(self, path: str) -> bool:
+        """Confere a integridade de um bundle já no disco, removendo-o se estiver corrompido."""
+        try:
+            load_bundle(path, mmap=False, verify=True)
+        except Exception as e:
+            print(f"Aviso: bundle em cache {path} corrompido, removendo ({e}).")
+            with self._lock:
+                self._rejected += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _install(self, key: str, path: str) -> None:
+        """Registra em memória um bundle verificado como o usado mais recentemente."""
+        size = os.path.getsize(path)
+        with self._lock:
+            self._installed[path] = size
+            self._installed.move_to_end(path)
+            self._failures.pop(key, None)
+
+    def _cached_files(self) -> List[str]:
+        """Lista os bundles presentes no cache."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        return [os.path.join(self.cache_dir, name) for name in names if name.endswith(".lstmb")]
+
+    def _evict(self, keep: str) -> None:
+        """Remove os bundles usados há mais tempo até o cache caber em max_bytes."""
+        sizes = {}
+        for path in self._cached_files():
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                continue
+        with self._lock:
+            used = [path for path in self._installed if path in sizes]
+        # Arquivos ainda não usados por este processo saem primeiro, depois a ordem LRU
+        candidates = [path for path in sizes if path not in set(used)] + used
+        total = sum(sizes.values())
+        for path in candidates:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                # Workers que já mapearam o arquivo continuam válidos (mmap mantém o inode)
+                os.remove(path)
+            except OSError:
+                continue
+            total -= sizes[path]
+            with self._lock:
+                self._installed.pop(path, None)
+                self._evictions += 1
+
+
+_store: Optional[HubModelStore] = None
+_store_lock = threading.Lock()
+
+
+def get_model_store() -> Optional[HubModelStore]:
+    """
+    Retorna o repositório global de bundles do Hub, criando-o na primeira chamada.
+
+    Returns:
+        Optional[HubModelStore]: O repositório, ou None se MODEL_STORE_ENABLED for falso.
+    """
+    global _store
+    settings = get_settings()
+    if not settings.MODEL_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = HubModelStore(
+                repo_id=settings.MODEL_STORE_REPO_ID or settings.MODEL_REPO_ID,
+                cache_dir=settings.MODEL_STORE_CACHE_DIR,
+                max_bytes=int(settings.MODEL_STORE_MAX_MB * 1024 * 1024),
+                offline=settings.MODEL_STORE_OFFLINE,
+                prefix=settings.MODEL_STORE_PREFIX,
+                revision=settings.MODEL_STORE_REVISION or None,
+                miss_ttl_s=settings.MODEL_STORE_MISS_TTL_S
+            )
+    return _store
@@ -0,0 +1,183 @@
+"""
+Módulo de cache de predições por símbolo.
+
+Painéis consultam /predict com o mesmo símbolo e período milhares de vezes
+por dia. O cache guarda o preço previsto por (símbolo, período, versão do
+modelo) com política LRU e tempo de vida (TTL), evitando baixar os dados e
+rodar o modelo novamente. Como a versão do modelo faz parte da chave, e o
+cache é limpo no hot-reload, predições de um modelo antigo nunca são servidas.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.config import get_settings
+
+
+def compute_model_version(model_path: str) -> Optional[str]:
+    """
+    Calcula a versão do modelo a partir do conteúdo do arquivo de pesos.
+
+    Args:
+        model_path (str): Caminho do arquivo de pesos (.pth).
+
+    Returns:
+        Optional[str]: Prefixo do SHA-256 do arquivo, ou None se não puder ser lido.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()[:16]
+
+
+def make_prediction_key(
+    symbol: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    model_version: Hashable
+) -> Tuple[str, Optional[str], Optional[str], Hashable]:
+    """
+    Monta a chave do cache para uma predição por símbolo.
+
+    Args:
+        symbol (str): Símbolo da ação (normalizado para maiúsculas).
+        start_date (str, opcional): Data inicial do período.
+        end_date (str, opcional): Data final do período.
+        model_version (Hashable): Versão do modelo em serviço.
+
+    Returns:
+        Tuple: Chave (símbolo, início, fim, versão).
+    """
+    return (symbol.strip().upper(), start_date, end_date, model_version)
+
+
+class PredictionCache:
+    """
+    Cache LRU com TTL, seguro para uso entre threads.
+
+    Atributos:
+        max_entries (int): Número máximo de entradas mantidas.
+        ttl_s (float): Tempo de vida de cada entrada, em segundos.
+        hits (int): Consultas atendidas pelo cache.
+        misses (int): Consultas sem entrada válida.
+        evictions (int): Entradas removidas por limite de tamanho.
+        invalidations (int): Número de limpezas completas (ex: hot-reload).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 300.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries (int): Número máximo de entradas. Padrão: 1024
+            ttl_s (float): Tempo de vida em segundos. Padrão: 300
+            clock (Callable): Relógio monotônico (substituível em testes).
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor em cache, se existir e não tiver expirado.
+
+        Args:
+            key (Hashable): Chave da predição.
+
+        Returns:
+            Optional[Any]: Valor armazenado ou None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Armazena um valor, removendo a entrada menos usada se necessário.
+
+        Args:
+            key (Hashable): Chave da predição.
+            value (Any): Valor a armazenar.
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Remove todas as entradas (usado quando um novo modelo é carregado)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Retorna estatísticas de uso do cache.
+
+        Returns:
+            Dict[str, float]: Tamanho, acertos, falhas, taxa de acerto e remoções.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache: Optional[PredictionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache() -> Optional[PredictionCache]:
+    """
+    Retorna o cache global de predições, criando-o na primeira chamada.
+
+    Returns:
+        Optional[PredictionCache]: O cache, ou None se PREDICT_CACHE_ENABLED for falso.
+    """
+    global _cache
+    settings = get_settings()
+    if not settings.PREDICT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PredictionCache(
+                max_entries=settings.PREDICT_CACHE_MAX_ENTRIES,
+                ttl_s=settings.PREDICT_CACHE_TTL_S
+            )
+    return _cache
+
+
+def invalidate_prediction_cache() -> None:
+    """Limpa o cache global, se existir. Chamado após o hot-reload do modelo."""
+    if _cache is not None:
+        _cache.invalidate()
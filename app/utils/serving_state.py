@@ -0,0 +1,145 @@
+"""
+Módulo do estado de serviço do modelo global.
+
+Modelo, scaler, configuração e versão formam um único snapshot imutável
+(ServingState). O hot-reload monta o snapshot novo por completo (modelo
+carregado e scaler correspondente) e o publica com uma única atribuição de
+referência, atômica no CPython. Quem atende requisições lê o snapshot uma vez
+e usa apenas os campos dele: nunca bloqueia e nunca combina o scaler novo com
+o modelo antigo.
+
+Quem guarda resultados derivados do modelo (ex: previsões diárias
+pré-calculadas) pode registrar um ouvinte para ser avisado quando o modelo em
+serviço mudar.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# Serializa as publicações: a leitura continua sem lock
+_publish_lock = threading.Lock()
+_listeners: List[Callable[[], None]] = []
+
+
+@dataclass(frozen=True)
+class ServingState:
+    """
+    Snapshot imutável do modelo em serviço.
+
+    Atributos:
+        model (Any): Modelo PyTorch ou backend de inferência (None se não carregado).
+        scaler (Any): Scaler correspondente ao modelo (MinMaxScaler ou ScalerParams).
+        config (Dict[str, Any], opcional): Configuração da arquitetura.
+        version (Any): Versão do modelo (hash dos pesos), usada nas chaves de cache.
+        warmup (Dict[str, Any], opcional): Relatório do warmup feito antes da publicação.
+    """
+
+    model: Any = None
+    scaler: Any = None
+    config: Optional[Dict[str, Any]] = None
+    version: Any = None
+    warmup: Optional[Dict[str, Any]] = None
+
+    @property
+    def ready(self) -> bool:
+        """Indica se modelo e scaler estão disponíveis para predição."""
+        return self.model is not None and self.scaler is not None
+
+
+def publish_serving_state(settings: Any, state: ServingState) -> None:
+    """
+    Publica um novo snapshot de serviço e, se ele estiver pronto, avisa os ouvintes.
+
+    Args:
+        settings (Any): Instância de Settings da aplicação.
+        state (ServingState): Snapshot completo a publicar.
+    """
+    with _publish_lock:
+        settings.SERVING_STATE = state
+    if state.ready:
+        notify_serving_model_changed()
+
+
+def publish_serving_state_if(settings: Any, state: ServingState, expected: Any) -> bool:
+    """
+    Publica o snapshot apenas se o atual ainda for `expected`.
+
+    Evita que um carregamento lento sobrescreva um snapshot publicado depois
+    dele (ex: hot-reload de um treino concluído durante o carregamento).
+
+    Args:
+        settings (Any): Instância de Settings da aplicação.
+        state (ServingState): Snapshot completo a publicar.
+        expected (Any): Snapshot visto quando o carregamento começou.
+
+    Returns:
+        bool: True se o snapshot foi publicado.
+    """
+    with _publish_lock:
+        if getattr(settings, "SERVING_STATE", None) is not expected:
+            return False
+        settings.SERVING_STATE = state
+    if state.ready:
+        notify_serving_model_changed()
+    return True
+
+
+def current_serving_state(settings: Any) -> ServingState:
+    """
+    Lê o snapshot de serviço atual (uma única leitura).
+
+    Objetos de configuração que expõem apenas MODEL/SCALER/MODEL_VERSION
+    (sem SERVING_STATE) são convertidos em um snapshot equivalente.
+
+    Args:
+        settings (Any): Instância de Settings da aplicação.
+
+    Returns:
+        ServingState: Snapshot em uso.
+    """
+    state = getattr(settings, "SERVING_STATE", None)
+    if isinstance(state, ServingState):
+        return state
+    return ServingState(
+        model=getattr(settings, "MODEL", None),
+        scaler=getattr(settings, "SCALER", None),
+        version=getattr(settings, "MODEL_VERSION", None)
+    )
+
+
+def add_serving_model_listener(listener: Callable[[], None]) -> None:
+    """
+    Registra uma função chamada sempre que o modelo em serviço mudar.
+
+    A função pode ser chamada de qualquer thread (o hot-reload publica a
+    partir da thread do treino) e não deve bloquear.
+
+    Args:
+        listener (Callable[[], None]): Função sem argumentos.
+    """
+    with _publish_lock:
+        _listeners.append(listener)
+
+
+def remove_serving_model_listener(listener: Callable[[], None]) -> None:
+    """
+    Remove um ouvinte registrado com add_serving_model_listener.
+
+    Args:
+        listener (Callable[[], None]): Função registrada.
+    """
+    with _publish_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def notify_serving_model_changed() -> None:
+    """Avisa os ouvintes de que o modelo em serviço (global ou de um símbolo) mudou."""
+    with _publish_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener()
+        except Exception as e:
+            print(f"Aviso: ouvinte de troca de modelo falhou ({e}).")
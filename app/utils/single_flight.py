@@ -0,0 +1,82 @@
+"""
+Módulo de coalescência de chamadas concorrentes (single-flight).
+
+Quando um símbolo popular recebe muitas requisições /predict ao mesmo tempo,
+cada uma dispararia seu próprio download no yfinance. Com o single-flight,
+chamadas concorrentes com a mesma chave aguardam uma única execução em
+andamento e compartilham seu resultado (ou exceção).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas assíncronas concorrentes com a mesma chave.
+
+    Apenas chamadas simultâneas são agrupadas: assim que a execução termina,
+    a chave é liberada e a próxima chamada executa novamente. O cancelamento
+    de um chamador não cancela a execução compartilhada com os demais.
+
+    Atributos:
+        executions (int): Número de execuções reais.
+        shared (int): Número de chamadas atendidas por uma execução em andamento.
+    """
+
+    def __init__(self) -> None:
+        """Inicializa o grupo sem execuções em andamento."""
+        self._inflight: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa `fn` ou aguarda a execução em andamento com a mesma chave.
+
+        Args:
+            key (Hashable): Chave que identifica chamadas equivalentes.
+            fn (Callable): Fábrica da corrotina a executar.
+
+        Returns:
+            Any: Resultado da execução compartilhada.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is loop and not entry[1].done():
+            self.shared += 1
+            return await asyncio.shield(entry[1])
+
+        task = loop.create_task(fn())
+        self._inflight[key] = (loop, task)
+        self.executions += 1
+        task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """
+        Libera a chave ao final da execução.
+
+        Args:
+            key (Hashable): Chave da execução.
+            task (asyncio.Task): Tarefa finalizada.
+        """
+        entry = self._inflight.get(key)
+        if entry is not None and entry[1] is task:
+            del self._inflight[key]
+        # Marca a exceção como consumida caso todos os chamadores tenham sido cancelados
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna estatísticas de uso.
+
+        Returns:
+            Dict[str, int]: Execuções reais, chamadas compartilhadas e execuções em andamento.
+        """
+        return {
+            "executions": self.executions,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,310 @@
+"""
+Módulo de inferência incremental com estado LSTM por símbolo.
+
+Em vez de reprocessar os 60 dias a cada /predict, o estado (h, c) do LSTM é
+mantido por símbolo. Quando a nova janela é a anterior deslocada em um dia
+(chegou um novo fechamento), o estado avança um único passo. A cada
+`resync_steps` passos incrementais (ou quando a janela não corresponde a um
+deslocamento), é feito um forward completo da janela de 60 dias.
+
+Note:
+    O estado incremental carrega informação anterior à janela de 60 dias
+    usada no treino, portanto a predição é uma aproximação do forward
+    completo. A ressincronização periódica limita esse desvio.
+
+Os estados ficam em um LRU limitado (PREDICT_STATEFUL_MAX_SYMBOLS). O lock de
+cada símbolo fica na mesma entrada do estado e sai junto com ele, mas uma
+entrada em uso por alguma requisição nunca é removida: outra requisição do
+mesmo símbolo sempre encontra o mesmo lock.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+
+
+@dataclass
+class SymbolState:
+    """
+    Estado LSTM mantido para um símbolo.
+
+    Atributos:
+        model_ref (weakref.ref): Referência ao modelo que gerou o estado.
+        window (List[float]): Última janela de preços processada.
+        state (Tuple[Any, Any]): Estado (h, c) do LSTM (tensores torch) após o último preço.
+        prediction (float): Última predição (desnormalizada).
+        steps_since_resync (int): Passos incrementais desde o último forward completo.
+    """
+
+    model_ref: "weakref.ref"
+    window: List[float]
+    state: Tuple[Any, Any]
+    prediction: float
+    steps_since_resync: int = 0
+
+
+@dataclass
+class _SymbolSlot:
+    """
+    Entrada do LRU: estado do símbolo e o lock que serializa suas predições.
+
+    Atributos:
+        lock (threading.Lock): Lock do símbolo.
+        users (int): Requisições usando a entrada (protegido pelo lock do preditor).
+        state (SymbolState, opcional): Último estado do símbolo.
+    """
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0
+    state: Optional[SymbolState] = None
+
+
+class StatefulPredictor:
+    """
+    Mantém o estado LSTM por símbolo e avança um passo por novo fechamento.
+
+    Seguro para uso a partir das threads do pool de inferência.
+
+    Atributos:
+        resync_steps (int): Passos incrementais antes de um forward completo.
+        max_symbols (int): Número máximo de símbolos com estado mantido.
+        full_forwards (int): Forwards completos (60 passos) executados.
+        incremental_steps (int): Atualizações de um único passo executadas.
+        reused (int): Predições devolvidas sem forward (janela inalterada).
+        evictions (int): Estados removidos por limite de tamanho.
+    """
+
+    def __init__(self, resync_steps: int = 20, max_symbols: int = 1024) -> None:
+        """
+        Inicializa o preditor sem estados.
+
+        Args:
+            resync_steps (int): Passos incrementais antes da ressincronização. Padrão: 20
+            max_symbols (int): Número máximo de símbolos com estado. Padrão: 1024
+        """
+        self.resync_steps = max(0, resync_steps)
+        self.max_symbols = max(1, max_symbols)
+        # _lock protege apenas o LRU e os contadores; o forward roda sob o
+        # lock do símbolo, então símbolos diferentes são processados em paralelo
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[Hashable, _SymbolSlot]" = OrderedDict()
+        self.full_forwards = 0
+        self.incremental_steps = 0
+        self.reused = 0
+        self.evictions = 0
+
+    @staticmethod
+    def supports(model: Any) -> bool:
+        """
+        Indica se o modelo expõe forward_with_state (LSTMModel, inclusive int8).
+
+        Args:
+            model (Any): Modelo em serviço.
+
+        Returns:
+            bool: True se o modo incremental pode ser usado.
+        """
+        from app.utils.inference_backend import InferenceBackend
+
+        # Backends sem PyTorch não têm estado exposto; evita importar torch para eles
+        if model is None or isinstance(model, InferenceBackend):
+            return False
+        from src.lstm_model import LSTMModel
+        return isinstance(model, LSTMModel)
+
+    def predict(self, key: Hashable, window: List[float], model: Any, scaler: Any) -> float:
+        """
+        Retorna a predição para a janela, avançando o estado quando possível.
+
+        Args:
+            key (Hashable): Identificador do símbolo.
+            window (List[float]): Janela com os 60 fechamentos mais recentes.
+            model (Any): LSTMModel em serviço.
+            scaler (Any): Scaler correspondente ao modelo.
+
+        Returns:
+            float: Preço previsto (desnormalizado).
+        """
+        window = [float(price) for price in window]
+        slot = self._acquire_slot(key)
+        try:
+            return self._predict_locked(slot, window, model, scaler)
+        finally:
+            self._release_slot(slot)
+
+    def _predict_locked(self, slot: _SymbolSlot, window: List[float], model: Any, scaler: Any) -> float:
+        """
+        Calcula a predição sob o lock do símbolo e atualiza o estado da entrada.
+
+        Args:
+            slot (_SymbolSlot): Entrada do símbolo (em uso por esta requisição).
+            window (List[float]): Janela com os 60 fechamentos mais recentes.
+            model (Any): LSTMModel em serviço.
+            scaler (Any): Scaler correspondente ao modelo.
+
+        Returns:
+            float: Preço previsto (desnormalizado).
+        """
+        # Requisições do mesmo símbolo são serializadas para o estado avançar em ordem
+        with slot.lock:
+            entry = slot.state
+            if entry is not None and entry.model_ref() is not model:
+                entry = None
+
+            if entry is not None and entry.window == window:
+                with self._lock:
+                    self.reused += 1
+                return entry.prediction
+
+            advance = (
+                entry is not None
+                and entry.window[1:] == window[:-1]
+                and entry.steps_since_resync < self.resync_steps
+            )
+            if advance:
+                # Novo fechamento: um único passo a partir do estado anterior
+                prediction, state = self._forward(model, scaler, window[-1:], entry.state)
+                steps = entry.steps_since_resync + 1
+            else:
+                prediction, state = self._forward(model, scaler, window, None)
+                steps = 0
+
+            with self._lock:
+                if advance:
+                    self.incremental_steps += 1
+                else:
+                    self.full_forwards += 1
+            slot.state = SymbolState(weakref.ref(model), window, state, prediction, steps)
+            return prediction
+
+    def _acquire_slot(self, key: Hashable) -> _SymbolSlot:
+        """
+        Retorna a entrada do símbolo (criando-a se preciso) marcada como em uso.
+
+        Args:
+            key (Hashable): Identificador do símbolo.
+
+        Returns:
+            _SymbolSlot: Entrada do símbolo; liberar com _release_slot.
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _SymbolSlot()
+            else:
+                self._slots.move_to_end(key)
+            slot.users += 1
+            self._evict()
+            return slot
+
+    def _release_slot(self, slot: _SymbolSlot) -> None:
+        """
+        Marca a entrada como livre e aplica o limite de tamanho.
+
+        Args:
+            slot (_SymbolSlot): Entrada obtida com _acquire_slot.
+        """
+        with self._lock:
+            slot.users -= 1
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove as entradas livres menos usadas até respeitar max_symbols (chamar com _lock)."""
+        excess = len(self._slots) - self.max_symbols
+        if excess <= 0:
+            return
+        # Entradas em uso ficam: o lock delas pode estar com outra requisição
+        for key in [key for key, slot in self._slots.items() if slot.users == 0][:excess]:
+            del self._slots[key]
+            self.evictions += 1
+
+    @staticmethod
+    def _forward(
+        model: Any,
+        scaler: Any,
+        prices: List[float],
+        state: Optional[Tuple[Any, Any]]
+    ) -> Tuple[float, Tuple[Any, Any]]:
+        """
+        Executa forward_with_state sobre os preços informados.
+
+        Args:
+            model (Any): LSTMModel em serviço.
+            scaler (Any): Scaler correspondente.
+            prices (List[float]): Preços a processar (1 ou 60).
+            state (Tuple, opcional): Estado (h, c) inicial.
+
+        Returns:
+            Tuple[float, Tuple]: Predição desnormalizada e novo estado.
+        """
+        import torch
+
+        normalized = np.asarray(scaler.transform(np.array(prices, dtype=np.float64).reshape(-1, 1)), dtype=np.float32)
+        first_param = next(model.parameters(), None)
+        device = first_param.device if first_param is not None else torch.device("cpu")
+        input_tensor = torch.from_numpy(normalized).view(1, len(prices), 1).to(device)
+
+        with torch.no_grad():
+            predicted_scaled, new_state = model.forward_with_state(input_tensor, state)
+
+        predicted = scaler.inverse_transform(np.asarray(predicted_scaled.cpu().numpy()).reshape(-1, 1))
+        return float(np.asarray(predicted).reshape(-1)[0]), new_state
+
+    def clear(self) -> None:
+        """
+        Remove todos os estados (ex: após a troca do modelo).
+
+        Entradas em uso são mantidas com o mesmo lock e sem estado; se a
+        requisição em andamento gravar o estado do modelo antigo, ele é
+        descartado na próxima predição pela verificação do modelo.
+        """
+        with self._lock:
+            for key, slot in list(self._slots.items()):
+                slot.state = None
+                if slot.users == 0:
+                    del self._slots[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna estatísticas de uso.
+
+        Returns:
+            Dict[str, int]: Símbolos com estado, forwards completos, passos
+                incrementais, reaproveitamentos e remoções por limite de tamanho.
+        """
+        with self._lock:
+            return {
+                "symbols": sum(1 for slot in self._slots.values() if slot.state is not None),
+                "full_forwards": self.full_forwards,
+                "incremental_steps": self.incremental_steps,
+                "reused": self.reused,
+                "evictions": self.evictions,
+            }
+
+
+_predictor: Optional[StatefulPredictor] = None
+
+
+def get_stateful_predictor() -> Optional[StatefulPredictor]:
+    """
+    Retorna o preditor incremental global, criando-o na primeira chamada.
+
+    Returns:
+        Optional[StatefulPredictor]: O preditor, ou None se PREDICT_STATEFUL_ENABLED for falso.
+    """
+    global _predictor
+    settings = get_settings()
+    if not settings.PREDICT_STATEFUL_ENABLED:
+        return None
+    if _predictor is None:
+        _predictor = StatefulPredictor(
+            resync_steps=settings.PREDICT_STATEFUL_RESYNC_STEPS,
+            max_symbols=settings.PREDICT_STATEFUL_MAX_SYMBOLS
+        )
+    return _predictor
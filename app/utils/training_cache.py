@@ -0,0 +1,146 @@
+"""
+Módulo de cache de resultados de treinamento.
+
+Como o treinamento é determinístico para uma mesma seed, duas requisições
+idênticas (mesmo símbolo, período, hiperparâmetros e seed) sobre o mesmo
+snapshot de dados produzem o mesmo modelo. Este módulo calcula uma impressão
+digital (fingerprint) da requisição e mantém o mapeamento fingerprint -> job,
+permitindo reaproveitar resultados já concluídos e anexar requisições
+concorrentes ao job que já está em execução.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Container, Dict, Optional
+
+
+def compute_data_snapshot(start_date: str, end_date: str, today: Optional[date] = None) -> str:
+    """
+    Identifica o snapshot de dados utilizado por um treinamento.
+
+    Intervalos totalmente no passado são imutáveis no Yahoo Finance. Quando
+    `end_date` alcança o dia atual, novos pregões entram nos dados a cada dia,
+    então o snapshot passa a ser limitado pela data de hoje.
+
+    Args:
+        start_date (str): Data de início (YYYY-MM-DD).
+        end_date (str): Data de fim (YYYY-MM-DD).
+        today (date, opcional): Data de referência. Padrão: date.today()
+
+    Returns:
+        str: Identificador do snapshot no formato "start:end_efetivo".
+    """
+    today_str = (today or date.today()).isoformat()
+    effective_end = min(end_date, today_str)
+    return f"{start_date}:{effective_end}"
+
+
+def compute_request_fingerprint(params: Dict[str, Any], today: Optional[date] = None) -> str:
+    """
+    Calcula a impressão digital (SHA-256) de uma requisição de treinamento.
+
+    Args:
+        params (Dict[str, Any]): Parâmetros do TrainRequest (ex: request.model_dump()).
+        today (date, opcional): Data de referência para o snapshot de dados.
+
+    Returns:
+        str: Hash hexadecimal que identifica a requisição e o snapshot de dados.
+    """
+    payload = {
+        "params": params,
+        "data_snapshot": compute_data_snapshot(
+            str(params.get("start_date")), str(params.get("end_date")), today
+        ),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class TrainingResultCache:
+    """
+    Cache endereçado por conteúdo dos jobs de treinamento.
+
+    Mantém dois mapeamentos protegidos por lock, pois os jobs terminam em
+    threads de background:
+    - em andamento: fingerprint -> job_id do job em execução
+    - concluídos: fingerprint -> job_id do job que completou com sucesso,
+      com despejo LRU acima de `max_completed` entradas
+    """
+
+    def __init__(self, max_completed: int = 256) -> None:
+        """
+        Inicializa o cache vazio.
+
+        Args:
+            max_completed (int): Número máximo de jobs concluídos lembrados. Padrão: 256
+        """
+        self._lock = threading.Lock()
+        self.max_completed = max(1, max_completed)
+        self._inflight: Dict[str, str] = {}
+        self._completed: "OrderedDict[str, str]" = OrderedDict()
+
+    def claim(self, fingerprint: str, job_id: str, known_jobs: Optional[Container[str]] = None) -> Optional[str]:
+        """
+        Reserva o fingerprint para um novo job, se ainda não houver um equivalente.
+
+        Args:
+            fingerprint (str): Impressão digital da requisição.
+            job_id (str): ID do novo job candidato.
+            known_jobs (Container[str], opcional): Jobs ainda existentes (ex: JOBS).
+                Um job equivalente fora desse conjunto é descartado e o novo job
+                assume o fingerprint.
+
+        Returns:
+            Optional[str]: ID do job existente (concluído ou em andamento) que
+                atende a requisição, ou None se `job_id` foi registrado como novo.
+        """
+        with self._lock:
+            existing = self._completed.get(fingerprint) or self._inflight.get(fingerprint)
+            if existing is not None and (known_jobs is None or existing in known_jobs):
+                if fingerprint in self._completed:
+                    self._completed.move_to_end(fingerprint)
+                return existing
+            self._completed.pop(fingerprint, None)
+            self._inflight[fingerprint] = job_id
+            return None
+
+    def complete(self, fingerprint: str, job_id: str) -> None:
+        """
+        Marca o job como concluído com sucesso, tornando seu resultado reutilizável.
+
+        Args:
+            fingerprint (str): Impressão digital da requisição.
+            job_id (str): ID do job concluído.
+        """
+        with self._lock:
+            if self._inflight.get(fingerprint) == job_id:
+                del self._inflight[fingerprint]
+            self._completed[fingerprint] = job_id
+            self._completed.move_to_end(fingerprint)
+            while len(self._completed) > self.max_completed:
+                self._completed.popitem(last=False)
+
+    def release(self, fingerprint: str, job_id: str) -> None:
+        """
+        Libera o fingerprint de um job que falhou, permitindo nova tentativa.
+
+        Args:
+            fingerprint (str): Impressão digital da requisição.
+            job_id (str): ID do job que falhou.
+        """
+        with self._lock:
+            if self._inflight.get(fingerprint) == job_id:
+                del self._inflight[fingerprint]
+
+    def clear(self) -> None:
+        """
+        Limpa todas as entradas do cache.
+
+        Útil para testes ou reset do sistema.
+        """
+        with self._lock:
+            self._inflight.clear()
+            self._completed.clear()
@@ -0,0 +1,121 @@
+"""
+Módulo de aquecimento (warmup) do modelo antes de servi-lo.
+
+A primeira predição após a inicialização ou um hot-reload paga custos únicos
+(alocação preguiçosa de buffers, primeiro despacho de kernels, inicialização
+de sessões de backends). O warmup executa lotes sintéticos nos tamanhos de
+lote mais comuns pelo mesmo caminho de /predict antes de o snapshot ser
+publicado, de modo que o modelo só é marcado como pronto já aquecido.
+"""
+
+import time
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import get_settings
+from app.utils.serving_state import ServingState
+
+SEQUENCE_LENGTH = 60
+
+
+def parse_batch_sizes(value: str) -> List[int]:
+    """
+    Converte uma lista separada por vírgulas (ex: "1,8,32") em tamanhos de lote.
+
+    Args:
+        value (str): Tamanhos de lote separados por vírgula.
+
+    Returns:
+        List[int]: Tamanhos positivos, sem repetição e em ordem crescente.
+    """
+    sizes = {int(part) for part in value.split(",") if part.strip()}
+    return sorted(size for size in sizes if size > 0)
+
+
+def synthetic_windows(scaler: Any, batch_size: int) -> List[List[float]]:
+    """
+    Gera janelas de preços sintéticas dentro da faixa do scaler.
+
+    Args:
+        scaler (Any): Scaler do modelo (MinMaxScaler ou ScalerParams).
+        batch_size (int): Número de janelas.
+
+    Returns:
+        List[List[float]]: Janelas com 60 preços cada.
+    """
+    low, high = np.asarray(scaler.inverse_transform(np.array([[0.25], [0.75]])), dtype=np.float64).reshape(-1)
+    steps = np.linspace(0.0, 2 * np.pi, SEQUENCE_LENGTH)
+    return [
+        (low + (high - low) * (0.5 + 0.5 * np.sin(steps + i))).tolist()
+        for i in range(batch_size)
+    ]
+
+
+def warmup_model(
+    model: Any,
+    scaler: Any,
+    batch_sizes: Sequence[int] = (1, 32),
+    runs: int = 2,
+    predict_fn: Optional[Callable[[Any, Any, List[List[float]]], np.ndarray]] = None
+) -> Dict[str, Any]:
+    """
+    Executa lotes sintéticos no modelo e mede o tempo de cada tamanho de lote.
+
+    Args:
+        model (Any): Modelo PyTorch ou backend de inferência.
+        scaler (Any): Scaler correspondente ao modelo.
+        batch_sizes (Sequence[int]): Tamanhos de lote a aquecer. Padrão: (1, 32)
+        runs (int): Execuções por tamanho de lote. Padrão: 2
+        predict_fn (Callable, opcional): Função (model, scaler, windows) -> preços.
+            Padrão: predict_windows de /predict.
+
+    Returns:
+        Dict[str, Any]: Tempo da primeira e da última execução por tamanho de lote
+            (ms) e o tempo total (s).
+    """
+    if predict_fn is None:
+        from app.routes.predict_route import predict_windows
+        predict_fn = predict_windows
+
+    started = time.perf_counter()
+    timings: Dict[str, Dict[str, float]] = {}
+    for batch_size in batch_sizes:
+        windows = synthetic_windows(scaler, batch_size)
+        durations = []
+        for _ in range(max(1, runs)):
+            run_start = time.perf_counter()
+            predict_fn(model, scaler, windows)
+            durations.append((time.perf_counter() - run_start) * 1000)
+        timings[str(batch_size)] = {"first_ms": durations[0], "last_ms": durations[-1]}
+    return {"batch_sizes": timings, "total_s": time.perf_counter() - started}
+
+
+def warm_serving_state(state: ServingState) -> ServingState:
+    """
+    Aquece o modelo de um snapshot antes de publicá-lo.
+
+    Falhas no warmup não impedem a publicação: são registradas no relatório.
+
+    Args:
+        state (ServingState): Snapshot carregado e ainda não publicado.
+
+    Returns:
+        ServingState: O mesmo snapshot com o relatório de warmup.
+    """
+    settings = get_settings()
+    if not settings.WARMUP_ENABLED or not state.ready:
+        return state
+    try:
+        report = warmup_model(
+            state.model,
+            state.scaler,
+            batch_sizes=parse_batch_sizes(settings.WARMUP_BATCH_SIZES),
+            runs=settings.WARMUP_RUNS
+        )
+        print(f"Warmup do modelo concluído em {report['total_s']:.3f}s: {report['batch_sizes']}")
+    except Exception as e:
+        print(f"Aviso: falha no warmup do modelo ({e}).")
+        report = {"error": str(e)}
+    return replace(state, warmup=report)
@@ -0,0 +1,203 @@
+"""
+Módulo de benchmark dos backends de inferência.
+
+Mede a latência do forward do modelo de produção em cada backend disponível
+(PyTorch float32, PyTorch int8, onnxruntime e NumPy) para tamanhos de lote comuns
+na API, além do tamanho do modelo em cada representação.
+
+Uso:
+    python -m src.benchmark --runs 200
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+import torch
+
+
+def benchmark_latency(
+    predict_fn: Callable[[np.ndarray], np.ndarray],
+    batch: np.ndarray,
+    warmup: int = 10,
+    runs: int = 100
+) -> Dict[str, float]:
+    """
+    Mede a latência de uma função de predição sobre um lote fixo.
+
+    Args:
+        predict_fn (Callable): Função que recebe o lote (NumPy) e retorna as predições.
+        batch (np.ndarray): Entrada com shape (batch, seq_length, input_size).
+        warmup (int): Execuções descartadas antes da medição. Padrão: 10
+        runs (int): Execuções medidas. Padrão: 100
+
+    Returns:
+        Dict[str, float]: Latência média, p50, p95 e p99 (ms) e amostras por segundo.
+    """
+    for _ in range(warmup):
+        predict_fn(batch)
+
+    durations = np.empty(max(1, runs))
+    for i in range(len(durations)):
+        start = time.perf_counter()
+        predict_fn(batch)
+        durations[i] = time.perf_counter() - start
+
+    durations_ms = durations * 1000.0
+    return {
+        "mean_ms": float(durations_ms.mean()),
+        "p50_ms": float(np.percentile(durations_ms, 50)),
+        "p95_ms": float(np.percentile(durations_ms, 95)),
+        "p99_ms": float(np.percentile(durations_ms, 99)),
+        "samples_per_second": float(batch.shape[0] / durations.mean()),
+    }
+
+
+def torch_predict_fn(model: torch.nn.Module) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Cria a função de predição do backend PyTorch (CPU).
+
+    Args:
+        model (torch.nn.Module): Modelo em modo de avaliação.
+
+    Returns:
+        Callable: Função lote -> predições.
+    """
+    def predict(batch: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            return model(torch.from_numpy(batch)).numpy()
+    return predict
+
+
+def onnx_predict_fn(path: str) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Cria a função de predição do backend onnxruntime (CPU).
+
+    Args:
+        path (str): Caminho do arquivo .onnx.
+
+    Returns:
+        Callable: Função lote -> predições.
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = 1
+    session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    return lambda batch: session.run(None, {input_name: batch})[0]
+
+
+def load_production_model(artifacts_dir: str = "app/artifacts") -> torch.nn.Module:
+    """
+    Carrega o modelo de produção (config + pesos) em CPU.
+
+    Args:
+        artifacts_dir (str): Diretório dos artefatos. Padrão: "app/artifacts"
+
+    Returns:
+        torch.nn.Module: Modelo em modo de avaliação.
+    """
+    from src.lstm_model import build_model
+
+    with open(os.path.join(artifacts_dir, "model_config.json"), "r") as f:
+        config = json.load(f)
+    model = build_model(config)
+    model.load_state_dict(torch.load(os.path.join(artifacts_dir, "lstm_model.pth"), map_location="cpu"))
+    return model.eval()
+
+
+def compare_backends(
+    artifacts_dir: str = "app/artifacts",
+    batch_sizes: Sequence[int] = (1, 32),
+    runs: int = 100,
+    sequence_length: int = 60
+) -> Dict[str, Dict[int, Dict[str, float]]]:
+    """
+    Compara a latência dos backends disponíveis para o modelo de produção.
+
+    Backends cujas dependências não estão instaladas são ignorados.
+
+    Args:
+        artifacts_dir (str): Diretório dos artefatos. Padrão: "app/artifacts"
+        batch_sizes (Sequence[int]): Tamanhos de lote medidos. Padrão: (1, 32)
+        runs (int): Execuções medidas por cenário. Padrão: 100
+        sequence_length (int): Tamanho da janela. Padrão: 60
+
+    Returns:
+        Dict: {backend: {batch_size: estatísticas de latência}}
+    """
+    torch.set_num_threads(1)
+    model = load_production_model(artifacts_dir)
+    backends = {"torch": torch_predict_fn(model)}
+
+    from src.lstm_model import LSTMModel
+    if isinstance(model, LSTMModel):
+        from src.quantization import quantize_model
+        backends["torch_int8"] = torch_predict_fn(quantize_model(model))
+        from src.numpy_lstm import NumpyLSTM
+        numpy_model = NumpyLSTM({key: value.numpy() for key, value in model.state_dict().items()}, num_layers=model.num_layers)
+        backends["numpy"] = numpy_model.forward
+
+    onnx_path = os.path.join(artifacts_dir, "lstm_model.onnx")
+    try:
+        if not os.path.exists(onnx_path):
+            from src.onnx_export import export_to_onnx
+            onnx_path = export_to_onnx(model, os.path.join(tempfile.mkdtemp(), "lstm_model.onnx"), sequence_length)
+        backends["onnx"] = onnx_predict_fn(onnx_path)
+    except ImportError as e:
+        print(f"Backend onnx ignorado: {e}")
+
+    rng = np.random.default_rng(0)
+    results: Dict[str, Dict[int, Dict[str, float]]] = {}
+    for name, predict_fn in backends.items():
+        results[name] = {}
+        for batch_size in batch_sizes:
+            batch = rng.random((batch_size, sequence_length, 1), dtype=np.float32)
+            results[name][batch_size] = benchmark_latency(predict_fn, batch, runs=runs)
+    return results
+
+
+def compare_model_sizes(artifacts_dir: str = "app/artifacts") -> Dict[str, int]:
+    """
+    Compara o tamanho (bytes) do modelo float32 e da variante int8.
+
+    Args:
+        artifacts_dir (str): Diretório dos artefatos. Padrão: "app/artifacts"
+
+    Returns:
+        Dict[str, int]: Tamanho serializado de cada representação disponível.
+    """
+    from src.lstm_model import LSTMModel
+    from src.quantization import model_size_bytes, quantize_model
+
+    model = load_production_model(artifacts_dir)
+    sizes = {"torch": model_size_bytes(model)}
+    if isinstance(model, LSTMModel):
+        sizes["torch_int8"] = model_size_bytes(quantize_model(model))
+    onnx_path = os.path.join(artifacts_dir, "lstm_model.onnx")
+    if os.path.exists(onnx_path):
+        sizes["onnx"] = os.path.getsize(onnx_path)
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de latência dos backends de inferência")
+    parser.add_argument("--artifacts-dir", default="app/artifacts")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32])
+    args = parser.parse_args()
+
+    report = compare_backends(args.artifacts_dir, args.batch_sizes, args.runs)
+    print(f"{'backend':<12}{'batch':>7}{'p50 (ms)':>12}{'p95 (ms)':>12}{'amostras/s':>14}")
+    for backend, by_batch in report.items():
+        for batch_size, stats in by_batch.items():
+            print(f"{backend:<12}{batch_size:>7}{stats['p50_ms']:>12.3f}{stats['p95_ms']:>12.3f}{stats['samples_per_second']:>14.1f}")
+
+    print("\nTamanho do modelo:")
+    for backend, size in compare_model_sizes(args.artifacts_dir).items():
+        print(f"{backend:<12}{size / 1024:>10.1f} KiB")
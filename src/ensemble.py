@@ -0,0 +1,176 @@
+"""
+Módulo de ensemble vetorizado de modelos LSTM.
+
+Empilha N réplicas de LSTMModel (uma por seed) em tensores com uma dimensão
+extra de ensemble e executa todas em uma única passagem vetorizada: as
+multiplicações de cada passo de tempo são feitas com operações em lote
+(einsum/baddbmm) sobre as N réplicas ao mesmo tempo. O mesmo modelo é usado
+no treino (uma loss por réplica) e na inferência (média das réplicas em um
+único forward).
+"""
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from typing import List, Optional
+
+from src.lstm_model import LSTMModel
+
+
+class EnsembleLSTMModel(nn.Module):
+    """
+    Ensemble de N modelos LSTM treinados e avaliados em uma única passagem.
+
+    Os pesos de cada camada são armazenados com shape (N, ...), seguindo a
+    mesma ordem de portas do nn.LSTM (input, forget, cell, output).
+
+    Atributos:
+        ensemble_size (int): Número de réplicas no ensemble.
+        hidden_layer_size (int): Número de unidades de cada camada LSTM.
+        num_layers (int): Número de camadas LSTM empilhadas.
+        dropout (float): Dropout aplicado entre camadas durante o treino.
+    """
+
+    def __init__(
+        self,
+        ensemble_size: int = 5,
+        input_size: int = 1,
+        hidden_layer_size: int = 50,
+        output_size: int = 1,
+        num_layers: int = 2,
+        dropout: float = 0.2,
+        generators: Optional[List[torch.Generator]] = None
+    ) -> None:
+        """
+        Inicializa o ensemble criando e empilhando N réplicas de LSTMModel.
+
+        Args:
+            ensemble_size (int): Número de réplicas. Padrão: 5
+            input_size (int): Número de características de entrada. Padrão: 1
+            hidden_layer_size (int): Número de unidades na camada LSTM. Padrão: 50
+            output_size (int): Número de características de saída. Padrão: 1
+            num_layers (int): Número de camadas LSTM empilhadas. Padrão: 2
+            dropout (float): Probabilidade de dropout (se num_layers > 1). Padrão: 0.2
+            generators (List[torch.Generator], opcional): Um gerador por réplica para
+                inicialização reproduzível. Padrão: None
+
+        Raises:
+            ValueError: Se o número de geradores for diferente de ensemble_size.
+        """
+        super(EnsembleLSTMModel, self).__init__()
+        if generators is None:
+            generators = [None] * ensemble_size
+        if len(generators) != ensemble_size:
+            raise ValueError(f"Esperados {ensemble_size} geradores, recebidos {len(generators)}")
+
+        self.ensemble_size = ensemble_size
+        self.input_size = input_size
+        self.hidden_layer_size = hidden_layer_size
+        self.output_size = output_size
+        self.num_layers = num_layers
+        self.dropout = dropout if num_layers > 1 else 0.0
+
+        members = [
+            LSTMModel(input_size, hidden_layer_size, output_size, num_layers, dropout, generator=generator)
+            for generator in generators
+        ]
+        params, _ = torch.func.stack_module_state(members)
+        for name, stacked in params.items():
+            # "lstm.weight_ih_l0" -> "weight_ih_l0", "linear.weight" -> "linear_weight"
+            attr = name.replace("lstm.", "", 1) if name.startswith("lstm.") else name.replace(".", "_")
+            self.register_parameter(attr, nn.Parameter(stacked.detach().clone()))
+
+    @classmethod
+    def from_members(cls, members: List[LSTMModel]) -> "EnsembleLSTMModel":
+        """
+        Cria um ensemble a partir de modelos LSTMModel já existentes.
+
+        Args:
+            members (List[LSTMModel]): Modelos com a mesma arquitetura.
+
+        Returns:
+            EnsembleLSTMModel: Ensemble com os pesos copiados dos membros.
+        """
+        first = members[0]
+        ensemble = cls(
+            ensemble_size=len(members),
+            input_size=first.lstm.input_size,
+            hidden_layer_size=first.hidden_layer_size,
+            output_size=first.linear.out_features,
+            num_layers=first.num_layers,
+            dropout=first.lstm.dropout
+        )
+        params, _ = torch.func.stack_module_state(members)
+        with torch.no_grad():
+            for name, stacked in params.items():
+                attr = name.replace("lstm.", "", 1) if name.startswith("lstm.") else name.replace(".", "_")
+                getattr(ensemble, attr).copy_(stacked)
+        return ensemble
+
+    def forward_members(self, input_seq: torch.Tensor) -> torch.Tensor:
+        """
+        Executa o forward de todas as réplicas em uma única passagem.
+
+        Args:
+            input_seq (torch.Tensor): Tensor com shape (batch_size, seq_length, input_size),
+                compartilhado por todas as réplicas.
+
+        Returns:
+            torch.Tensor: Predições com shape (ensemble_size, batch_size, output_size).
+        """
+        n = self.ensemble_size
+        batch_size, seq_length, _ = input_seq.shape
+        layer_input = input_seq.unsqueeze(0).expand(n, -1, -1, -1)
+
+        for layer in range(self.num_layers):
+            w_ih = getattr(self, f"weight_ih_l{layer}")
+            w_hh = getattr(self, f"weight_hh_l{layer}")
+            bias = getattr(self, f"bias_ih_l{layer}") + getattr(self, f"bias_hh_l{layer}")
+
+            # Projeção da entrada para todos os passos de tempo de uma vez: (N, B, T, 4H)
+            input_gates = torch.einsum("nbti,ngi->nbtg", layer_input, w_ih) + bias[:, None, None, :]
+
+            h = input_seq.new_zeros(n, batch_size, self.hidden_layer_size)
+            c = input_seq.new_zeros(n, batch_size, self.hidden_layer_size)
+            outputs = []
+            for t in range(seq_length):
+                gates = torch.baddbmm(input_gates[:, :, t], h, w_hh.transpose(1, 2))
+                i, f, g, o = gates.chunk(4, dim=-1)
+                c = torch.sigmoid(f) * c + torch.sigmoid(i) * torch.tanh(g)
+                h = torch.sigmoid(o) * torch.tanh(c)
+                outputs.append(h)
+
+            layer_input = torch.stack(outputs, dim=2)
+            if layer < self.num_layers - 1 and self.dropout > 0:
+                layer_input = F.dropout(layer_input, p=self.dropout, training=self.training)
+
+        last_hidden = layer_input[:, :, -1, :]
+        return torch.baddbmm(self.linear_bias.unsqueeze(1), last_hidden, self.linear_weight.transpose(1, 2))
+
+    def forward(self, input_seq: torch.Tensor) -> torch.Tensor:
+        """
+        Executa a predição do ensemble (média das réplicas).
+
+        Args:
+            input_seq (torch.Tensor): Tensor com shape (batch_size, seq_length, input_size).
+
+        Returns:
+            torch.Tensor: Predições médias com shape (batch_size, output_size).
+        """
+        return self.forward_members(input_seq).mean(dim=0)
+
+    def __str__(self) -> str:
+        """
+        Retorna uma representação em string do ensemble.
+
+        Returns:
+            str: Descrição do ensemble com tamanho e arquitetura das réplicas.
+        """
+        return (
+            f"EnsembleLSTMModel(\n"
+            f"  ensemble_size={self.ensemble_size},\n"
+            f"  hidden_layer_size={self.hidden_layer_size},\n"
+            f"  num_layers={self.num_layers}\n"
+            f")"
+        )
+
@@ -0,0 +1,124 @@
+"""
+Módulo de relatório de tempo de importação (cold start) da API.
+
+Executa `python -X importtime -c "from app.main import app"` em um processo
+limpo (importa o módulo e monta a aplicação) e resume a saída: tempo total de importação, módulos mais caros e quais
+dependências exclusivas do treino (mlflow, matplotlib, yfinance, src.train)
+foram carregadas no caminho de serviço. Retorna código de saída 1 se o tempo
+total passar do alvo ou se algum módulo de treino for importado.
+
+Uso:
+    python -m src.import_profile --target-s 3.0 --top 15
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+# Módulos que só o /train usa e não devem ser importados ao subir a API
+TRAINING_ONLY_MODULES = ("src.train", "mlflow", "matplotlib", "yfinance")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    """
+    Converte a saída de `-X importtime` em registros por módulo.
+
+    Args:
+        stderr (str): Saída de erro do interpretador com as linhas "import time:".
+
+    Returns:
+        List[Dict[str, object]]: Módulo, tempo próprio (µs), tempo acumulado (µs)
+            e nível de aninhamento de cada importação.
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Cabeçalho "self [us] | cumulative | imported package"
+        name = parts[2].rstrip()
+        records.append({
+            "module": name.strip(),
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(name.lstrip())) // 2
+        })
+    return records
+
+
+def summarize_imports(
+    records: List[Dict[str, object]],
+    top: int = 15,
+    training_modules: Sequence[str] = TRAINING_ONLY_MODULES
+) -> Dict[str, object]:
+    """
+    Resume os registros de importação.
+
+    Args:
+        records (List[Dict[str, object]]): Saída de parse_importtime.
+        top (int): Quantidade de módulos mais caros (tempo acumulado). Padrão: 15
+        training_modules (Sequence[str]): Pacotes exclusivos do treino.
+
+    Returns:
+        Dict[str, object]: Tempo total (s), módulos mais caros e módulos de treino
+            importados.
+    """
+    total_us = sum(record["cumulative_us"] for record in records if record["depth"] == 0)
+    slowest = sorted(records, key=lambda record: record["cumulative_us"], reverse=True)[:top]
+    loaded = sorted({
+        record["module"] for record in records
+        if any(record["module"] == name or record["module"].startswith(name + ".") for name in training_modules)
+    })
+    return {
+        "total_s": total_us / 1e6,
+        "slowest": [(record["module"], record["cumulative_us"] / 1e6) for record in slowest],
+        "training_modules_loaded": loaded
+    }
+
+
+def profile_import(module: str = "app.main:app", top: int = 15) -> Dict[str, object]:
+    """
+    Importa um módulo em um interpretador novo com `-X importtime` e resume o resultado.
+
+    Args:
+        module (str): Módulo a importar, opcionalmente com o atributo a acessar
+            no formato do uvicorn ("modulo:atributo"). Padrão: "app.main:app"
+        top (int): Quantidade de módulos mais caros no relatório. Padrão: 15
+
+    Returns:
+        Dict[str, object]: Resumo produzido por summarize_imports.
+    """
+    module_name, _, attribute = module.partition(":")
+    statement = f"from {module_name} import {attribute}" if attribute else f"import {module_name}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return summarize_imports(parse_importtime(completed.stderr), top=top)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório de tempo de importação da API")
+    parser.add_argument("--module", default="app.main:app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-s", type=float, default=None, help="Tempo máximo de importação (s)")
+    args = parser.parse_args()
+
+    report = profile_import(args.module, args.top)
+    print(f"Importação de {args.module}: {report['total_s']:.3f}s")
+    print(f"{'módulo':<50}{'acumulado (s)':>15}")
+    for name, seconds in report["slowest"]:
+        print(f"{name:<50}{seconds:>15.3f}")
+
+    failed = False
+    if report["training_modules_loaded"]:
+        print(f"\nMódulos de treino importados no caminho de serviço: {report['training_modules_loaded']}")
+        failed = True
+    if args.target_s is not None and report["total_s"] > args.target_s:
+        print(f"\nTempo de importação acima do alvo ({args.target_s:.3f}s).")
+        failed = True
+    sys.exit(1 if failed else 0)
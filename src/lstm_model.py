@@ -1,5 +1,7 @@
+import math
 import torch
 import torch.nn as nn
+from typing import Any, Dict, Optional, Tuple
 
 
 class LSTMModel(nn.Module):
@@ -15,7 +17,7 @@ class LSTMModel(nn.Module):
         linear (nn.Linear): Camada linear para transformação da saída LSTM.
     """
 
-    def __init__(self, input_size: int = 1, hidden_layer_size: int = 50, output_size: int = 1, num_layers: int = 2, dropout: float = 0.2) -> None:
+    def __init__(self, input_size: int = 1, hidden_layer_size: int = 50, output_size: int = 1, num_layers: int = 2, dropout: float = 0.2, generator: Optional[torch.Generator] = None) -> None:
         """
         Inicializa o modelo LSTM.
 
@@ -25,6 +27,8 @@ class LSTMModel(nn.Module):
             output_size (int): Número de características de saída. Padrão: 1
             num_layers (int): Número de camadas LSTM empilhadas. Padrão: 2
             dropout (float): Probabilidade de dropout (se num_layers > 1). Padrão: 0.2
+            generator (torch.Generator, opcional): Gerador usado na inicialização dos pesos.
+                Se None, usa o RNG global do PyTorch. Padrão: None
         """
         super(LSTMModel, self).__init__()
         self.hidden_layer_size = hidden_layer_size
@@ -32,6 +36,34 @@ class LSTMModel(nn.Module):
         self.lstm = nn.LSTM(input_size, hidden_layer_size, num_layers=num_layers, batch_first=True, dropout=dropout if num_layers > 1 else 0)
         self.linear = nn.Linear(hidden_layer_size, output_size)
 
+        if generator is not None:
+            self.reset_parameters(generator)
+
+    def reset_parameters(self, generator: Optional[torch.Generator] = None) -> None:
+        """
+        Reinicializa os pesos com a mesma distribuição padrão do PyTorch.
+
+        Replica a inicialização de nn.LSTM (uniforme em ±1/sqrt(hidden)) e de
+        nn.Linear (uniforme em ±1/sqrt(in_features)), mas sorteando a partir do
+        gerador fornecido em vez do RNG global.
+
+        Args:
+            generator (torch.Generator, opcional): Gerador dedicado. Padrão: None
+
+        Note:
+            O dropout entre camadas do nn.LSTM (num_layers > 1) continua
+            usando o RNG global durante o treino, pois o PyTorch não aceita
+            gerador nessa operação.
+        """
+        lstm_bound = 1.0 / math.sqrt(self.hidden_layer_size) if self.hidden_layer_size > 0 else 0.0
+        linear_bound = 1.0 / math.sqrt(self.linear.in_features) if self.linear.in_features > 0 else 0.0
+        with torch.no_grad():
+            for weight in self.lstm.parameters():
+                weight.uniform_(-lstm_bound, lstm_bound, generator=generator)
+            self.linear.weight.uniform_(-linear_bound, linear_bound, generator=generator)
+            if self.linear.bias is not None:
+                self.linear.bias.uniform_(-linear_bound, linear_bound, generator=generator)
+
     def forward(self, input_seq: torch.Tensor) -> torch.Tensor:
         """
         Executa a propagação forward da rede neural.
@@ -46,6 +78,32 @@ class LSTMModel(nn.Module):
         predictions = self.linear(lstm_out[:, -1, :])
         return predictions
 
+    def forward_with_state(
+        self,
+        input_seq: torch.Tensor,
+        state: Optional[Tuple[torch.Tensor, torch.Tensor]] = None
+    ) -> Tuple[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        """
+        Executa o forward a partir de um estado (h, c) e retorna o estado final.
+
+        Permite avançar a sequência incrementalmente: processar os passos
+        [0, n) e depois [n, m) com o estado retornado equivale a processar
+        [0, m) de uma só vez.
+
+        Args:
+            input_seq (torch.Tensor): Entrada com shape (batch_size, seq_length, input_size).
+            state (Tuple[torch.Tensor, torch.Tensor], opcional): Estado (h, c) inicial,
+                cada um com shape (num_layers, batch_size, hidden_layer_size).
+                Se None, parte do estado zero. Padrão: None
+
+        Returns:
+            Tuple[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]: Predições com shape
+                (batch_size, output_size) e o estado (h, c) após o último passo.
+        """
+        lstm_out, new_state = self.lstm(input_seq, state)
+        predictions = self.linear(lstm_out[:, -1, :])
+        return predictions, new_state
+
     def __str__(self) -> str:
         """
         Retorna uma representação em string do modelo.
@@ -62,6 +120,62 @@ class LSTMModel(nn.Module):
         )
 
 
+def build_model(config: Dict[str, Any]) -> nn.Module:
+    """
+    Instancia o modelo descrito por uma configuração (model_config.json).
+
+    Args:
+        config (Dict[str, Any]): Configuração com input_size, hidden_layer_size,
+            output_size, num_layers, dropout e, opcionalmente, ensemble_size.
+
+    Returns:
+        nn.Module: LSTMModel, ou EnsembleLSTMModel se ensemble_size > 1.
+    """
+    ensemble_size = int(config.get("ensemble_size", 1))
+    if ensemble_size > 1:
+        from src.ensemble import EnsembleLSTMModel
+        return EnsembleLSTMModel(
+            ensemble_size=ensemble_size,
+            input_size=config["input_size"],
+            hidden_layer_size=config["hidden_layer_size"],
+            output_size=config["output_size"],
+            num_layers=config["num_layers"],
+            dropout=config["dropout"]
+        )
+    return LSTMModel(
+        input_size=config["input_size"],
+        hidden_layer_size=config["hidden_layer_size"],
+        output_size=config["output_size"],
+        num_layers=config["num_layers"],
+        dropout=config["dropout"]
+    )
+
+
+def forecast_recursive(model: nn.Module, input_seq: torch.Tensor, steps: int) -> torch.Tensor:
+    """
+    Previsão recursiva de vários passos: cada predição alimenta o passo seguinte.
+
+    A janela desliza a cada passo (sai o dia mais antigo, entra a predição),
+    de modo que o modelo sempre vê seq_length entradas, como no treino. É a
+    mesma semântica dos backends sem PyTorch (onnxruntime, NumPy).
+
+    Args:
+        model (nn.Module): Modelo com input_size == output_size == 1.
+        input_seq (torch.Tensor): Janelas com shape (batch_size, seq_length, 1).
+        steps (int): Número de passos a prever.
+
+    Returns:
+        torch.Tensor: Predições com shape (batch_size, steps).
+    """
+    outputs = []
+    window = input_seq
+    for _ in range(steps):
+        prediction = model(window)
+        outputs.append(prediction)
+        window = torch.cat([window[:, 1:], prediction.unsqueeze(1)], dim=1)
+    return torch.cat(outputs, dim=1)
+
+
 if __name__ == "__main__":
     # Teste de instanciação do modelo
     model = LSTMModel()
@@ -0,0 +1,479 @@
+"""
+Módulo do bundle de modelo em arquivo único.
+
+Reúne em um só arquivo versionado tudo o que a API precisa para servir um
+modelo: pesos, configuração da arquitetura, parâmetros do scaler e test_loss.
+
+Formato (little-endian):
+    - 8 bytes: MAGIC (b"LSTMBNDL")
+    - uint32: versão do formato
+    - uint64: tamanho do cabeçalho JSON em bytes
+    - cabeçalho JSON (config, scaler, test_loss, tabela de tensores, sha256)
+    - padding até múltiplo de 64 bytes
+    - tensores brutos (C-contíguos), cada um alinhado em 64 bytes
+
+Como os tensores ficam em offsets alinhados, o carregamento mapeia o arquivo
+em memória (np.memmap) em uma única passada, sem desserializar pickle. Este
+módulo não importa torch nem sklearn.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"LSTMBNDL"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sIQ")
+
+# Bundles por símbolo (um modelo por ação), resolvidos pelo registro de modelos da API
+SYMBOL_MODELS_DIR = "app/artifacts/models"
+
+
+def _align(offset: int) -> int:
+    """Arredonda o offset para o próximo múltiplo de ALIGNMENT."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+@dataclass(frozen=True)
+class ScalerParams:
+    """
+    Parâmetros brutos de um MinMaxScaler, aplicados com duas operações vetoriais.
+
+    Substitui o scaler do sklearn na inferência com a mesma interface
+    (`transform` / `inverse_transform` sobre arrays 2D).
+
+    Atributos:
+        min_ (np.ndarray): Deslocamento por feature (MinMaxScaler.min_).
+        scale_ (np.ndarray): Escala por feature (MinMaxScaler.scale_).
+        data_min_ (np.ndarray, opcional): Mínimo observado no treino.
+        data_max_ (np.ndarray, opcional): Máximo observado no treino.
+        feature_range (Tuple[float, float]): Faixa de saída do scaler.
+    """
+
+    min_: np.ndarray
+    scale_: np.ndarray
+    data_min_: Optional[np.ndarray] = None
+    data_max_: Optional[np.ndarray] = None
+    feature_range: Tuple[float, float] = (0.0, 1.0)
+
+    @classmethod
+    def from_sklearn(cls, scaler: Any) -> "ScalerParams":
+        """
+        Extrai os parâmetros de um MinMaxScaler ajustado.
+
+        Args:
+            scaler (Any): MinMaxScaler já ajustado (ou ScalerParams).
+
+        Returns:
+            ScalerParams: Parâmetros equivalentes.
+
+        Raises:
+            ValueError: Se o scaler não for um MinMaxScaler ajustado.
+        """
+        if isinstance(scaler, ScalerParams):
+            return scaler
+        if not hasattr(scaler, "min_") or not hasattr(scaler, "scale_"):
+            raise ValueError(f"Scaler não suportado no bundle: {type(scaler).__name__} (esperado MinMaxScaler ajustado)")
+        data_min = getattr(scaler, "data_min_", None)
+        data_max = getattr(scaler, "data_max_", None)
+        return cls(
+            min_=np.asarray(scaler.min_, dtype=np.float64),
+            scale_=np.asarray(scaler.scale_, dtype=np.float64),
+            data_min_=None if data_min is None else np.asarray(data_min, dtype=np.float64),
+            data_max_=None if data_max is None else np.asarray(data_max, dtype=np.float64),
+            feature_range=tuple(float(v) for v in getattr(scaler, "feature_range", (0.0, 1.0)))
+        )
+
+    def transform(self, X: Any) -> np.ndarray:
+        """
+        Normaliza os dados (equivalente a MinMaxScaler.transform).
+
+        Args:
+            X (Any): Array com shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: Dados normalizados.
+        """
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.min_
+
+    def inverse_transform(self, X: Any) -> np.ndarray:
+        """
+        Desfaz a normalização (equivalente a MinMaxScaler.inverse_transform).
+
+        Args:
+            X (Any): Array normalizado com shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: Dados na escala original.
+        """
+        return (np.asarray(X, dtype=np.float64) - self.min_) / self.scale_
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa os parâmetros para o cabeçalho JSON."""
+        return {
+            "type": "minmax",
+            "min_": self.min_.tolist(),
+            "scale_": self.scale_.tolist(),
+            "data_min_": None if self.data_min_ is None else self.data_min_.tolist(),
+            "data_max_": None if self.data_max_ is None else self.data_max_.tolist(),
+            "feature_range": list(self.feature_range)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScalerParams":
+        """Reconstrói os parâmetros a partir do cabeçalho JSON."""
+        def optional(key: str) -> Optional[np.ndarray]:
+            return None if data.get(key) is None else np.asarray(data[key], dtype=np.float64)
+
+        return cls(
+            min_=np.asarray(data["min_"], dtype=np.float64),
+            scale_=np.asarray(data["scale_"], dtype=np.float64),
+            data_min_=optional("data_min_"),
+            data_max_=optional("data_max_"),
+            feature_range=tuple(data.get("feature_range", (0.0, 1.0)))
+        )
+
+
+@dataclass
+class ModelBundle:
+    """
+    Conteúdo de um bundle carregado.
+
+    Atributos:
+        config (Dict[str, Any]): Configuração da arquitetura (entrada de build_model).
+        scaler (ScalerParams): Parâmetros de normalização.
+        tensors (Dict[str, np.ndarray]): Pesos do state_dict (mapeados em memória).
+        test_loss (float, opcional): Test loss do modelo no treino.
+        version (str): Identificador do modelo (prefixo do sha256 dos pesos).
+        path (str, opcional): Arquivo de origem.
+        metadata (Dict[str, Any]): Informações extras gravadas no treino (ex: símbolo).
+    """
+
+    config: Dict[str, Any]
+    scaler: ScalerParams
+    tensors: Dict[str, np.ndarray]
+    test_loss: Optional[float] = None
+    version: str = ""
+    path: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def save_bundle(
+    path: str,
+    state_dict: Dict[str, np.ndarray],
+    config: Dict[str, Any],
+    scaler: Any,
+    test_loss: Optional[float] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Grava o bundle de forma atômica (arquivo temporário + os.replace).
+
+    Cada escrita usa um arquivo temporário próprio no mesmo diretório, então
+    gravações concorrentes do mesmo bundle não se misturam: vence o último
+    os.replace, sempre com um arquivo completo.
+
+    Args:
+        path (str): Caminho do bundle de saída.
+        state_dict (Dict[str, np.ndarray]): Pesos do modelo como arrays NumPy.
+        config (Dict[str, Any]): Configuração da arquitetura.
+        scaler (Any): MinMaxScaler ajustado ou ScalerParams.
+        test_loss (float, opcional): Test loss do modelo.
+        metadata (Dict[str, Any], opcional): Informações extras (ex: símbolo).
+
+    Returns:
+        str: Caminho do bundle salvo.
+    """
+    arrays = {name: np.ascontiguousarray(value) for name, value in state_dict.items()}
+    table: Dict[str, Dict[str, Any]] = {}
+    digest = hashlib.sha256()
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset, "nbytes": int(array.nbytes)}
+        digest.update(array.tobytes())
+        offset += array.nbytes
+
+    header = json.dumps({
+        "format_version": FORMAT_VERSION,
+        "config": config,
+        "scaler": ScalerParams.from_sklearn(scaler).to_dict(),
+        "test_loss": None if test_loss is None else float(test_loss),
+        "metadata": metadata or {},
+        "tensors": table,
+        "data_sha256": digest.hexdigest()
+    }).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + table[name]["offset"])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except Exception:
+        # O bundle anterior (se houver) permanece intacto
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def symbol_bundle_path(symbol: str, models_dir: str = SYMBOL_MODELS_DIR) -> str:
+    """
+    Caminho do bundle de um símbolo.
+
+    Args:
+        symbol (str): Símbolo da ação (ex: AAPL, PETR4.SA).
+        models_dir (str): Diretório dos bundles por símbolo. Padrão: SYMBOL_MODELS_DIR
+
+    Returns:
+        str: Caminho do arquivo (símbolo normalizado em maiúsculas).
+    """
+    safe_symbol = re.sub(r"[^A-Z0-9._^=-]", "_", symbol.strip().upper())
+    return os.path.join(models_dir, f"{safe_symbol}.lstmb")
+
+
+def read_bundle_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """
+    Lê e valida apenas o cabeçalho do bundle.
+
+    Args:
+        path (str): Caminho do bundle.
+
+    Returns:
+        Tuple[Dict[str, Any], int]: Cabeçalho JSON e offset de início dos tensores.
+
+    Raises:
+        ValueError: Se o arquivo não for um bundle ou a versão não for suportada.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if not isinstance(preamble, bytes) or len(preamble) != _PREAMBLE.size:
+            raise ValueError(f"{path} não é um bundle de modelo válido")
+        magic, version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um bundle de modelo válido")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Versão de bundle não suportada: {version} (máximo {FORMAT_VERSION})")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    return header, _align(_PREAMBLE.size + header_len)
+
+
+def load_bundle(path: str, mmap: bool = True, verify: bool = False) -> ModelBundle:
+    """
+    Carrega um bundle em uma única passada.
+
+    Args:
+        path (str): Caminho do bundle.
+        mmap (bool): Se True, os tensores são views de um np.memmap
+            copy-on-write do arquivo (sem cópia). Se False, são lidos para a memória.
+        verify (bool): Se True, confere o sha256 dos tensores com o cabeçalho.
+
+    Returns:
+        ModelBundle: Bundle carregado.
+
+    Raises:
+        ValueError: Se o arquivo for inválido ou a verificação de integridade falhar.
+    """
+    header, data_start = read_bundle_header(path)
+    table = header["tensors"]
+    data_size = max((spec["offset"] + spec["nbytes"] for spec in table.values()), default=0)
+
+    if mmap and data_size > 0:
+        data = np.memmap(path, dtype=np.uint8, mode="c", offset=data_start, shape=(data_size,))
+    else:
+        with open(path, "rb") as f:
+            f.seek(data_start)
+            data = np.frombuffer(bytearray(f.read(data_size)), dtype=np.uint8)
+
+    tensors = {}
+    digest = hashlib.sha256()
+    for name, spec in table.items():
+        raw = data[spec["offset"]:spec["offset"] + spec["nbytes"]]
+        if verify:
+            digest.update(raw.tobytes())
+        tensors[name] = raw.view(np.dtype(spec["dtype"])).reshape(spec["shape"])
+    if verify and digest.hexdigest() != header["data_sha256"]:
+        raise ValueError(f"Bundle corrompido: sha256 dos tensores não confere ({path})")
+
+    return ModelBundle(
+        config=header["config"],
+        scaler=ScalerParams.from_dict(header["scaler"]),
+        tensors=tensors,
+        test_loss=header.get("test_loss"),
+        version=header["data_sha256"][:16],
+        path=path,
+        metadata=header.get("metadata", {})
+    )
+
+
+def read_bundle_test_loss(path: str) -> float:
+    """
+    Lê o test_loss registrado em um bundle existente.
+
+    Args:
+        path (str): Caminho do bundle.
+
+    Returns:
+        float: Test loss do bundle, ou infinito se o arquivo não existir, for
+            inválido ou não tiver test_loss.
+    """
+    if not os.path.exists(path):
+        return float("inf")
+    try:
+        test_loss = read_bundle_header(path)[0].get("test_loss")
+    except (OSError, ValueError):
+        return float("inf")
+    return float("inf") if test_loss is None else float(test_loss)
+
+
+def read_bundle_version(path: str) -> Optional[str]:
+    """
+    Lê a versão (prefixo do sha256 dos pesos) de um bundle existente.
+
+    Args:
+        path (str): Caminho do bundle.
+
+    Returns:
+        Optional[str]: Versão do bundle, ou None se o arquivo não existir ou for inválido.
+    """
+    try:
+        return read_bundle_header(path)[0]["data_sha256"][:16]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def artifact_version_path(path: str) -> str:
+    """Caminho do arquivo com a versão dos pesos de um artefato derivado (ex: .onnx)."""
+    return f"{path}.version"
+
+
+def write_artifact_version(path: str, version: str) -> None:
+    """
+    Registra a versão dos pesos a partir dos quais um artefato derivado foi gerado.
+
+    Args:
+        path (str): Caminho do artefato (ex: lstm_model.onnx).
+        version (str): Versão do bundle de onde o artefato saiu.
+    """
+    with open(artifact_version_path(path), "w") as f:
+        f.write(version)
+
+
+def artifact_matches_version(path: str, version: str) -> bool:
+    """
+    Verifica se um artefato derivado foi gerado a partir dos pesos da versão dada.
+
+    Args:
+        path (str): Caminho do artefato.
+        version (str): Versão do modelo em serviço.
+
+    Returns:
+        bool: True se o artefato registra essa versão.
+    """
+    try:
+        with open(artifact_version_path(path)) as f:
+            return f.read().strip() == version
+    except OSError:
+        return False
+
+
+def remove_artifact(path: str) -> None:
+    """Remove um artefato derivado e o registro de versão dele, se existirem."""
+    for stale in (path, artifact_version_path(path)):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+
+def export_model_bundle(
+    model: Any,
+    path: str,
+    config: Dict[str, Any],
+    scaler: Any,
+    test_loss: Optional[float] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Salva um modelo PyTorch treinado como bundle.
+
+    Args:
+        model (Any): Modelo treinado (nn.Module).
+        path (str): Caminho do bundle de saída.
+        config (Dict[str, Any]): Configuração da arquitetura (entrada de build_model).
+        scaler (Any): MinMaxScaler ajustado no treino.
+        test_loss (float, opcional): Test loss do modelo.
+        metadata (Dict[str, Any], opcional): Informações extras (ex: símbolo).
+
+    Returns:
+        str: Caminho do bundle salvo.
+    """
+    state_dict = {key: value.detach().cpu().numpy() for key, value in model.state_dict().items()}
+    return save_bundle(path, state_dict, config, scaler, test_loss=test_loss, metadata=metadata)
+
+
+def bundle_to_torch_model(bundle: ModelBundle, device: Any = "cpu", share_weights: bool = False) -> Any:
+    """
+    Instancia o modelo PyTorch descrito pelo bundle com os seus pesos.
+
+    Com `share_weights`, em CPU, os parâmetros passam a ser views do memmap do
+    bundle (load_state_dict com assign=True) em vez de cópias. As páginas vêm
+    do page cache do sistema operacional e são compartilhadas por todos os
+    processos que mapeiam o mesmo arquivo (ex: workers do uvicorn): N workers
+    mantêm uma única cópia física dos pesos. Os parâmetros ficam sem gradiente,
+    pois o modelo só é usado para inferência e nunca escreve nos pesos.
+
+    Args:
+        bundle (ModelBundle): Bundle carregado.
+        device (Any): Dispositivo de destino. Padrão: "cpu"
+        share_weights (bool): Usa os pesos mapeados do arquivo sem copiá-los. Padrão: False
+
+    Returns:
+        Any: Modelo (LSTMModel ou EnsembleLSTMModel) em modo de avaliação.
+    """
+    import torch
+    from src.lstm_model import build_model
+
+    model = build_model(bundle.config)
+    state_dict = {name: torch.from_numpy(np.asarray(array)) for name, array in bundle.tensors.items()}
+    if share_weights and torch.device(device).type == "cpu" and is_memory_mapped(bundle):
+        model.requires_grad_(False)
+        model.load_state_dict(state_dict, assign=True)
+        return model.eval()
+    model.load_state_dict(state_dict)
+    model.to(device)
+    return model.eval()
+
+
+def is_memory_mapped(bundle: ModelBundle) -> bool:
+    """
+    Indica se os tensores do bundle são views de um memmap do arquivo.
+
+    Args:
+        bundle (ModelBundle): Bundle carregado.
+
+    Returns:
+        bool: True se todos os tensores estiverem mapeados do arquivo.
+    """
+    def mapped(array: np.ndarray) -> bool:
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return True
+            array = array.base if isinstance(array.base, np.ndarray) else None
+        return False
+
+    return bool(bundle.tensors) and all(mapped(array) for array in bundle.tensors.values())
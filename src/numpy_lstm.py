@@ -0,0 +1,129 @@
+"""
+Módulo de inferência do LSTMModel em NumPy puro.
+
+Reimplementa o forward do LSTMModel (nn.LSTM com batch_first + nn.Linear
+sobre o último passo) usando apenas NumPy, a partir dos pesos do state_dict.
+Permite que workers de serviço rodem o modelo sem importar o PyTorch. Este
+módulo não importa torch.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    """Sigmoide numericamente estável (sem overflow em exp)."""
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+class NumpyLSTM:
+    """
+    Forward do LSTMModel em NumPy.
+
+    Segue a mesma ordem de portas do nn.LSTM (input, forget, cell, output).
+
+    Atributos:
+        num_layers (int): Número de camadas LSTM.
+        hidden_layer_size (int): Número de unidades por camada.
+        layers (List[Tuple[np.ndarray, ...]]): (W_ih^T, W_hh^T, bias) de cada camada.
+        linear_weight (np.ndarray): Pesos da camada linear, transpostos.
+        linear_bias (np.ndarray): Bias da camada linear.
+    """
+
+    def __init__(self, state_dict: Dict[str, np.ndarray], num_layers: Optional[int] = None, dtype: Any = np.float32) -> None:
+        """
+        Inicializa o modelo a partir dos pesos do state_dict.
+
+        Args:
+            state_dict (Dict[str, np.ndarray]): Pesos do LSTMModel convertidos para NumPy
+                (lstm.weight_ih_l{k}, lstm.weight_hh_l{k}, lstm.bias_ih_l{k},
+                lstm.bias_hh_l{k}, linear.weight, linear.bias).
+            num_layers (int, opcional): Número de camadas. Se None, é inferido das chaves.
+            dtype (Any): Tipo usado nos cálculos. Padrão: np.float32
+
+        Raises:
+            KeyError: Se algum peso esperado não estiver no state_dict.
+        """
+        if num_layers is None:
+            num_layers = sum(1 for key in state_dict if key.startswith("lstm.weight_ih_l"))
+        self.num_layers = num_layers
+        self.dtype = dtype
+        self.layers: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for k in range(num_layers):
+            w_ih = np.asarray(state_dict[f"lstm.weight_ih_l{k}"], dtype=dtype)
+            w_hh = np.asarray(state_dict[f"lstm.weight_hh_l{k}"], dtype=dtype)
+            # Os dois bias do nn.LSTM são somados uma única vez
+            bias = np.asarray(state_dict[f"lstm.bias_ih_l{k}"], dtype=dtype) + np.asarray(state_dict[f"lstm.bias_hh_l{k}"], dtype=dtype)
+            self.layers.append((np.ascontiguousarray(w_ih.T), np.ascontiguousarray(w_hh.T), bias))
+        self.hidden_layer_size = self.layers[0][1].shape[0]
+        self.linear_weight = np.ascontiguousarray(np.asarray(state_dict["linear.weight"], dtype=dtype).T)
+        self.linear_bias = np.asarray(state_dict["linear.bias"], dtype=dtype)
+
+    @classmethod
+    def from_npz(cls, path: str) -> "NumpyLSTM":
+        """
+        Carrega os pesos exportados por `export_numpy_weights`.
+
+        Args:
+            path (str): Caminho do arquivo .npz.
+
+        Returns:
+            NumpyLSTM: Modelo pronto para inferência.
+        """
+        with np.load(path) as data:
+            state_dict = {key: data[key] for key in data.files if key != "num_layers"}
+            num_layers = int(data["num_layers"]) if "num_layers" in data.files else None
+        return cls(state_dict, num_layers=num_layers)
+
+    def forward(self, input_seq: np.ndarray) -> np.ndarray:
+        """
+        Executa o forward sobre um lote de sequências.
+
+        Args:
+            input_seq (np.ndarray): Entrada com shape (batch_size, seq_length, input_size).
+
+        Returns:
+            np.ndarray: Predições com shape (batch_size, output_size).
+        """
+        layer_input = np.asarray(input_seq, dtype=self.dtype)
+        batch_size, seq_length, _ = layer_input.shape
+        hidden = self.hidden_layer_size
+
+        for w_ih_t, w_hh_t, bias in self.layers:
+            # Projeção da entrada de todos os passos de uma vez: (B, T, 4H)
+            input_proj = layer_input @ w_ih_t + bias
+            h = np.zeros((batch_size, hidden), dtype=self.dtype)
+            c = np.zeros((batch_size, hidden), dtype=self.dtype)
+            outputs = np.empty((batch_size, seq_length, hidden), dtype=self.dtype)
+            for t in range(seq_length):
+                gates = input_proj[:, t] + h @ w_hh_t
+                i = _sigmoid(gates[:, :hidden])
+                f = _sigmoid(gates[:, hidden:2 * hidden])
+                g = np.tanh(gates[:, 2 * hidden:3 * hidden])
+                o = _sigmoid(gates[:, 3 * hidden:])
+                c = f * c + i * g
+                h = o * np.tanh(c)
+                outputs[:, t] = h
+            layer_input = outputs
+
+        return layer_input[:, -1] @ self.linear_weight + self.linear_bias
+
+    __call__ = forward
+
+
+def export_numpy_weights(model: Any, path: str) -> str:
+    """
+    Salva os pesos de um LSTMModel em .npz para o backend NumPy.
+
+    Args:
+        model (Any): LSTMModel treinado (nn.Module).
+        path (str): Caminho do arquivo .npz de saída.
+
+    Returns:
+        str: Caminho do arquivo salvo.
+    """
+    arrays = {key: value.detach().cpu().numpy() for key, value in model.state_dict().items()}
+    with open(path, "wb") as f:
+        np.savez(f, num_layers=np.array(model.num_layers), **arrays)
+    return path
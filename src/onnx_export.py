@@ -0,0 +1,87 @@
+"""
+Módulo de exportação do modelo LSTM para ONNX.
+
+O modelo promovido é exportado junto com lstm_model.pth para que a API possa
+servi-lo com o onnxruntime em CPU, sem depender do runtime completo do
+PyTorch na inferência.
+"""
+
+import copy
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+ONNX_INPUT_NAME = "input_seq"
+ONNX_OUTPUT_NAME = "prediction"
+
+
+def export_to_onnx(
+    model: nn.Module,
+    path: str,
+    sequence_length: int = 60,
+    input_size: int = 1,
+    opset_version: int = 17
+) -> str:
+    """
+    Exporta um LSTMModel (ou EnsembleLSTMModel) para ONNX.
+
+    O eixo de batch é dinâmico, permitindo servir lotes de qualquer tamanho
+    com o mesmo arquivo. A exportação é feita a partir de uma cópia em CPU,
+    sem alterar o dispositivo ou o modo do modelo original.
+
+    Args:
+        model (nn.Module): Modelo treinado.
+        path (str): Caminho do arquivo .onnx de saída.
+        sequence_length (int): Tamanho da janela de entrada. Padrão: 60
+        input_size (int): Número de características de entrada. Padrão: 1
+        opset_version (int): Versão do opset ONNX. Padrão: 17
+
+    Returns:
+        str: Caminho do arquivo exportado.
+    """
+    export_model = copy.deepcopy(model).cpu().eval()
+    dummy_input = torch.zeros(1, sequence_length, input_size, dtype=torch.float32)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            export_model,
+            dummy_input,
+            path,
+            input_names=[ONNX_INPUT_NAME],
+            output_names=[ONNX_OUTPUT_NAME],
+            dynamic_axes={ONNX_INPUT_NAME: {0: "batch"}, ONNX_OUTPUT_NAME: {0: "batch"}},
+            opset_version=opset_version,
+            # Exportador TorchScript: o exportador dynamo (padrão no torch >= 2.9) exige onnxscript
+            dynamo=False
+        )
+    return path
+
+
+def max_onnx_deviation(model: nn.Module, path: str, input_seq: np.ndarray) -> float:
+    """
+    Compara as saídas do PyTorch e do onnxruntime para a mesma entrada.
+
+    Args:
+        model (nn.Module): Modelo PyTorch de referência.
+        path (str): Caminho do arquivo .onnx exportado.
+        input_seq (np.ndarray): Entrada com shape (batch, seq_length, input_size).
+
+    Returns:
+        float: Maior diferença absoluta entre as duas saídas.
+    """
+    import onnxruntime as ort
+
+    input_seq = np.ascontiguousarray(input_seq, dtype=np.float32)
+    session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+    onnx_out = session.run([ONNX_OUTPUT_NAME], {ONNX_INPUT_NAME: input_seq})[0]
+
+    reference = copy.deepcopy(model).cpu().eval()
+    with torch.no_grad():
+        torch_out = reference(torch.from_numpy(input_seq)).numpy()
+    return float(np.max(np.abs(onnx_out - torch_out)))
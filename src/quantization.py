@@ -0,0 +1,99 @@
+"""
+Módulo de quantização dinâmica (int8) do modelo LSTM.
+
+Na promoção de um novo modelo, o pipeline gera uma variante com nn.LSTM e
+nn.Linear quantizados dinamicamente para int8 (pesos em int8, ativações
+quantizadas em tempo de execução). A variante só é salva se o MAPE no
+conjunto de teste não piorar além do limite configurado.
+"""
+
+import copy
+import io
+from typing import Dict
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+from src.evaluate import evaluate_model, calculate_metrics
+
+
+def quantize_model(model: nn.Module) -> nn.Module:
+    """
+    Cria uma cópia do modelo com LSTM e Linear quantizados dinamicamente (int8).
+
+    O modelo original não é alterado. Modelos quantizados rodam apenas em CPU.
+
+    Args:
+        model (nn.Module): Modelo em float32 (LSTMModel).
+
+    Returns:
+        nn.Module: Modelo quantizado em modo de avaliação.
+    """
+    float_model = copy.deepcopy(model).cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(float_model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def load_quantized_model(float_model: nn.Module, path: str) -> nn.Module:
+    """
+    Carrega os pesos int8 salvos sobre a estrutura quantizada do modelo.
+
+    Args:
+        float_model (nn.Module): Modelo float32 com a mesma arquitetura.
+        path (str): Caminho do state_dict quantizado.
+
+    Returns:
+        nn.Module: Modelo quantizado em modo de avaliação.
+    """
+    quantized = quantize_model(float_model)
+    # Os pesos empacotados (torch.ScriptObject) não são aceitos com weights_only=True;
+    # o arquivo é gerado pelo próprio pipeline de treino
+    quantized.load_state_dict(torch.load(path, map_location="cpu", weights_only=False))
+    return quantized.eval()
+
+
+def model_size_bytes(model: nn.Module) -> int:
+    """
+    Calcula o tamanho serializado do state_dict do modelo.
+
+    Args:
+        model (nn.Module): Modelo (float ou quantizado).
+
+    Returns:
+        int: Tamanho em bytes.
+    """
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def evaluate_quantized(model: nn.Module, test_loader: DataLoader, scaler) -> Dict[str, float]:
+    """
+    Avalia o modelo quantizado no conjunto de teste (em CPU).
+
+    Args:
+        model (nn.Module): Modelo quantizado.
+        test_loader (DataLoader): DataLoader de teste.
+        scaler (MinMaxScaler): Scaler para inverter a normalização.
+
+    Returns:
+        Dict[str, float]: MAE, RMSE e MAPE do modelo quantizado.
+    """
+    predictions, actuals = evaluate_model(model, test_loader, scaler, torch.device("cpu"))
+    return {name: float(value) for name, value in calculate_metrics(np.asarray(predictions), np.asarray(actuals)).items()}
+
+
+def passes_accuracy_gate(float_mape: float, quantized_mape: float, max_mape_increase: float) -> bool:
+    """
+    Verifica se a perda de precisão da quantização é aceitável.
+
+    Args:
+        float_mape (float): MAPE (%) do modelo float32.
+        quantized_mape (float): MAPE (%) do modelo int8.
+        max_mape_increase (float): Aumento máximo permitido, em pontos percentuais.
+
+    Returns:
+        bool: True se quantized_mape <= float_mape + max_mape_increase.
+    """
+    return bool(np.isfinite(quantized_mape) and quantized_mape <= float_mape + max_mape_increase)
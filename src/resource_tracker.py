@@ -0,0 +1,239 @@
+"""
+Módulo de contabilização de recursos dos jobs de treinamento.
+
+Mede tempo de parede e de CPU por etapa do pipeline (download,
+pré-processamento, treino, avaliação, gráficos, MLflow), memória residente
+(RSS) durante o job e vazão de treino, para planejamento de capacidade.
+
+Os jobs rodam em threads do processo da API, então as métricas do processo
+(CPU total, ru_maxrss) somam outros jobs e as requisições. Por job valem o
+tempo de CPU da thread do job e o RSS amostrado enquanto as etapas rodam
+(início, pico e crescimento). As threads intra-op do PyTorch não entram no
+CPU da thread: o CPU do processo no mesmo intervalo (process_cpu_time_s) as
+inclui, mas também inclui o trabalho concorrente.
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows não possui o módulo resource
+    resource = None
+
+
+def get_current_rss_mb(statm_path: str = "/proc/self/statm") -> Optional[float]:
+    """
+    Retorna a memória residente (RSS) atual do processo em MB.
+
+    Lê /proc/self/statm, barato o suficiente para ser amostrado durante o job.
+
+    Args:
+        statm_path (str): Arquivo statm do processo. Padrão: o do processo atual.
+
+    Returns:
+        Optional[float]: RSS em MB, ou None fora do Linux.
+    """
+    try:
+        with open(statm_path) as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """
+    Retorna o pico de memória residente (RSS) do processo em MB.
+
+    Returns:
+        Optional[float]: Pico de RSS em MB, ou None se indisponível na plataforma.
+
+    Note:
+        O valor é o máximo do processo inteiro desde o início, não apenas do
+        job: nunca diminui e inclui outros jobs e a API.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB; macOS em bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return max_rss / divisor
+
+
+def get_memory_usage_mb(smaps_path: str = "/proc/self/smaps_rollup") -> Optional[Dict[str, float]]:
+    """
+    Retorna a memória atual do processo: RSS, PSS e a parte compartilhada.
+
+    O PSS divide cada página compartilhada pelo número de processos que a
+    mapeiam, então é a medida certa para comparar workers que compartilham
+    os pesos do modelo (o RSS conta a página inteira em cada worker).
+
+    Args:
+        smaps_path (str): Arquivo smaps_rollup do processo. Padrão: o do processo atual.
+
+    Returns:
+        Optional[Dict[str, float]]: rss_mb, pss_mb, shared_mb e private_mb, ou
+            None fora do Linux.
+    """
+    try:
+        with open(smaps_path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    fields: Dict[str, float] = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "shared_mb": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    }
+
+
+class ResourceTracker:
+    """
+    Acumula métricas de recursos de um job de treinamento.
+
+    Atributos:
+        stage_durations (Dict[str, float]): Tempo de parede (s) acumulado por etapa.
+        stage_thread_cpu_times (Dict[str, float]): Tempo de CPU (s) da thread do
+            job acumulado por etapa.
+        sample_interval_s (float, opcional): Intervalo de amostragem do RSS
+            enquanto alguma etapa roda (None = só no início e no fim das etapas).
+    """
+
+    def __init__(self, sample_interval_s: Optional[float] = None) -> None:
+        """
+        Inicia a contagem de tempo de parede e de CPU do job.
+
+        Args:
+            sample_interval_s (float, opcional): Intervalo (s) de amostragem do
+                RSS em uma thread durante as etapas. Padrão: None (sem thread)
+        """
+        self.stage_durations: Dict[str, float] = {}
+        self.stage_thread_cpu_times: Dict[str, float] = {}
+        self.sample_interval_s = sample_interval_s
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._start_thread_cpu = time.thread_time()
+        self._rss_start = get_current_rss_mb()
+        self._rss_peak = self._rss_start
+        self._active_stages = 0
+        self._sampler_stop: Optional[threading.Event] = None
+        self._sampler: Optional[threading.Thread] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mede uma etapa do pipeline. Chamadas repetidas com o mesmo nome são somadas.
+
+        Args:
+            name (str): Nome da etapa (ex: "download", "training").
+
+        Yields:
+            None
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        self._enter_stage()
+        try:
+            yield
+        finally:
+            self._exit_stage()
+            self.stage_durations[name] = self.stage_durations.get(name, 0.0) + (time.perf_counter() - wall_start)
+            self.stage_thread_cpu_times[name] = self.stage_thread_cpu_times.get(name, 0.0) + (time.thread_time() - cpu_start)
+
+    def summary(self, epoch_durations: List[float], num_samples: int) -> Dict[str, Any]:
+        """
+        Consolida as métricas de recursos do job.
+
+        Args:
+            epoch_durations (List[float]): Duração (s) de cada época de treino.
+            num_samples (int): Total de amostras processadas no treino (amostras x épocas).
+
+        Returns:
+            Dict[str, Any]: Métricas do job (tempo total, CPU da thread, RSS no
+                início, pico, fim e crescimento, amostras/s, duração das épocas
+                e tempo por etapa) e as do processo inteiro no mesmo intervalo
+                (process_cpu_time_s, process_peak_rss_mb).
+        """
+        self._sample_rss()
+        rss_end = get_current_rss_mb()
+        training_time = self.stage_durations.get("training", 0.0)
+        rss_growth = None
+        if self._rss_start is not None and self._rss_peak is not None:
+            rss_growth = self._rss_peak - self._rss_start
+        return {
+            "wall_time_s": time.perf_counter() - self._start_wall,
+            "thread_cpu_time_s": time.thread_time() - self._start_thread_cpu,
+            "process_cpu_time_s": time.process_time() - self._start_cpu,
+            "rss_start_mb": self._rss_start,
+            "rss_peak_mb": self._rss_peak,
+            "rss_end_mb": rss_end,
+            "rss_growth_mb": rss_growth,
+            "process_peak_rss_mb": get_peak_rss_mb(),
+            "samples_per_second": num_samples / training_time if training_time > 0 else 0.0,
+            "epoch_durations_s": [float(d) for d in epoch_durations],
+            "stage_durations_s": dict(self.stage_durations),
+            "stage_thread_cpu_times_s": dict(self.stage_thread_cpu_times),
+        }
+
+    def _sample_rss(self) -> None:
+        """Atualiza o pico de RSS observado durante o job."""
+        rss = get_current_rss_mb()
+        if rss is not None and (self._rss_peak is None or rss > self._rss_peak):
+            self._rss_peak = rss
+
+    def _enter_stage(self) -> None:
+        """Amostra o RSS e, na primeira etapa ativa, inicia a thread de amostragem."""
+        self._sample_rss()
+        self._active_stages += 1
+        if self._active_stages == 1 and self.sample_interval_s:
+            self._sampler_stop = threading.Event()
+            self._sampler = threading.Thread(
+                target=self._sample_loop, args=(self._sampler_stop,), name="rss-sampler", daemon=True
+            )
+            self._sampler.start()
+
+    def _exit_stage(self) -> None:
+        """Amostra o RSS e, ao sair da última etapa ativa, para a thread de amostragem."""
+        self._active_stages -= 1
+        if self._active_stages == 0 and self._sampler is not None:
+            self._sampler_stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self._sample_rss()
+
+    def _sample_loop(self, stop: threading.Event) -> None:
+        """Amostra o RSS a cada sample_interval_s até `stop`."""
+        while not stop.wait(self.sample_interval_s):
+            self._sample_rss()
+
+
+def flatten_for_mlflow(summary: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Converte o resumo de recursos em métricas escalares para o MLflow.
+
+    Args:
+        summary (Dict[str, Any]): Resultado de ResourceTracker.summary.
+
+    Returns:
+        Dict[str, float]: Métricas com prefixo "resource_" (listas são omitidas).
+    """
+    metrics: Dict[str, float] = {}
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            for stage, seconds in value.items():
+                metrics[f"resource_{key}_{stage}"] = float(seconds)
+        elif isinstance(value, (int, float)):
+            metrics[f"resource_{key}"] = float(value)
+    return metrics
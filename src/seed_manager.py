@@ -53,13 +53,59 @@ def set_seed(seed: int = 42) -> None:
     
     # Configurações de determinismo do PyTorch
     # Nota: Isso pode reduzir performance, mas garante reprodutibilidade
-    torch.backends.cudnn.deterministic = True
-    torch.backends.cudnn.benchmark = False
+    configure_determinism()
     
     # Variável de ambiente para operações hash do Python
     os.environ['PYTHONHASHSEED'] = str(seed)
 
 
+def configure_determinism() -> None:
+    """
+    Ativa os algoritmos determinísticos do cuDNN e desliga o autotuning.
+
+    As flags valem para o processo inteiro, mas todo job as define com os
+    mesmos valores: ao contrário das seeds, jobs concorrentes não interferem
+    uns nos outros por causa delas.
+
+    Note:
+        Configurar determinismo no CUDA pode reduzir performance.
+    """
+    torch.backends.cudnn.deterministic = True
+    torch.backends.cudnn.benchmark = False
+
+
+class JobRNG:
+    """
+    Gerador de números aleatórios isolado para um único job de treinamento.
+
+    Diferente de `set_seed`, que altera o estado global de Python, NumPy e
+    PyTorch para todo o processo, esta classe cria um gerador dedicado que é
+    passado explicitamente ao DataLoader e à inicialização do modelo. Assim,
+    jobs concorrentes no mesmo processo não interferem nas seeds uns dos outros.
+    O pipeline de treino não usa aleatoriedade do Python nem do NumPy, então
+    só há o gerador do PyTorch. As flags do cuDNN ficam em `configure_determinism`.
+
+    Atributos:
+        seed (int): Seed base do job.
+        torch (torch.Generator): Gerador do PyTorch (CPU).
+
+    Example:
+        >>> rng = JobRNG(42)
+        >>> loader = DataLoader(dataset, shuffle=True, generator=rng.torch)
+        >>> model = LSTMModel(generator=rng.torch)
+    """
+
+    def __init__(self, seed: int = 42) -> None:
+        """
+        Inicializa o gerador do job.
+
+        Args:
+            seed (int): Seed base do job. Padrão: 42
+        """
+        self.seed = seed
+        self.torch = torch.Generator().manual_seed(seed)
+
+
 def get_worker_seed(worker_id: int, base_seed: int = 42) -> int:
     """
     Gera seed única para workers do DataLoader.
@@ -6,13 +6,29 @@ import numpy as np
 import mlflow
 import mlflow.pytorch
 import matplotlib.pyplot as plt
-from typing import Dict, Tuple, List
+import threading
+import time
+from typing import Dict, Tuple, List, Optional
 
 from src.data_loader import DataProcessor
 from src.lstm_model import LSTMModel
+from src.ensemble import EnsembleLSTMModel
 from src.utils import save_model
 from src.evaluate import evaluate_model, calculate_metrics, evaluate_with_loss
-from src.seed_manager import set_seed
+from src.seed_manager import JobRNG, configure_determinism
+from src.resource_tracker import ResourceTracker, flatten_for_mlflow
+from src.training_errors import TrainingCancelledError
+from src.onnx_export import export_to_onnx
+from src.numpy_lstm import export_numpy_weights
+from src.model_bundle import (
+    export_model_bundle,
+    read_bundle_test_loss,
+    read_bundle_version,
+    remove_artifact,
+    symbol_bundle_path,
+    write_artifact_version,
+)
+from src.quantization import quantize_model, evaluate_quantized, passes_accuracy_gate, model_size_bytes
 from torch.utils.data import DataLoader, TensorDataset
 
 
@@ -97,8 +113,6 @@ def plot_predictions(actuals: np.ndarray, predictions: np.ndarray, symbol: str =
     return save_path
 
 
-
-
 class ModelTrainer:
     """
     Classe treinadora para modelos LSTM.
@@ -111,6 +125,7 @@ class ModelTrainer:
         criterion (nn.MSELoss): Função de perda (Mean Squared Error).
         optimizer (torch.optim.Adam): Otimizador Adam.
         device (torch.device): Dispositivo de computação (CPU ou CUDA).
+        epoch_durations (List[float]): Duração (s) de cada época do último treino.
     """
 
     def __init__(self, model: LSTMModel, lr: float = 0.001) -> None:
@@ -125,6 +140,7 @@ class ModelTrainer:
         self.criterion = nn.MSELoss()
         self.optimizer = torch.optim.Adam(model.parameters(), lr=lr)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.epoch_durations: List[float] = []
         import sys
         print(f"--- DEBUG INFO ---")
         print(f"Python Executable: {sys.executable}")
@@ -135,32 +151,41 @@ class ModelTrainer:
         print(f"ModelTrainer configurado para usar: {self.device}")
         self.model.to(self.device)
 
-    def train(self, train_loader: DataLoader, epochs: int = 10) -> List[float]:
+    def train(self, train_loader: DataLoader, epochs: int = 10, stop_event: Optional[threading.Event] = None) -> List[float]:
         """
         Treina o modelo LSTM.
         
         Args:
             train_loader (DataLoader): DataLoader com dados de treinamento.
             epochs (int): Número de épocas de treinamento. Padrão: 10
+            stop_event (threading.Event, opcional): Sinal de cancelamento verificado
+                antes de cada batch. Padrão: None
         
         Returns:
             List[float]: Lista com o histórico de perdas médias por época.
+
+        Raises:
+            TrainingCancelledError: Se `stop_event` for acionado durante o treino.
         """
         self.model.train()
         loss_history = []
+        self.epoch_durations = []
         
         for i in range(epochs):
+            epoch_start = time.perf_counter()
             epoch_loss = 0.0
             num_batches = 0
             
             for seq, labels in train_loader:
+                if stop_event is not None and stop_event.is_set():
+                    print(f"Treinamento cancelado na época {i}, batch {num_batches}.")
+                    raise TrainingCancelledError(f"Treinamento cancelado na época {i}")
+
                 seq = seq.to(self.device)
                 labels = labels.to(self.device)
 
                 self.optimizer.zero_grad()
-                y_pred = self.model(seq)
-
-                single_loss = self.criterion(y_pred.squeeze(), labels)
+                single_loss = self.compute_loss(seq, labels)
                 single_loss.backward()
                 self.optimizer.step()
                 
@@ -169,11 +194,52 @@ class ModelTrainer:
 
             avg_loss = epoch_loss / num_batches
             loss_history.append(avg_loss)
+            self.epoch_durations.append(time.perf_counter() - epoch_start)
 
             print(f'Época: {i}/{epochs} Perda Média: {avg_loss:.5f}')   
         
         return loss_history
 
+    def compute_loss(self, seq: torch.Tensor, labels: torch.Tensor) -> torch.Tensor:
+        """
+        Calcula a loss do modelo para um batch.
+
+        Args:
+            seq (torch.Tensor): Sequências de entrada (batch_size, seq_length, input_size).
+            labels (torch.Tensor): Valores alvo (batch_size,).
+
+        Returns:
+            torch.Tensor: Loss escalar do batch.
+        """
+        y_pred = self.model(seq)
+        return self.criterion(y_pred.squeeze(), labels)
+
+
+class EnsembleTrainer(ModelTrainer):
+    """
+    Treinador que otimiza todas as réplicas do ensemble com os mesmos batches.
+
+    A loss é o MSE médio sobre (réplica, amostra). Como cada réplica só
+    depende dos próprios pesos, o gradiente de cada uma é o seu gradiente
+    individual dividido por N, e o Adam (invariante à escala do gradiente)
+    produz a mesma trajetória de um treino isolado por seed.
+    """
+
+    def compute_loss(self, seq: torch.Tensor, labels: torch.Tensor) -> torch.Tensor:
+        """
+        Calcula a loss média das réplicas para um batch.
+
+        Args:
+            seq (torch.Tensor): Sequências de entrada (batch_size, seq_length, input_size).
+            labels (torch.Tensor): Valores alvo (batch_size,).
+
+        Returns:
+            torch.Tensor: Loss escalar (média do MSE das réplicas).
+        """
+        y_pred = self.model.forward_members(seq).squeeze(-1)
+        targets = labels.reshape(1, -1).expand_as(y_pred)
+        return self.criterion(y_pred, targets)
+
 
 def run_training_pipeline(
     symbol: str = 'AAPL',
@@ -185,19 +251,22 @@ def run_training_pipeline(
     num_layers: int = 1,
     dropout: float = 0.3,
     hidden_layer_size: int = 16,
-    seed: int = 42
+    seed: int = 42,
+    stop_event: Optional[threading.Event] = None,
+    ensemble_size: int = 1,
+    max_quantized_mape_increase: float = 0.5
 ) -> Dict[str, float]:
     """
     Executa o pipeline completo de treinamento do modelo LSTM.
     
     Realiza as seguintes etapas:
-    0. Configuração de seed para reprodutibilidade
+    0. Criação de geradores aleatórios isolados do job (reprodutibilidade)
     1. Carregamento e processamento de dados
     2. Criação de DataLoaders
     3. Inicialização e treinamento do modelo
     4. Avaliação do modelo
-    5. Salvamento de artefatos
-    6. Logging com MLflow
+    5. Salvamento de artefatos (incluindo exportações ONNX/NumPy e variante int8 do modelo promovido)
+    6. Logging com MLflow (incluindo recursos consumidos pelo job)
     
     Args:
         symbol (str): Símbolo da ação. Padrão: 'AAPL'
@@ -210,14 +279,31 @@ def run_training_pipeline(
         dropout (float): Taxa de dropout. Padrão: 0.2
         hidden_layer_size (int): Tamanho da camada oculta. Padrão: 64
         seed (int): Seed para reprodutibilidade. Padrão: 42
+        stop_event (threading.Event, opcional): Sinal de cancelamento repassado ao
+            ModelTrainer. Padrão: None
+        ensemble_size (int): Número de réplicas treinadas juntas com seeds
+            seed, seed+1, ..., em uma única passagem vetorizada. Padrão: 1
+        max_quantized_mape_increase (float): Aumento máximo de MAPE (pontos
+            percentuais) aceito para salvar a variante int8 do modelo promovido. Padrão: 0.5
     
     Returns:
-        Dict[str, float]: Dicionário com símbolo e métricas (MAE, RMSE, MAPE).
+        Dict[str, float]: Dicionário com símbolo e métricas (MAE, RMSE, MAPE),
+                         além de "resources" (CPU da thread do job, RSS
+                         durante o job, amostras/s, duração das épocas e tempo
+                         por etapa; ver src/resource_tracker.py).
                          Em caso de erro, retorna dicionário com mensagem de erro.
+
+    Raises:
+        TrainingCancelledError: Se o treinamento for cancelado via `stop_event`.
     """
-    # 0. Configurar seed para reprodutibilidade
-    set_seed(seed)
+    # 0. Geradores dedicados ao job (não altera o RNG global do processo,
+    # permitindo jobs concorrentes reproduzíveis)
+    rng = JobRNG(seed)
+    # Flags do cuDNN que set_seed definia: globais, mas iguais para todo job
+    configure_determinism()
     print(f"Seed configurada para: {seed}")
+    # RSS amostrado durante as etapas: o pico do job, não o do processo
+    tracker = ResourceTracker(sample_interval_s=0.2)
     mlflow.set_experiment("Stock_Price_Prediction")
     
     with mlflow.start_run():
@@ -232,50 +318,70 @@ def run_training_pipeline(
             "hidden_layer": hidden_layer_size,
             "num_layers": num_layers,
             "dropout": dropout,
-            "seed": seed
+            "seed": seed,
+            "ensemble_size": ensemble_size
         })
 
         # 1. Carregamento e Processamento de Dados
         processor = DataProcessor(symbol=symbol, start_date=start_date, end_date=end_date)
         try:
-            X_train, y_train, X_test, y_test = processor.get_train_test_data()
+            with tracker.stage("download"):
+                processor.download_data()
+            with tracker.stage("preprocessing"):
+                X_train, y_train, X_test, y_test = processor.get_train_test_data()
         except ValueError as e:
             return {"error": str(e)}
+
+        if stop_event is not None and stop_event.is_set():
+            raise TrainingCancelledError("Treinamento cancelado antes do início")
         
         # Criação de DataLoaders
         # batch_size usará o argumento
         train_data = TensorDataset(X_train, y_train)
         test_data = TensorDataset(X_test, y_test)
         
-        train_loader = DataLoader(train_data, shuffle=True, batch_size=batch_size)
+        train_loader = DataLoader(train_data, shuffle=True, batch_size=batch_size, generator=rng.torch)
         test_loader = DataLoader(test_data, shuffle=False, batch_size=batch_size)
         
         # 2. Inicialização do Modelo
-        model = LSTMModel(input_size=1, hidden_layer_size=hidden_layer_size, output_size=1, num_layers=num_layers, dropout=dropout)
-        trainer = ModelTrainer(model, lr=learning_rate)
+        if ensemble_size > 1:
+            # Réplicas com seeds seed, seed+1, ... treinadas sobre os mesmos batches
+            member_generators = [JobRNG(seed + k).torch for k in range(ensemble_size)]
+            model = EnsembleLSTMModel(ensemble_size=ensemble_size, input_size=1, hidden_layer_size=hidden_layer_size, output_size=1, num_layers=num_layers, dropout=dropout, generators=member_generators)
+            trainer = EnsembleTrainer(model, lr=learning_rate)
+        else:
+            model = LSTMModel(input_size=1, hidden_layer_size=hidden_layer_size, output_size=1, num_layers=num_layers, dropout=dropout, generator=rng.torch)
+            trainer = ModelTrainer(model, lr=learning_rate)
         
         # 3. Treinamento do Modelo
         print(f"Iniciando Treinamento para {symbol}...")
-        loss_history = trainer.train(train_loader, epochs=epochs)
+        with tracker.stage("training"):
+            loss_history = trainer.train(train_loader, epochs=epochs, stop_event=stop_event)
+
+        # Cancelamento durante o treino: nada é avaliado, plotado, registrado ou promovido
+        if stop_event is not None and stop_event.is_set():
+            raise TrainingCancelledError("Treinamento cancelado antes da promoção do modelo")
         
         # Log de train_loss por época
-        for epoch, loss in enumerate(loss_history):
-            mlflow.log_metric("train_loss", loss, step=epoch)
+        with tracker.stage("mlflow_logging"):
+            for epoch, loss in enumerate(loss_history):
+                mlflow.log_metric("train_loss", loss, step=epoch)
         
         # 4. Avaliação do Modelo
         print("Avaliando Modelo...")
-        predictions, actuals, test_loss = evaluate_with_loss(
-            trainer.model, 
-            test_loader, 
-            processor.scaler, 
-            trainer.device,
-            trainer.criterion
-        )
+        with tracker.stage("evaluation"):
+            predictions, actuals, test_loss = evaluate_with_loss(
+                trainer.model, 
+                test_loader, 
+                processor.scaler, 
+                trainer.device,
+                trainer.criterion
+            )
         
-        print(f"Test Loss (MSE): {test_loss:.5f}")
+            print(f"Test Loss (MSE): {test_loss:.5f}")
         
-        # Calcular métricas usando a função existente
-        metrics = calculate_metrics(predictions, actuals)
+            # Calcular métricas usando a função existente
+            metrics = calculate_metrics(predictions, actuals)
         mae = metrics["mae"]
         rmse = metrics["rmse"]
         mape = metrics["mape"]
@@ -285,38 +391,43 @@ def run_training_pipeline(
         print(f"MAPE: {mape:.2f}%")
         
         # Log de Métricas
-        mlflow.log_metrics({
-            "test_loss": test_loss,
-            "mae": mae,
-            "rmse": rmse,
-            "mape": mape
-        })
+        with tracker.stage("mlflow_logging"):
+            mlflow.log_metrics({
+                "test_loss": test_loss,
+                "mae": mae,
+                "rmse": rmse,
+                "mape": mape
+            })
         
         # Plotar curvas de loss
         print("Gerando gráfico de curvas de loss...")
-        loss_plot_path = plot_losses(
-            train_losses=loss_history,
-            test_loss=test_loss,
-            save_path="app/artifacts/loss_curves.png"
-        )
+        with tracker.stage("plotting"):
+            loss_plot_path = plot_losses(
+                train_losses=loss_history,
+                test_loss=test_loss,
+                save_path="app/artifacts/loss_curves.png"
+            )
         print(f"Gráfico de loss salvo em: {loss_plot_path}")
         
         # Log do gráfico no MLflow
-        mlflow.log_artifact(loss_plot_path)
+        with tracker.stage("mlflow_logging"):
+            mlflow.log_artifact(loss_plot_path)
         
         # Plotar predições vs valores reais
         print("Gerando gráfico de predições...")
-        predictions_plot_path = plot_predictions(
-            actuals=actuals.flatten(),
-            predictions=predictions.flatten(),
-            symbol=symbol,
-            num_points=200,
-            save_path="app/artifacts/predictions.png"
-        )
+        with tracker.stage("plotting"):
+            predictions_plot_path = plot_predictions(
+                actuals=actuals.flatten(),
+                predictions=predictions.flatten(),
+                symbol=symbol,
+                num_points=200,
+                save_path="app/artifacts/predictions.png"
+            )
         print(f"Gráfico de predições salvo em: {predictions_plot_path}")
         
         # Log do gráfico de predições no MLflow
-        mlflow.log_artifact(predictions_plot_path)
+        with tracker.stage("mlflow_logging"):
+            mlflow.log_artifact(predictions_plot_path)
         
         # 5. Salvamento de Artefatos
         os.makedirs("app/artifacts", exist_ok=True)
@@ -335,45 +446,153 @@ def run_training_pipeline(
             except:
                 pass
         
+        model_config = {
+            "input_size": 1,
+            "hidden_layer_size": hidden_layer_size,
+            "output_size": 1,
+            "num_layers": num_layers,
+            "dropout": dropout,
+            "ensemble_size": ensemble_size
+        }
+
         # Salvar APENAS se for o melhor modelo
-        if test_loss < best_test_loss:
+        is_best_model = test_loss < best_test_loss
+        quantization = None
+        if is_best_model:
             print(f"✅ Novo melhor modelo! Test Loss: {test_loss:.5f} < {best_test_loss:.5f}")
+
+            # Variante int8 (quantização dinâmica), aceita apenas se o MAPE de teste
+            # não piorar além do limite. Ensembles não usam nn.LSTM e ficam de fora.
+            quantized_model = None
+            if ensemble_size == 1:
+                with tracker.stage("quantization"):
+                    try:
+                        quantized_model = quantize_model(model)
+                        quantized_mape = evaluate_quantized(quantized_model, test_loader, processor.scaler)["mape"]
+                        quantization = {
+                            "quantized_mape": float(quantized_mape),
+                            "accepted": passes_accuracy_gate(float(mape), quantized_mape, max_quantized_mape_increase),
+                            "float_size_bytes": model_size_bytes(model),
+                            "quantized_size_bytes": model_size_bytes(quantized_model)
+                        }
+                        print(f"Quantização int8: MAPE {quantized_mape:.2f}% (float32: {mape:.2f}%) - "
+                              f"{'aceita' if quantization['accepted'] else 'rejeitada'}")
+                    except Exception as e:
+                        print(f"Aviso: não foi possível quantizar o modelo ({e})")
             
-            # Salvar como melhor modelo (backup)
-            torch.save(model.state_dict(), best_model_path)
-            with open(best_loss_file, 'w') as f:
-                f.write(str(test_loss))
-            
-            # Salvar configuração do modelo (para carregar corretamente depois)
-            model_config = {
-                "input_size": 1,
-                "hidden_layer_size": hidden_layer_size,
-                "output_size": 1,
-                "num_layers": num_layers,
-                "dropout": dropout
-            }
-            import json
-            with open("app/artifacts/model_config.json", 'w') as f:
-                json.dump(model_config, f, indent=2)
-            print("Configuração do modelo salva em: app/artifacts/model_config.json")
-            
-            # Salvar como modelo de produção (usado pela API)
-            save_model(model, "app/artifacts/lstm_model.pth")
-            joblib.dump(processor.scaler, "app/artifacts/scaler.pkl")
-            print(f"Modelo de produção atualizado: app/artifacts/lstm_model.pth")
-            print(f"Melhor modelo salvo em: {best_model_path}")
-            
-            # Log no MLflow que este é o melhor modelo
-            mlflow.log_metric("is_best_model", 1.0)
-            mlflow.log_artifact(best_model_path)
-            mlflow.log_artifact("app/artifacts/model_config.json")
+            with tracker.stage("saving"):
+                # Bundle primeiro: é o que a API carrega. A gravação é atômica e, se
+                # falhar, nenhum outro artefato é sobrescrito e o modelo anterior
+                # continua consistente em produção
+                bundle_path = "app/artifacts/model_bundle.lstmb"
+                try:
+                    export_model_bundle(model, bundle_path, model_config, processor.scaler, test_loss=test_loss)
+                    print(f"Bundle do modelo salvo em: {bundle_path}")
+                except Exception as e:
+                    print(f"Aviso: não foi possível salvar o bundle ({e}). Modelo não promovido.")
+                    is_best_model = False
+
+                if is_best_model:
+                    # Salvar como melhor modelo (backup)
+                    torch.save(model.state_dict(), best_model_path)
+
+                    # Salvar configuração do modelo (para carregar corretamente depois)
+                    import json
+                    with open("app/artifacts/model_config.json", 'w') as f:
+                        json.dump(model_config, f, indent=2)
+                    print("Configuração do modelo salva em: app/artifacts/model_config.json")
+
+                    # Salvar como modelo de produção (usado pela API)
+                    save_model(model, "app/artifacts/lstm_model.pth")
+                    joblib.dump(processor.scaler, "app/artifacts/scaler.pkl")
+
+                    # Exporta para ONNX (backend onnxruntime da API); falha não impede a promoção.
+                    # O .onnx registra a versão do bundle para a API recusar um arquivo de outro modelo.
+                    onnx_path = "app/artifacts/lstm_model.onnx"
+                    try:
+                        export_to_onnx(model, onnx_path)
+                        write_artifact_version(onnx_path, read_bundle_version(bundle_path))
+                        print(f"Modelo exportado para ONNX: {onnx_path}")
+                    except Exception as e:
+                        print(f"Aviso: não foi possível exportar o modelo para ONNX ({e})")
+                        # Arquivo antigo pertence ao modelo anterior
+                        remove_artifact(onnx_path)
+
+                    # Pesos em .npz para o backend NumPy (sem PyTorch); ensembles não são suportados
+                    numpy_path = "app/artifacts/lstm_model.npz"
+                    if ensemble_size == 1:
+                        try:
+                            export_numpy_weights(model, numpy_path)
+                            write_artifact_version(numpy_path, read_bundle_version(bundle_path))
+                            print(f"Pesos para o backend NumPy salvos em: {numpy_path}")
+                        except Exception as e:
+                            print(f"Aviso: não foi possível exportar os pesos para NumPy ({e})")
+                            remove_artifact(numpy_path)
+                    else:
+                        remove_artifact(numpy_path)
+
+                    quantized_path = "app/artifacts/lstm_model_int8.pth"
+                    if quantization is not None and quantization["accepted"]:
+                        torch.save(quantized_model.state_dict(), quantized_path)
+                        write_artifact_version(quantized_path, read_bundle_version(bundle_path))
+                        print(f"Modelo int8 salvo em: {quantized_path}")
+                    else:
+                        # Variante antiga pertence ao modelo anterior
+                        remove_artifact(quantized_path)
+
+                    # Por último: o test_loss de referência só muda com a promoção completa
+                    with open(best_loss_file, 'w') as f:
+                        f.write(str(test_loss))
+
+            if is_best_model:
+                print(f"Modelo de produção atualizado: app/artifacts/lstm_model.pth")
+                print(f"Melhor modelo salvo em: {best_model_path}")
+
+                # Log no MLflow que este é o melhor modelo
+                with tracker.stage("mlflow_logging"):
+                    mlflow.log_metric("is_best_model", 1.0)
+                    if quantization is not None:
+                        mlflow.log_metrics({
+                            "quantized_mape": quantization["quantized_mape"],
+                            "quantized_accepted": float(quantization["accepted"]),
+                            "quantized_size_ratio": quantization["quantized_size_bytes"] / max(1, quantization["float_size_bytes"])
+                        })
+                    mlflow.log_artifact(best_model_path)
+                    mlflow.log_artifact("app/artifacts/model_config.json")
+            else:
+                mlflow.log_metric("is_best_model", 0.0)
         else:
             print(f"ℹ️  Modelo atual não é o melhor. Test Loss: {test_loss:.5f} >= {best_test_loss:.5f}")
             print(f"   Mantendo modelo anterior em produção (test_loss: {best_test_loss:.5f})")
             mlflow.log_metric("is_best_model", 0.0)
         
+        # Bundle por símbolo (registro de modelos da API): substitui apenas o modelo
+        # deste símbolo, e só se for melhor que o anterior dele
+        symbol_path = symbol_bundle_path(symbol)
+        is_best_symbol_model = test_loss < read_bundle_test_loss(symbol_path)
+        if is_best_symbol_model:
+            with tracker.stage("saving"):
+                try:
+                    export_model_bundle(model, symbol_path, model_config, processor.scaler, test_loss=test_loss, metadata={"symbol": symbol})
+                    print(f"Modelo de {symbol} salvo em: {symbol_path}")
+                except Exception as e:
+                    # Gravação atômica: o bundle anterior do símbolo continua valendo
+                    print(f"Aviso: não foi possível salvar o modelo de {symbol} ({e})")
+                    is_best_symbol_model = False
+
         # Log do Modelo no MLflow (sempre loga o modelo atual, mesmo que não seja o melhor)
-        mlflow.pytorch.log_model(model, "lstm_model")
+        with tracker.stage("mlflow_logging"):
+            mlflow.pytorch.log_model(model, "lstm_model")
+
+        # 6. Contabilização de recursos do job
+        resources = tracker.summary(
+            epoch_durations=list(trainer.epoch_durations),
+            num_samples=len(train_data) * len(loss_history)
+        )
+        for epoch, duration in enumerate(resources["epoch_durations_s"]):
+            mlflow.log_metric("epoch_duration_s", duration, step=epoch)
+        mlflow.log_metrics(flatten_for_mlflow(resources))
+        print(f"Recursos do job: {resources}")
         
         return {
             "symbol": symbol,
@@ -381,7 +600,10 @@ def run_training_pipeline(
             "rmse": float(rmse),
             "mape": float(mape),
             "test_loss": float(test_loss),
-            "is_best_model": test_loss < best_test_loss
+            "is_best_model": is_best_model,
+            "is_best_symbol_model": is_best_symbol_model,
+            "quantization": quantization,
+            "resources": resources
         }
 
 if __name__ == "__main__":
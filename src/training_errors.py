@@ -0,0 +1,15 @@
+"""
+Exceções do pipeline de treinamento.
+
+Ficam em um módulo sem dependências para que a API possa tratá-las sem
+importar src.train (e, com ele, mlflow, matplotlib e yfinance).
+"""
+
+
+class TrainingCancelledError(Exception):
+    """
+    Exceção lançada quando um treinamento é cancelado externamente.
+
+    Levantada por ModelTrainer.train na fronteira do próximo batch após o
+    sinal de parada (threading.Event) ser acionado.
+    """
@@ -0,0 +1,96 @@
+"""
+Módulo de medição de memória por worker com pesos copiados ou compartilhados.
+
+Simula `uvicorn --workers N`: sobe N processos (spawn, como o uvicorn), cada
+um carrega o mesmo bundle e executa um forward. Com os pesos copiados, cada
+worker tem sua cópia privada; com MODEL_SHARED_WEIGHTS, os parâmetros são
+views do memmap do bundle e as páginas ficam no page cache, compartilhadas
+entre os workers. As medições são feitas com todos os workers vivos, pois o
+PSS divide as páginas compartilhadas entre quem as mapeia.
+
+Uso:
+    python -m src.worker_memory --workers 4 --bundle app/artifacts/model_bundle.lstmb
+"""
+
+import argparse
+import multiprocessing as mp
+from typing import Dict, List
+
+MODES = {"copy": False, "shared": True}
+
+
+def _worker(bundle_path: str, share_weights: bool, barrier, results) -> None:
+    """Carrega o bundle, executa um forward e reporta a memória antes e depois."""
+    import torch
+
+    from src.model_bundle import bundle_to_torch_model, load_bundle
+    from src.resource_tracker import get_memory_usage_mb
+
+    before = get_memory_usage_mb()
+    bundle = load_bundle(bundle_path)
+    model = bundle_to_torch_model(bundle, "cpu", share_weights=share_weights)
+    input_size = bundle.config.get("input_size", 1)
+    with torch.inference_mode():
+        model(torch.zeros(1, 60, input_size))
+    # Mede só depois que todos os workers mapearam os pesos
+    barrier.wait()
+    after = get_memory_usage_mb()
+    results.put({"before": before, "after": after})
+    barrier.wait()
+
+
+def measure_workers(bundle_path: str, workers: int = 4, share_weights: bool = True) -> List[Dict[str, Dict[str, float]]]:
+    """
+    Mede a memória de N workers que carregam o mesmo bundle ao mesmo tempo.
+
+    Args:
+        bundle_path (str): Caminho do bundle.
+        workers (int): Número de processos. Padrão: 4
+        share_weights (bool): Usa pesos mapeados do arquivo em vez de cópias. Padrão: True
+
+    Returns:
+        List[Dict[str, Dict[str, float]]]: Memória (rss_mb, pss_mb, shared_mb,
+            private_mb) de cada worker antes e depois do carregamento.
+    """
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(bundle_path, share_weights, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+    return reports
+
+
+def summarize(reports: List[Dict[str, Dict[str, float]]]) -> Dict[str, float]:
+    """
+    Calcula a média por worker do aumento de RSS e PSS causado pelo carregamento.
+
+    Args:
+        reports (List[Dict[str, Dict[str, float]]]): Saída de measure_workers.
+
+    Returns:
+        Dict[str, float]: Aumento médio de rss_mb, pss_mb e private_mb por worker.
+    """
+    summary = {}
+    for key in ("rss_mb", "pss_mb", "private_mb"):
+        deltas = [report["after"][key] - report["before"][key] for report in reports]
+        summary[f"delta_{key}"] = sum(deltas) / len(deltas) if deltas else 0.0
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memória por worker com pesos copiados ou compartilhados")
+    parser.add_argument("--bundle", default="app/artifacts/model_bundle.lstmb")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'modo':<10}{'Δ RSS (MB)':>14}{'Δ PSS (MB)':>14}{'Δ privada (MB)':>16}")
+    for mode, share in MODES.items():
+        stats = summarize(measure_workers(args.bundle, args.workers, share))
+        print(f"{mode:<10}{stats['delta_rss_mb']:>14.2f}{stats['delta_pss_mb']:>14.2f}{stats['delta_private_mb']:>16.2f}")
@@ -0,0 +1,284 @@
+"""
+Testes para a tabela de previsões diárias pré-calculadas.
+"""
+
+import asyncio
+import threading
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+from app.config import get_settings
+from app.main import app
+from app.routes.predict_route import predict_windows
+from app.utils.daily_forecast import (
+    DailyForecastScheduler,
+    ForecastTable,
+    get_forecast_scheduler,
+    last_session_date,
+    next_run_at,
+    parse_watchlist,
+    run_daily_forecast,
+    seconds_until,
+)
+from app.utils.serving_state import ServingState, publish_serving_state
+from src.lstm_model import LSTMModel
+
+client = TestClient(app)
+
+NY = ZoneInfo("America/New_York")
+RUN_TIME = time(16, 30)
+
+
+def test_parse_watchlist():
+    """Símbolos devem ser normalizados e sem repetição."""
+    assert parse_watchlist(" aapl,MSFT,, AAPL ") == ["AAPL", "MSFT"]
+
+
+def test_session_and_next_run_skip_weekends():
+    """Antes do job vale o pregão anterior; fins de semana são pulados."""
+    monday_morning = datetime(2024, 6, 3, 10, 0, tzinfo=NY)
+    friday_evening = datetime(2024, 5, 31, 17, 0, tzinfo=NY)
+
+    assert last_session_date(monday_morning, RUN_TIME) == date(2024, 5, 31)
+    assert last_session_date(friday_evening, RUN_TIME) == date(2024, 5, 31)
+    assert next_run_at(friday_evening, RUN_TIME) == datetime(2024, 6, 3, 16, 30, tzinfo=NY)
+    assert next_run_at(monday_morning, RUN_TIME) == datetime(2024, 6, 3, 16, 30, tzinfo=NY)
+
+
+def test_seconds_until_next_run_across_dst():
+    """A espera atravessando a troca para o horário de verão tem uma hora a menos."""
+    friday_evening = datetime(2024, 3, 8, 17, 0, tzinfo=NY)
+    monday_run = next_run_at(friday_evening, RUN_TIME)
+
+    assert monday_run == datetime(2024, 3, 11, 16, 30, tzinfo=NY)
+    assert seconds_until(friday_evening, monday_run) == (2 * 24 + 22.5) * 3600
+
+
+def test_table_lookup_and_persistence(tmp_path):
+    """A última previsão é servida por pregão e versão e sobrevive a um reinício."""
+    path = str(tmp_path / "forecasts.sqlite")
+    table = ForecastTable(path)
+    table.upsert([
+        {"symbol": "AAPL", "as_of": "2024-05-30", "model_version": "v1", "predicted_price": 190.0},
+        {"symbol": "AAPL", "as_of": "2024-05-31", "model_version": "v1", "predicted_price": 191.5},
+    ])
+
+    reopened = ForecastTable(path)
+
+    assert reopened.lookup("aapl", date(2024, 5, 31), "v1") == 191.5
+    assert reopened.lookup("AAPL", date(2024, 5, 30), "v1") is None
+    assert reopened.lookup("AAPL", date(2024, 5, 31), "v2") is None
+    assert reopened.missing(["AAPL", "MSFT"], date(2024, 5, 31)) == ["MSFT"]
+
+
+@pytest.mark.asyncio
+async def test_run_daily_forecast_scores_watchlist_in_one_forward(tmp_path):
+    """Os símbolos com dados são previstos e gravados; falhas são reportadas."""
+    model = LSTMModel(input_size=1, hidden_layer_size=4, output_size=1, num_layers=1).eval()
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    table = ForecastTable(str(tmp_path / "forecasts.sqlite"))
+
+    async def fetch(symbol, start_date=None, end_date=None):
+        if symbol == "FAIL":
+            raise HTTPException(status_code=400, detail="sem dados")
+        return [100.0 + i for i in range(60)]
+
+    with patch("app.routes.predict_route.fetch_recent_prices_shared", side_effect=fetch), \
+         patch("app.routes.predict_route.resolve_serving_model", return_value=(model, scaler, "v1")), \
+         patch("app.routes.predict_route.predict_windows", wraps=predict_windows) as predict:
+        report = await run_daily_forecast(table, ["AAPL", "MSFT", "FAIL"], date(2024, 5, 31))
+
+    assert report["scored"] == ["AAPL", "MSFT"]
+    assert report["failed"] == {"FAIL": "sem dados"}
+    assert predict.call_count == 1
+    assert table.lookup("MSFT", date(2024, 5, 31), "v1") is not None
+
+
+@pytest.mark.asyncio
+async def test_run_daily_forecast_isolates_model_resolution_errors(tmp_path):
+    """Um erro ao resolver o modelo de um símbolo não interrompe os demais."""
+    model = LSTMModel(input_size=1, hidden_layer_size=4, output_size=1, num_layers=1).eval()
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    table = ForecastTable(str(tmp_path / "forecasts.sqlite"))
+
+    def resolve(symbol):
+        if symbol == "AAPL":
+            raise HTTPException(status_code=504, detail="tempo esgotado ao carregar o modelo")
+        return model, scaler, "v1"
+
+    with patch("app.routes.predict_route.fetch_recent_prices_shared", AsyncMock(return_value=[100.0 + i for i in range(60)])), \
+         patch("app.routes.predict_route.resolve_serving_model", side_effect=resolve):
+        report = await run_daily_forecast(table, ["AAPL", "MSFT", "GOOG"], date(2024, 5, 31))
+
+    assert report["scored"] == ["MSFT", "GOOG"]
+    assert report["failed"] == {"AAPL": "tempo esgotado ao carregar o modelo"}
+
+
+def failing_run(failures):
+    """run_daily_forecast simulado: MSFT falha nas primeiras `failures` chamadas."""
+    calls = []
+
+    async def run(table, symbols, as_of):
+        calls.append(list(symbols))
+        failed = {"MSFT": "sem dados"} if "MSFT" in symbols and len(calls) <= failures else {}
+        table.upsert([
+            {"symbol": symbol, "as_of": as_of.isoformat(), "model_version": "v1", "predicted_price": 100.0}
+            for symbol in symbols if symbol not in failed
+        ])
+        return {"failed": failed}
+
+    return run, calls
+
+
+async def run_scheduler(scheduler, run, calls, expected_calls):
+    """Roda o laço do agendador até `expected_calls` execuções (e um pouco além)."""
+    loader = MagicMock()
+    loader.wait = AsyncMock()
+    with patch("app.utils.model_loading.get_model_loader", return_value=loader), \
+         patch("app.utils.daily_forecast.run_daily_forecast", side_effect=run):
+        scheduler.start()
+        try:
+            for _ in range(200):
+                if len(calls) >= expected_calls:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+        finally:
+            scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_failed_symbols_with_backoff(tmp_path):
+    """Só os símbolos que falharam são tentados de novo, sem esperar o próximo fechamento."""
+    scheduler = DailyForecastScheduler(
+        ForecastTable(str(tmp_path / "forecasts.sqlite")), ["AAPL", "MSFT"], RUN_TIME, "America/New_York",
+        retry_base_s=0.01
+    )
+    run, calls = failing_run(failures=2)
+
+    await run_scheduler(scheduler, run, calls, expected_calls=3)
+
+    assert calls == [["AAPL", "MSFT"], ["MSFT"], ["MSFT"]]
+    assert scheduler.table.missing(scheduler.symbols, scheduler.current_session()) == []
+
+
+@pytest.mark.asyncio
+async def test_scheduler_stops_retrying_after_attempts(tmp_path):
+    """Esgotadas as novas tentativas, o símbolo espera o próximo fechamento."""
+    scheduler = DailyForecastScheduler(
+        ForecastTable(str(tmp_path / "forecasts.sqlite")), ["AAPL", "MSFT"], RUN_TIME, "America/New_York",
+        retry_attempts=2, retry_base_s=0.01
+    )
+    run, calls = failing_run(failures=100)
+
+    await run_scheduler(scheduler, run, calls, expected_calls=3)
+
+    assert calls == [["AAPL", "MSFT"], ["MSFT"], ["MSFT"]]
+    assert [scheduler.retry_delay(attempt) for attempt in range(3)] == [0.01, 0.02, 0.04]
+
+
+def test_scheduler_is_created_in_lifespan_not_on_request(tmp_path):
+    """/predict nunca cria a tabela: o agendador só existe depois do lifespan."""
+    settings = get_settings()
+    with patch.object(settings, "FORECAST_WATCHLIST", "AAPL"), \
+         patch.object(settings, "FORECAST_DB_PATH", str(tmp_path / "forecasts.sqlite")), \
+         patch.object(settings, "MODEL_BACKGROUND_LOADING", True), \
+         patch("app.main.get_model_loader") as mock_loader, \
+         patch.object(DailyForecastScheduler, "start") as mock_start, \
+         patch("app.utils.daily_forecast._scheduler", None):
+        assert get_forecast_scheduler() is None
+        assert not (tmp_path / "forecasts.sqlite").exists()
+
+        with TestClient(app):
+            scheduler = get_forecast_scheduler()
+            assert scheduler is not None and scheduler.symbols == ["AAPL"]
+            assert (tmp_path / "forecasts.sqlite").exists()
+
+    mock_loader.return_value.start.assert_called_once()
+    mock_start.assert_called_once()
+
+
+def test_predict_serves_precomputed_forecast(tmp_path):
+    """Pedidos do próximo fechamento de símbolos da lista vêm da tabela, sem buscar dados."""
+    scheduler = DailyForecastScheduler(ForecastTable(str(tmp_path / "forecasts.sqlite")), ["AAPL"], RUN_TIME, "America/New_York")
+    scheduler.table.upsert([
+        {"symbol": "AAPL", "as_of": scheduler.current_session().isoformat(), "model_version": "v1", "predicted_price": 191.5}
+    ])
+    fetch = AsyncMock(side_effect=AssertionError("não deveria buscar dados"))
+
+    with patch("app.routes.predict_route.get_forecast_scheduler", return_value=scheduler), \
+         patch("app.routes.predict_route.fetch_recent_prices_shared", fetch), \
+         patch("app.routes.predict_route.get_model_registry", return_value=None), \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = LSTMModel(input_size=1, hidden_layer_size=4, output_size=1, num_layers=1).eval()
+        mock_settings.SCALER = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+        mock_settings.MODEL_VERSION = "v1"
+        response = client.post("/predict", json={"symbol": "aapl"})
+
+    assert response.status_code == 200
+    assert response.json()["predicted_price"] == 191.5
+    fetch.assert_not_called()
+    assert scheduler.table.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_recomputes_when_serving_model_changes(tmp_path):
+    """Um hot-reload (publicado de outra thread) dispara o recálculo da lista com o modelo novo."""
+    scheduler = DailyForecastScheduler(ForecastTable(str(tmp_path / "forecasts.sqlite")), ["AAPL", "MSFT"], RUN_TIME, "America/New_York")
+    scheduler.table.upsert([
+        {"symbol": symbol, "as_of": scheduler.current_session().isoformat(), "model_version": "v1", "predicted_price": 100.0}
+        for symbol in scheduler.symbols
+    ])
+    loader = MagicMock()
+    loader.wait = AsyncMock()
+    run = AsyncMock(return_value={})
+
+    with patch("app.utils.model_loading.get_model_loader", return_value=loader), \
+         patch("app.utils.daily_forecast.run_daily_forecast", run):
+        scheduler.start()
+        try:
+            await asyncio.sleep(0.05)
+            assert run.call_count == 0
+
+            state = ServingState(model=object(), scaler=object(), version="v2")
+            reload = threading.Thread(target=publish_serving_state, args=(SimpleNamespace(), state))
+            reload.start()
+            reload.join()
+            for _ in range(100):
+                if run.call_count:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            scheduler.stop()
+
+    assert run.call_count == 1
+    assert run.call_args.args[1] == ["AAPL", "MSFT"]
+
+
+def test_single_writer_across_workers(tmp_path):
+    """Só um agendador grava a tabela; os demais releem o que ele gravou e assumem se ele parar."""
+    path = str(tmp_path / "forecasts.sqlite")
+    writer = DailyForecastScheduler(ForecastTable(path), ["AAPL"], RUN_TIME, "America/New_York")
+    reader = DailyForecastScheduler(ForecastTable(path), ["AAPL"], RUN_TIME, "America/New_York")
+
+    assert writer.acquire_writer() is True
+    assert reader.acquire_writer() is False
+
+    writer.table.upsert([
+        {"symbol": "AAPL", "as_of": reader.current_session().isoformat(), "model_version": "v1", "predicted_price": 191.5}
+    ])
+    assert reader.lookup("AAPL", "v1") is None
+    reader.table.reload()
+    assert reader.lookup("AAPL", "v1") == 191.5
+
+    writer.stop()
+    assert reader.acquire_writer() is True
+    reader.stop()
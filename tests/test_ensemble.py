@@ -0,0 +1,92 @@
+"""
+Testes para o ensemble vetorizado de modelos LSTM (src/ensemble.py).
+"""
+
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from src.ensemble import EnsembleLSTMModel
+from src.lstm_model import LSTMModel, build_model
+from src.train import EnsembleTrainer
+
+
+@pytest.fixture
+def members():
+    """Três modelos LSTM com seeds diferentes."""
+    return [
+        LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=2, dropout=0.0,
+                  generator=torch.Generator().manual_seed(seed))
+        for seed in (1, 2, 3)
+    ]
+
+
+class TestEnsembleLSTMModel:
+    """Testes para EnsembleLSTMModel."""
+
+    def test_member_outputs_match_individual_models(self, members):
+        """Cada réplica do ensemble deve reproduzir o LSTMModel original."""
+        ensemble = EnsembleLSTMModel.from_members(members).eval()
+        x = torch.randn(4, 10, 1)
+
+        with torch.no_grad():
+            stacked = ensemble.forward_members(x)
+            for k, member in enumerate(members):
+                assert torch.allclose(stacked[k], member.eval()(x), atol=1e-5)
+
+    def test_forward_is_member_mean(self, members):
+        """O forward do ensemble deve retornar a média das réplicas."""
+        ensemble = EnsembleLSTMModel.from_members(members).eval()
+        x = torch.randn(4, 10, 1)
+
+        with torch.no_grad():
+            expected = torch.stack([m.eval()(x) for m in members]).mean(dim=0)
+            assert torch.allclose(ensemble(x), expected, atol=1e-5)
+        assert ensemble(x).shape == (4, 1)
+
+    def test_generators_make_init_reproducible(self):
+        """Geradores iguais devem gerar ensembles idênticos."""
+        make = lambda: EnsembleLSTMModel(
+            ensemble_size=2, hidden_layer_size=4, num_layers=1,
+            generators=[torch.Generator().manual_seed(s) for s in (10, 11)]
+        )
+        for p1, p2 in zip(make().parameters(), make().parameters()):
+            assert torch.equal(p1, p2)
+
+    def test_wrong_number_of_generators(self):
+        """Número de geradores diferente do ensemble deve falhar."""
+        with pytest.raises(ValueError):
+            EnsembleLSTMModel(ensemble_size=3, generators=[torch.Generator()])
+
+    def test_state_dict_roundtrip(self, members):
+        """O state_dict do ensemble deve ser recarregável via build_model."""
+        ensemble = EnsembleLSTMModel.from_members(members)
+        config = {"input_size": 1, "hidden_layer_size": 8, "output_size": 1,
+                  "num_layers": 2, "dropout": 0.0, "ensemble_size": 3}
+        restored = build_model(config)
+        restored.load_state_dict(ensemble.state_dict())
+
+        x = torch.randn(2, 10, 1)
+        with torch.no_grad():
+            assert torch.allclose(restored.eval()(x), ensemble.eval()(x))
+
+
+def test_build_model_single():
+    """build_model sem ensemble_size deve retornar LSTMModel."""
+    config = {"input_size": 1, "hidden_layer_size": 8, "output_size": 1, "num_layers": 1, "dropout": 0.0}
+    assert isinstance(build_model(config), LSTMModel)
+
+
+def test_ensemble_trainer_trains_all_members():
+    """EnsembleTrainer deve atualizar os pesos de todas as réplicas."""
+    ensemble = EnsembleLSTMModel(ensemble_size=2, hidden_layer_size=4, num_layers=1)
+    before = ensemble.weight_hh_l0.detach().clone()
+
+    loader = DataLoader(TensorDataset(torch.randn(8, 5, 1), torch.randn(8)), batch_size=4)
+    trainer = EnsembleTrainer(ensemble, lr=0.01)
+    loss_history = trainer.train(loader, epochs=2)
+
+    assert len(loss_history) == 2
+    after = ensemble.weight_hh_l0.detach().cpu()
+    for k in range(2):
+        assert not torch.equal(before[k], after[k])
@@ -0,0 +1,73 @@
+"""
+Testes para os pools de execução do caminho de predição (app/utils/executors.py).
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.utils.executors import StageTimeoutError, get_executor, run_stage
+
+client = TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_run_stage_runs_off_event_loop():
+    """A função deve rodar em uma thread do pool, fora do event loop."""
+    thread_name = await run_stage("fetch", lambda: threading.current_thread().name)
+    assert thread_name.startswith("predict-fetch")
+
+
+@pytest.mark.asyncio
+async def test_run_stage_timeout():
+    """Etapas lentas devem gerar StageTimeoutError."""
+    with patch.object(get_settings(), "PREDICT_INFERENCE_TIMEOUT_S", 0.05):
+        with pytest.raises(StageTimeoutError) as exc_info:
+            await run_stage("inference", time.sleep, 0.5)
+    assert exc_info.value.stage == "inference"
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive():
+    """O event loop deve continuar processando enquanto uma busca bloqueia."""
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(run_stage("fetch", time.sleep, 0.2), ticker())
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.15
+
+
+def test_unknown_stage():
+    """Etapas desconhecidas devem ser rejeitadas."""
+    with pytest.raises(ValueError):
+        get_executor("unknown")
+
+
+def test_predict_returns_504_on_fetch_timeout():
+    """/predict deve retornar 504 quando a busca de dados excede o limite."""
+    def slow_fetch(*args):
+        time.sleep(0.5)
+        return [1.0] * 60
+
+    with patch("app.routes.predict_route.fetch_recent_prices", side_effect=slow_fetch), \
+         patch.object(get_settings(), "PREDICT_FETCH_TIMEOUT_S", 0.05), \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = object()
+        mock_settings.SCALER = object()
+
+        response = client.post("/predict", json={"symbol": "SLOW"})
+
+    assert response.status_code == 504
+    assert "fetch" in response.json()["detail"]
@@ -0,0 +1,45 @@
+"""
+Testes para o relatório de tempo de importação e a importação preguiçosa do treino.
+"""
+
+import subprocess
+import sys
+
+from src.import_profile import parse_importtime, summarize_imports
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       295 |        295 |     _json
+import time:       669 |        964 |   json.decoder
+import time:       420 |       1384 | json
+import time:       100 |       5000 | mlflow
+import time:       200 |        200 |   matplotlib.pyplot
+"""
+
+
+def test_parse_importtime_skips_header_and_computes_depth():
+    """O cabeçalho deve ser ignorado e o aninhamento inferido da indentação."""
+    records = parse_importtime(SAMPLE)
+
+    assert [record["module"] for record in records][:3] == ["_json", "json.decoder", "json"]
+    assert [record["depth"] for record in records][:3] == [2, 1, 0]
+    assert records[2]["cumulative_us"] == 1384
+
+
+def test_summarize_imports_reports_total_and_training_modules():
+    """O total soma só as importações de primeiro nível."""
+    report = summarize_imports(parse_importtime(SAMPLE), top=1)
+
+    assert report["total_s"] == (1384 + 5000) / 1e6
+    assert report["slowest"] == [("mlflow", 0.005)]
+    assert report["training_modules_loaded"] == ["matplotlib.pyplot", "mlflow"]
+
+
+def test_api_import_does_not_load_training_modules():
+    """Subir a API não deve importar src.train, mlflow nem matplotlib."""
+    code = (
+        "import sys; from app.main import app; "
+        "print('LOADED=' + ','.join(m for m in ('src.train', 'mlflow', 'matplotlib') if m in sys.modules))"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert "LOADED=\n" in completed.stdout + "\n"
@@ -0,0 +1,83 @@
+"""
+Testes para o micro-batching de inferência (app/utils/inference_batcher.py).
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.utils.inference_batcher import InferenceBatcher
+
+
+def make_recording_predict_fn(batch_sizes):
+    """Cria uma função de predição que registra o tamanho de cada lote."""
+    def predict_fn(model, scaler, windows):
+        batch_sizes.append(len(windows))
+        return np.array([window[0] * 2 for window in windows])
+    return predict_fn
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward():
+    """Requisições concorrentes dentro da janela devem gerar um único forward."""
+    batch_sizes = []
+    batcher = InferenceBatcher(make_recording_predict_fn(batch_sizes), max_batch_size=32, max_wait_ms=50)
+
+    results = await asyncio.gather(*(batcher.submit("model", "scaler", [float(i)] * 60) for i in range(10)))
+
+    assert results == [float(i) * 2 for i in range(10)]
+    assert batch_sizes == [10]
+    assert batcher.stats()["avg_batch_size"] == 10
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_splits_batches():
+    """Lotes não devem exceder max_batch_size."""
+    batch_sizes = []
+    batcher = InferenceBatcher(make_recording_predict_fn(batch_sizes), max_batch_size=4, max_wait_ms=50)
+
+    await asyncio.gather(*(batcher.submit("model", "scaler", [1.0] * 60) for _ in range(10)))
+
+    assert sorted(batch_sizes, reverse=True) == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_different_models_not_mixed():
+    """Itens de modelos diferentes devem ir para forwards separados."""
+    calls = []
+
+    def predict_fn(model, scaler, windows):
+        calls.append((model, len(windows)))
+        return np.zeros(len(windows))
+
+    batcher = InferenceBatcher(predict_fn, max_batch_size=32, max_wait_ms=50)
+    await asyncio.gather(
+        batcher.submit("old", "scaler", [1.0] * 60),
+        batcher.submit("new", "scaler", [1.0] * 60),
+        batcher.submit("old", "scaler", [1.0] * 60),
+    )
+
+    assert sorted(calls) == [("new", 1), ("old", 2)]
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_callers():
+    """Erros no forward devem ser repassados a todos os chamadores do lote."""
+    def failing_predict_fn(model, scaler, windows):
+        raise RuntimeError("falha no forward")
+
+    batcher = InferenceBatcher(failing_predict_fn, max_wait_ms=10)
+
+    with pytest.raises(RuntimeError):
+        await batcher.submit("model", "scaler", [1.0] * 60)
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_when_idle():
+    """O worker deve encerrar quando a fila esvazia."""
+    batcher = InferenceBatcher(make_recording_predict_fn([]), max_wait_ms=1)
+    await batcher.submit("model", "scaler", [1.0] * 60)
+    await asyncio.sleep(0.01)
+
+    assert batcher._worker.done()
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from fastapi import FastAPI
 from app.main import lifespan
+from app.utils.model_loading import get_model_loader
 from app.config import Settings
 
 @pytest.fixture
@@ -24,7 +25,7 @@ async def test_lifespan_load_local_success(mock_app):
     }
     
     with patch("app.main.os.path.exists") as mock_exists, \
-         patch("app.main.torch.load") as mock_torch_load, \
+         patch("torch.load") as mock_torch_load, \
          patch("app.main.joblib.load") as mock_joblib_load, \
          patch("app.main.hf_hub_download") as mock_hf_download, \
          patch("builtins.open", mock_open(read_data=json.dumps(mock_config))), \
@@ -47,6 +48,9 @@ async def test_lifespan_load_local_success(mock_app):
             mock_instance = MockModel.return_value
             
             async with lifespan(mock_app):
+                # O carregamento roda em segundo plano: aguarda a publicação
+                await get_model_loader().wait()
+
                 # Verifica se tentou carregar model.pth via torch
                 mock_torch_load.assert_called_once()
                 
@@ -84,6 +88,7 @@ async def test_lifespan_load_hf_fallback(mock_app):
             mock_instance = MockModel.return_value
             
             async with lifespan(mock_app):
+                await get_model_loader().wait()
                 mock_hf.assert_called()
                 mock_instance.load_state_dict.assert_called()
 
@@ -96,6 +101,33 @@ async def test_lifespan_load_fail_gracefully(mock_app):
          
          with patch("src.lstm_model.LSTMModel"): # Mock para não falhar na instanciação
              async with lifespan(mock_app):
-                 # Deve capturar exceção e setar None
-                 assert mock_settings.MODEL is None
-                 assert mock_settings.SCALER is None
+                 await get_model_loader().wait()
+                 # Deve capturar exceção e publicar um snapshot vazio
+                 assert mock_settings.SERVING_STATE.model is None
+                 assert mock_settings.SERVING_STATE.scaler is None
+
+
+@pytest.mark.asyncio
+async def test_lifespan_does_not_block_on_model_loading(mock_app):
+    """A API deve subir antes de o modelo terminar de carregar."""
+    import threading
+    from app.utils.serving_state import ServingState
+
+    release = threading.Event()
+
+    def slow_load(tracker=None):
+        release.wait(5)
+        return ServingState(model="model", scaler="scaler", version="v1")
+
+    with patch("app.main.load_warm_serving_state", side_effect=slow_load), \
+         patch("app.main.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL_BACKGROUND_LOADING = True
+
+        async with lifespan(mock_app):
+            loader = get_model_loader()
+            assert loader.loading
+            release.set()
+            await loader.wait()
+
+            assert loader.status == "loaded"
+            assert mock_settings.SERVING_STATE.version == "v1"
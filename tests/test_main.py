@@ -314,7 +314,7 @@ class TestAppLifespan:
         with patch("app.main.os.path.abspath"), \
              patch("app.main.hf_hub_download"), \
              patch("app.main.joblib.load"), \
-             patch("app.main.torch.load"), \
+             patch("torch.load"), \
              patch("app.main.os.path.exists", return_value=False):
              
             async with lifespan(app):
@@ -397,3 +397,61 @@ class TestAppResponseEncoding:
         
         # Verificar que strings foram decodificadas corretamente
         assert all(isinstance(v, str) for v in data.values())
+
+
+class TestCreateApp:
+    """Testes para a fábrica de aplicações (modos completo e de inferência)."""
+
+    def test_full_mode_mounts_training_routes(self):
+        """O modo completo deve expor treino, auditoria, predição e saúde."""
+        from app.main import create_app
+        paths = {route.path for route in create_app("full").routes}
+        assert {"/train", "/predict", "/health", "/ready", "/"} <= paths
+
+    def test_inference_mode_mounts_only_serving_routes(self):
+        """O modo de inferência não deve expor treino nem auditoria."""
+        from app.main import create_app
+        inference_app = create_app("inference")
+        paths = {route.path for route in inference_app.routes}
+
+        assert {"/predict", "/predict/batch", "/health", "/ready", "/"} <= paths
+        assert not any(path.startswith(("/train", "/api/audit")) for path in paths)
+        assert inference_app.state.mode == "inference"
+        assert TestClient(inference_app).post("/train", json={"symbol": "AAPL"}).status_code == 404
+
+    def test_invalid_mode_raises(self):
+        """Modos desconhecidos devem ser rejeitados."""
+        from app.main import create_app
+        with pytest.raises(ValueError):
+            create_app("training")
+
+    def test_module_app_is_built_on_first_access(self):
+        """Importar create_app não monta a aplicação; `app` é criada uma única vez no acesso."""
+        import app.main as main_module
+
+        saved = main_module.__dict__.pop("app", None)
+        try:
+            with patch("app.main.create_app", wraps=main_module.create_app) as factory:
+                from app.main import create_app  # noqa: F401
+                factory.assert_not_called()
+                first = main_module.app
+                assert main_module.app is first
+            factory.assert_called_once_with()
+        finally:
+            if saved is not None:
+                main_module.app = saved
+
+    def test_inference_mode_does_not_import_training_routes(self):
+        """Com APP_MODE=inference, importar app.main não carrega as rotas de treino e auditoria."""
+        import os
+        import subprocess
+        import sys
+
+        code = (
+            "import sys; from app.main import app; "
+            "print('LOADED=' + ','.join(m for m in ('app.routes.train_route', 'app.routes.audit_route') if m in sys.modules))"
+        )
+        env = dict(os.environ, APP_MODE="inference")
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+
+        assert "LOADED=\n" in completed.stdout + "\n"
@@ -0,0 +1,192 @@
+"""
+Testes para o bundle de modelo em arquivo único (src/model_bundle.py).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import MinMaxScaler
+
+from app.config import get_settings
+from app.routes.train_route import JOBS, train_model_task
+from app.schemas import TrainRequest
+from app.utils.model_loader import load_serving_bundle
+from app.utils.serving_state import ServingState
+from src.lstm_model import LSTMModel, build_model
+from src.model_bundle import (
+    ALIGNMENT,
+    ScalerParams,
+    bundle_to_torch_model,
+    export_model_bundle,
+    is_memory_mapped,
+    load_bundle,
+    read_bundle_header,
+    save_bundle,
+)
+
+CONFIG = {"input_size": 1, "hidden_layer_size": 8, "output_size": 1, "num_layers": 2, "dropout": 0.0, "ensemble_size": 1}
+
+
+@pytest.fixture
+def scaler():
+    """MinMaxScaler ajustado a uma faixa de preços fixa."""
+    return MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+
+
+@pytest.fixture
+def bundle_path(tmp_path, scaler):
+    """Bundle de um LSTMModel pequeno salvo em disco."""
+    torch.manual_seed(0)
+    model = build_model(CONFIG).eval()
+    return export_model_bundle(model, str(tmp_path / "model.lstmb"), CONFIG, scaler, test_loss=0.0123), model
+
+
+def test_scaler_params_match_sklearn(scaler):
+    """transform/inverse_transform devem coincidir com o MinMaxScaler."""
+    params = ScalerParams.from_sklearn(scaler)
+    X = np.array([[75.0], [120.5], [300.0]])
+
+    np.testing.assert_allclose(params.transform(X), scaler.transform(X))
+    np.testing.assert_allclose(params.inverse_transform(params.transform(X)), X)
+
+
+def test_scaler_params_rejects_unfitted():
+    """Scalers sem min_/scale_ não são suportados."""
+    with pytest.raises(ValueError):
+        ScalerParams.from_sklearn(object())
+
+
+def test_round_trip(bundle_path, scaler):
+    """Pesos, config, scaler e test_loss devem sobreviver à ida e volta."""
+    path, model = bundle_path
+
+    bundle = load_bundle(path, verify=True)
+
+    assert bundle.config == CONFIG
+    assert bundle.test_loss == pytest.approx(0.0123)
+    assert len(bundle.version) == 16
+    for name, value in model.state_dict().items():
+        np.testing.assert_array_equal(bundle.tensors[name], value.numpy())
+    np.testing.assert_allclose(bundle.scaler.min_, scaler.min_)
+    np.testing.assert_allclose(bundle.scaler.data_max_, scaler.data_max_)
+
+
+def test_tensors_are_aligned_and_mmapped(bundle_path):
+    """Os tensores devem ficar em offsets alinhados e ser views do arquivo mapeado."""
+    path, _ = bundle_path
+
+    header, data_start = read_bundle_header(path)
+    bundle = load_bundle(path)
+
+    assert data_start % ALIGNMENT == 0
+    assert all(spec["offset"] % ALIGNMENT == 0 for spec in header["tensors"].values())
+    assert all(isinstance(array, np.memmap) for array in bundle.tensors.values())
+
+
+def test_verify_detects_corruption(bundle_path):
+    """Bytes alterados na região dos tensores devem falhar a verificação."""
+    path, _ = bundle_path
+    with open(path, "r+b") as f:
+        f.seek(-4, 2)
+        f.write(b"\xff\xff\xff\xff")
+
+    load_bundle(path)  # sem verificação, carrega normalmente
+    with pytest.raises(ValueError):
+        load_bundle(path, verify=True)
+
+
+def test_invalid_file_is_rejected(tmp_path):
+    """Arquivos que não são bundles devem gerar ValueError."""
+    path = tmp_path / "not_a_bundle.lstmb"
+    path.write_bytes(b"{\"input_size\": 1}")
+
+    with pytest.raises(ValueError):
+        load_bundle(str(path))
+
+
+def test_bundle_to_torch_model_matches_original(bundle_path):
+    """O modelo reconstruído deve produzir as mesmas predições."""
+    path, model = bundle_path
+    x = torch.rand(4, 60, 1)
+
+    restored = bundle_to_torch_model(load_bundle(path))
+
+    assert isinstance(restored, LSTMModel)
+    with torch.no_grad():
+        assert torch.equal(restored(x), model(x))
+
+
+def test_shared_weights_are_views_of_the_mapped_file(bundle_path):
+    """Com share_weights, os parâmetros apontam para o memmap (sem cópia) e as predições não mudam."""
+    path, model = bundle_path
+    bundle = load_bundle(path)
+    mapped = bundle.tensors["lstm.weight_ih_l0"]
+    x = torch.rand(4, 60, 1)
+
+    shared = bundle_to_torch_model(bundle, share_weights=True)
+
+    assert is_memory_mapped(bundle)
+    assert shared.lstm.weight_ih_l0.data_ptr() == mapped.ctypes.data
+    assert not any(param.requires_grad for param in shared.parameters())
+    with torch.no_grad():
+        assert torch.equal(shared(x), model(x))
+
+
+def test_shared_weights_fall_back_to_copy_without_mmap(bundle_path):
+    """Bundles lidos para a memória (mmap=False) são copiados normalmente."""
+    path, model = bundle_path
+    bundle = load_bundle(path, mmap=False)
+
+    restored = bundle_to_torch_model(bundle, share_weights=True)
+
+    assert not is_memory_mapped(bundle)
+    assert restored.lstm.weight_ih_l0.data_ptr() != bundle.tensors["lstm.weight_ih_l0"].ctypes.data
+
+
+def test_save_is_atomic(tmp_path, scaler):
+    """Regravar o bundle não deve deixar arquivos temporários para trás."""
+    path = str(tmp_path / "model.lstmb")
+    state = {"w": np.arange(6, dtype=np.float32).reshape(2, 3)}
+
+    save_bundle(path, state, CONFIG, scaler)
+    save_bundle(path, {"w": state["w"] * 2}, CONFIG, scaler)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["model.lstmb"]
+    np.testing.assert_array_equal(load_bundle(path).tensors["w"], state["w"] * 2)
+
+
+def test_concurrent_saves_do_not_share_temp_file(tmp_path, scaler):
+    """Gravações simultâneas do mesmo bundle devem terminar com um arquivo completo."""
+    path = str(tmp_path / "model.lstmb")
+    states = [{"w": np.full((64, 64), i, dtype=np.float32)} for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda state: save_bundle(path, state, CONFIG, scaler), states))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["model.lstmb"]
+    weights = load_bundle(path, verify=True).tensors["w"]
+    assert any(np.array_equal(weights, state["w"]) for state in states)
+
+
+def test_hot_reload_prefers_bundle(bundle_path):
+    """O hot-reload deve trocar modelo, scaler e versão a partir do bundle."""
+    path, _ = bundle_path
+    job_id = "test-bundle-reload"
+    JOBS[job_id] = {"job_id": job_id, "status": "pending", "result": None, "error": None}
+    settings = get_settings()
+    loaded = load_serving_bundle(path)
+
+    with patch("app.routes.train_route.run_training_pipeline", return_value={"mae": 0.1, "is_best_model": True}), \
+         patch("app.routes.train_route.load_serving_bundle", return_value=loaded), \
+         patch("joblib.load") as mock_joblib_load, \
+         patch.object(settings, "SERVING_STATE", ServingState()):
+        train_model_task(job_id, TrainRequest(symbol="TEST", epochs=1))
+
+        assert settings.MODEL is loaded.model
+        assert isinstance(settings.SCALER, ScalerParams)
+        assert settings.MODEL_VERSION == loaded.version
+
+    mock_joblib_load.assert_not_called()
@@ -0,0 +1,174 @@
+"""
+Testes para o carregamento do modelo em segundo plano.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import app
+from app.utils.model_loading import BackgroundModelLoader, get_model_loader
+from app.utils.serving_state import ServingState
+
+client = TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_loader_publishes_state_and_phase_timings():
+    """O snapshot carregado deve ser publicado e as fases medidas."""
+    settings = Settings()
+    loader = BackgroundModelLoader()
+
+    def load(tracker):
+        with tracker.stage("weights"):
+            pass
+        with tracker.stage("warmup"):
+            pass
+        return ServingState(model="model", scaler="scaler", version="v1")
+
+    loader.start(settings, load)
+    await loader.wait(timeout=5)
+
+    assert loader.status == "loaded"
+    assert settings.SERVING_STATE.version == "v1"
+    stats = loader.stats()
+    assert set(stats["phases_s"]) == {"weights", "warmup"}
+    assert stats["elapsed_s"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_loader_failure_publishes_empty_state():
+    """Uma falha no carregamento não derruba a API: publica um snapshot vazio."""
+    settings = Settings()
+    loader = BackgroundModelLoader()
+
+    def load(tracker):
+        raise RuntimeError("hub indisponível")
+
+    loader.start(settings, load)
+    await loader.wait(timeout=5)
+
+    assert loader.status == "failed"
+    assert "hub indisponível" in loader.stats()["error"]
+    assert settings.SERVING_STATE.model is None
+
+
+@pytest.mark.asyncio
+async def test_loader_without_model_is_failed():
+    """Um carregamento que termina sem modelo (erro capturado em load_fn) não conta como carregado."""
+    settings = Settings()
+    loader = BackgroundModelLoader()
+
+    loader.start(settings, lambda tracker: ServingState(scaler="scaler"))
+    await loader.wait(timeout=5)
+
+    assert loader.status == "failed"
+    assert "modelo ou scaler não carregado" in loader.stats()["error"]
+    assert settings.SERVING_STATE.model is None
+
+
+def test_predict_returns_retry_after_while_loading():
+    """Enquanto o modelo carrega, /predict deve responder 503 com Retry-After."""
+    with patch.object(get_model_loader(), "status", "loading"), \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = None
+        mock_settings.PREDICT_FETCH_CONCURRENCY = 4
+        response = client.post("/predict/batch", json={"windows": [[1.0] * 60]})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(Settings().MODEL_LOADING_RETRY_AFTER_S)
+
+
+def test_ready_reports_loading_status():
+    """/ready deve indicar que o modelo ainda está carregando."""
+    with patch.object(get_model_loader(), "status", "loading"), \
+         patch("app.routes.health_route.__SETTINGS__", Settings()):
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+    assert response.json()["loading"]["status"] == "loading"
+    assert "Retry-After" in response.headers
+
+
+def test_ready_reports_failed_loading():
+    """/ready deve indicar que o carregamento falhou, com o motivo."""
+    loader = get_model_loader()
+    with patch.object(loader, "status", "failed"), \
+         patch.object(loader, "error", "hub indisponível"), \
+         patch("app.routes.health_route.__SETTINGS__", Settings()):
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert response.json()["loading"]["error"] == "hub indisponível"
+    assert "Retry-After" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_loader_does_not_overwrite_newer_snapshot():
+    """Um snapshot publicado durante o carregamento (ex: hot-reload) não é sobrescrito."""
+    import threading
+
+    from app.utils.serving_state import publish_serving_state
+
+    settings = Settings()
+    loader = BackgroundModelLoader()
+    release = threading.Event()
+    reloaded = ServingState(model="novo", scaler="scaler", version="v2")
+
+    def load(tracker):
+        release.wait(timeout=5)
+        return ServingState(model="inicial", scaler="scaler", version="v1")
+
+    loader.start(settings, load)
+    publish_serving_state(settings, reloaded)
+    release.set()
+    await loader.wait(timeout=5)
+
+    assert loader.status == "loaded"
+    assert settings.SERVING_STATE is reloaded
+
+
+@pytest.mark.asyncio
+async def test_loader_failure_keeps_ready_snapshot():
+    """Uma falha no carregamento não troca um modelo pronto por um snapshot vazio."""
+    settings = Settings()
+    ready = ServingState(model="model", scaler="scaler", version="v1")
+    settings.SERVING_STATE = ready
+    loader = BackgroundModelLoader()
+
+    def load(tracker):
+        raise RuntimeError("hub indisponível")
+
+    loader.start(settings, load)
+    await loader.wait(timeout=5)
+
+    assert loader.status == "failed"
+    assert settings.SERVING_STATE is ready
+
+
+@pytest.mark.asyncio
+async def test_loader_stop_cancels_pending_load():
+    """No desligamento, um carregamento em andamento é cancelado e nada é publicado."""
+    import threading
+
+    settings = Settings()
+    loader = BackgroundModelLoader()
+    release = threading.Event()
+
+    def load(tracker):
+        release.wait(timeout=5)
+        return ServingState(model="model", scaler="scaler", version="v1")
+
+    task = loader.start(settings, load)
+    loader.stop()
+    release.set()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert loader.status == "idle"
+    assert settings.SERVING_STATE.model is None
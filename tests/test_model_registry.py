@@ -0,0 +1,230 @@
+"""
+Testes para o registro de modelos por símbolo com residência LRU.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+from app.main import app
+from app.routes.predict_route import predict_windows
+from app.utils.model_loader import LoadedModel
+from app.utils.model_registry import ModelRegistry
+from src.lstm_model import build_model
+from src.model_bundle import export_model_bundle, symbol_bundle_path
+
+client = TestClient(app)
+
+CONFIG = {"input_size": 1, "hidden_layer_size": 8, "output_size": 1, "num_layers": 1, "dropout": 0.0}
+
+
+def touch_bundle(models_dir, symbol):
+    """Cria um arquivo de bundle vazio para o símbolo (o loader é simulado)."""
+    path = symbol_bundle_path(symbol, str(models_dir))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    return path
+
+
+def fake_loader(nbytes=100):
+    """Loader que devolve um LoadedModel distinto a cada carregamento."""
+    def load(path):
+        return LoadedModel(model=object(), scaler=None, config={}, version=os.path.basename(path), path=path, nbytes=nbytes)
+    return load
+
+
+def test_missing_symbol_returns_none(tmp_path):
+    """Símbolos sem bundle próprio usam o modelo global."""
+    registry = ModelRegistry(str(tmp_path), loader=fake_loader())
+
+    assert registry.get("AAPL") is None
+    assert registry.stats()["misses"] == 1
+
+
+def test_loads_once_and_normalizes_symbol(tmp_path):
+    """O bundle é carregado no primeiro uso e reaproveitado depois."""
+    touch_bundle(tmp_path, "AAPL")
+    registry = ModelRegistry(str(tmp_path), loader=fake_loader())
+
+    first = registry.get("aapl ")
+    assert registry.get("AAPL") is first
+
+    stats = registry.stats()
+    assert stats["loads"] == 1
+    assert stats["hits"] == 1
+
+
+def test_lru_eviction_by_count(tmp_path):
+    """Além de max_models, o menos usado recentemente é despejado."""
+    for symbol in ("AAA", "BBB", "CCC"):
+        touch_bundle(tmp_path, symbol)
+    registry = ModelRegistry(str(tmp_path), max_models=2, loader=fake_loader())
+
+    registry.get("AAA")
+    registry.get("BBB")
+    registry.get("AAA")
+    registry.get("CCC")
+
+    stats = registry.stats()
+    assert stats["resident_models"] == ["AAA", "CCC"]
+    assert stats["evictions"] == 1
+
+
+def test_eviction_by_memory(tmp_path):
+    """O limite de memória dos pesos também provoca despejo."""
+    for symbol in ("AAA", "BBB"):
+        touch_bundle(tmp_path, symbol)
+    registry = ModelRegistry(str(tmp_path), max_models=10, max_bytes=150, loader=fake_loader(nbytes=100))
+
+    registry.get("AAA")
+    registry.get("BBB")
+
+    stats = registry.stats()
+    assert stats["resident_models"] == ["BBB"]
+    assert stats["resident_bytes"] == 100
+
+
+def test_rewritten_bundle_is_reloaded(tmp_path):
+    """Um bundle regravado pelo treino deve ser recarregado no próximo acesso."""
+    path = touch_bundle(tmp_path, "AAPL")
+    registry = ModelRegistry(str(tmp_path), loader=fake_loader())
+    first = registry.get("AAPL")
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert registry.get("AAPL") is not first
+    assert registry.stats()["loads"] == 2
+
+
+def test_concurrent_misses_share_one_load(tmp_path):
+    """Requisições simultâneas de um símbolo frio devem esperar um único carregamento."""
+    touch_bundle(tmp_path, "AAPL")
+    release = threading.Event()
+    calls = []
+
+    def slow_loader(path):
+        calls.append(path)
+        release.wait(timeout=5)
+        return fake_loader()(path)
+
+    registry = ModelRegistry(str(tmp_path), loader=slow_loader)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(registry.get, "AAPL") for _ in range(8)]
+        while registry.stats()["shared_loads"] < 7:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert registry.stats()["loading"] == []
+
+
+def test_failed_load_is_shared_and_retried(tmp_path):
+    """A exceção do carregamento chega a quem esperava e a próxima chamada tenta de novo."""
+    touch_bundle(tmp_path, "AAPL")
+    attempts = []
+
+    def failing_loader(path):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise OSError("disco indisponível")
+        return fake_loader()(path)
+
+    registry = ModelRegistry(str(tmp_path), loader=failing_loader)
+    with pytest.raises(OSError):
+        registry.get("AAPL")
+
+    assert registry.get("AAPL") is not None
+    assert len(attempts) == 2
+
+
+@pytest.fixture
+def symbol_registry(tmp_path):
+    """Registro real com um bundle treinado apenas para AAA."""
+    torch.manual_seed(1)
+    model = build_model(CONFIG).eval()
+    scaler = MinMaxScaler().fit(np.array([[10.0], [500.0]]))
+    export_model_bundle(model, symbol_bundle_path("AAA", str(tmp_path)), CONFIG, scaler)
+    return ModelRegistry(str(tmp_path))
+
+
+def fake_download(symbol, **kwargs):
+    """Simula o yfinance com 80 fechamentos crescentes."""
+    return pd.DataFrame({"Close": [100.0 + i for i in range(80)]})
+
+
+def test_routes_use_symbol_model(symbol_registry):
+    """Símbolos com bundle usam o próprio modelo; os demais, o modelo global."""
+    torch.manual_seed(2)
+    global_model = build_model(CONFIG).eval()
+    global_scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    window = [100.0 + i for i in range(20, 80)]
+
+    with patch("yfinance.download", side_effect=fake_download), \
+         patch("app.routes.predict_route.get_model_registry", return_value=symbol_registry), \
+         patch("app.routes.predict_route.get_prediction_cache", return_value=None), \
+         patch("app.routes.predict_route.get_inference_batcher", return_value=None), \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = global_model
+        mock_settings.SCALER = global_scaler
+        mock_settings.PREDICT_FETCH_CONCURRENCY = 4
+
+        single = client.post("/predict", json={"symbol": "aaa"})
+        batch = client.post("/predict/batch", json={"symbols": ["AAA", "BBB"]})
+
+    symbol_entry = symbol_registry.get("AAA")
+    expected_symbol = predict_windows(symbol_entry.model, symbol_entry.scaler, [window])[0]
+    expected_global = predict_windows(global_model, global_scaler, [window])[0]
+
+    assert single.status_code == 200
+    assert single.json()["predicted_price"] == pytest.approx(expected_symbol, rel=1e-5)
+    results = batch.json()["results"]
+    assert results[0]["predicted_price"] == pytest.approx(expected_symbol, rel=1e-5)
+    assert results[1]["predicted_price"] == pytest.approx(expected_global, rel=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_registry_lookup_runs_off_the_event_loop(tmp_path):
+    """A busca no registro (que pode ler o disco) roda no pool de I/O."""
+    import threading
+
+    from app.routes.predict_route import resolve_serving_model_async
+
+    touch_bundle(tmp_path, "AAPL")
+    threads = []
+
+    def loader(path):
+        threads.append(threading.current_thread())
+        return fake_loader()(path)
+
+    registry = ModelRegistry(str(tmp_path), loader=loader)
+    with patch("app.routes.predict_route.get_model_registry", return_value=registry):
+        _, _, version = await resolve_serving_model_async("AAPL")
+
+    assert version == "AAPL.lstmb"
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_registry_models_use_configured_backend_and_warmup(symbol_registry):
+    """Modelos do registro passam pelo backend configurado e pelo warmup antes de entrar."""
+    from app.config import get_settings
+    from app.utils.inference_backend import NumpyBackend
+
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "numpy"), \
+         patch("app.utils.model_registry.warm_serving_state", side_effect=lambda state: state) as warm:
+        entry = symbol_registry.get("AAA")
+
+    assert isinstance(entry.model, NumpyBackend)
+    warm.assert_called_once()
+    assert warm.call_args.args[0].model is entry.model
@@ -0,0 +1,178 @@
+"""
+Testes para o repositório de bundles por símbolo no HuggingFace Hub com cache local.
+"""
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from app.utils.model_loader import LoadedModel
+from app.utils.model_registry import ModelRegistry
+from app.utils.model_store import HubModelStore
+from src.model_bundle import save_bundle, symbol_bundle_path
+
+CONFIG = {"input_size": 1, "hidden_layer_size": 4, "output_size": 1, "num_layers": 1, "dropout": 0.0}
+
+
+class FakeHub:
+    """Simula hf_hub_download servindo bundles a partir de um diretório."""
+
+    def __init__(self, hub_dir, fail=False):
+        self.hub_dir = str(hub_dir)
+        self.fail = fail
+        self.calls = []
+
+    def publish(self, symbol, size=16):
+        """Publica no Hub simulado um bundle com `size` pesos."""
+        path = os.path.join(self.hub_dir, "models", f"{symbol}.lstmb")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        scaler = MinMaxScaler().fit(np.array([[0.0], [1.0]]))
+        save_bundle(path, {"w": np.arange(size, dtype=np.float32)}, CONFIG, scaler)
+        return path
+
+    def __call__(self, repo_id, filename, revision=None, local_dir=None):
+        self.calls.append(filename)
+        if self.fail:
+            raise ConnectionError("Hub fora do ar")
+        source = os.path.join(self.hub_dir, filename)
+        if not os.path.exists(source):
+            raise FileNotFoundError(filename)
+        target = os.path.join(local_dir, filename)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            dst.write(src.read())
+        return target
+
+
+def make_store(tmp_path, hub, **kwargs):
+    """Repositório com cache em tmp_path/cache e o Hub simulado."""
+    return HubModelStore("user/models", str(tmp_path / "cache"), downloader=hub, **kwargs)
+
+
+def test_downloads_once_and_serves_from_cache(tmp_path):
+    """O primeiro uso baixa o bundle; os seguintes vêm do cache local."""
+    hub = FakeHub(tmp_path / "hub")
+    hub.publish("AAPL")
+    store = make_store(tmp_path, hub)
+
+    first = store.resolve("aapl", wait=True)
+    second = store.resolve("AAPL", wait=True)
+
+    assert first == second == symbol_bundle_path("AAPL", str(tmp_path / "cache"))
+    assert hub.calls == ["models/AAPL.lstmb"]
+    assert store.stats()["cached_symbols"] == ["AAPL"]
+    assert not os.path.exists(tmp_path / "cache" / ".staging" / "AAPL")
+
+
+def test_offline_uses_only_the_cache(tmp_path):
+    """Em modo offline, símbolos em cache são servidos e nenhum download é feito."""
+    hub = FakeHub(tmp_path / "hub")
+    hub.publish("AAPL")
+    hub.publish("MSFT")
+    make_store(tmp_path, hub).resolve("AAPL", wait=True)
+    hub.calls.clear()
+
+    offline = make_store(tmp_path, hub, offline=True)
+
+    assert offline.resolve("AAPL", wait=True) is not None
+    assert offline.resolve("MSFT", wait=True) is None
+    assert hub.calls == []
+
+
+def test_hub_failure_is_not_retried_within_ttl(tmp_path):
+    """Falhas de rede entram no cache negativo, mas o cache local continua servindo."""
+    hub = FakeHub(tmp_path / "hub")
+    hub.publish("AAPL")
+    store = make_store(tmp_path, hub)
+    store.resolve("AAPL", wait=True)
+
+    hub.fail = True
+    assert store.resolve("MSFT", wait=True) is None
+    assert store.resolve("MSFT", wait=True) is None
+    assert store.resolve("AAPL", wait=True) is not None
+    assert hub.calls.count("models/MSFT.lstmb") == 1
+
+
+def test_corrupted_bundles_are_rejected(tmp_path):
+    """Downloads e arquivos em cache corrompidos não são instalados."""
+    hub = FakeHub(tmp_path / "hub")
+    published = hub.publish("AAPL")
+    cached = make_store(tmp_path, hub).resolve("AAPL", wait=True)
+
+    for path in (published, cached):
+        with open(path, "r+b") as f:
+            f.seek(-4, 2)
+            f.write(b"\xff\xff\xff\xff")
+
+    # Novo processo: o arquivo em cache é verificado antes do primeiro uso
+    store = make_store(tmp_path, hub)
+
+    assert store.resolve("AAPL", wait=True) is None
+    assert not os.path.exists(cached)
+    assert store.stats()["rejected"] == 2
+
+
+def test_cache_hits_do_not_verify_the_bundle(tmp_path):
+    """Depois de instalado, o bundle é servido sem ser lido, verificado nem tocado."""
+    hub = FakeHub(tmp_path / "hub")
+    hub.publish("AAPL")
+    store = make_store(tmp_path, hub)
+    path = store.resolve("AAPL", wait=True)
+
+    with patch("app.utils.model_store.load_bundle") as verify, \
+         patch("app.utils.model_store.os.utime") as utime:
+        for _ in range(3):
+            assert store.resolve("AAPL") == path
+
+    verify.assert_not_called()
+    utime.assert_not_called()
+    assert store.stats()["cache_hits"] == 3
+
+
+def test_bundle_removed_from_disk_is_downloaded_again(tmp_path):
+    """Um bundle apagado por outro worker (ou pelo operador) sai da memória e é baixado de novo."""
+    hub = FakeHub(tmp_path / "hub")
+    hub.publish("AAPL")
+    store = make_store(tmp_path, hub)
+    path = store.resolve("AAPL", wait=True)
+    os.remove(path)
+
+    assert store.resolve("AAPL", wait=True) == path
+    assert os.path.exists(path)
+    assert store.stats()["downloads"] == 2
+
+
+def test_cache_is_bounded_by_size(tmp_path):
+    """Ao passar do limite, os bundles usados há mais tempo são removidos."""
+    hub = FakeHub(tmp_path / "hub")
+    for symbol in ("AAA", "BBB", "CCC"):
+        hub.publish(symbol, size=1024)
+    bundle_size = os.path.getsize(os.path.join(hub.hub_dir, "models", "AAA.lstmb"))
+    store = make_store(tmp_path, hub, max_bytes=int(bundle_size * 2.5))
+
+    store.resolve("AAA", wait=True)
+    store.resolve("BBB", wait=True)
+    store.resolve("AAA", wait=True)  # BBB passa a ser o usado há mais tempo
+    store.resolve("CCC", wait=True)
+
+    assert store.stats()["cached_symbols"] == ["AAA", "CCC"]
+    assert store.stats()["evictions"] == 1
+
+
+def test_registry_falls_back_to_the_store(tmp_path):
+    """Sem bundle local, o registro carrega o bundle resolvido pelo Hub."""
+    hub = FakeHub(tmp_path / "hub")
+    hub.publish("AAPL")
+    store = make_store(tmp_path, hub)
+
+    def loader(path):
+        return LoadedModel(model=object(), scaler=None, config={}, version=path, path=path)
+
+    registry = ModelRegistry(str(tmp_path / "local"), loader=loader, resolver=lambda symbol: store.resolve(symbol, wait=True))
+
+    entry = registry.get("AAPL")
+
+    assert entry is not None and entry.path == symbol_bundle_path("AAPL", store.cache_dir)
+    assert registry.get("MSFT") is None
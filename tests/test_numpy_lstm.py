@@ -0,0 +1,137 @@
+"""
+Testes para o forward do LSTMModel em NumPy puro (src/numpy_lstm.py).
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import MinMaxScaler
+
+from app.config import get_settings
+from app.routes.predict_route import predict_windows
+from app.utils.inference_backend import NumpyBackend, load_serving_model
+from src.lstm_model import LSTMModel
+from src.numpy_lstm import NumpyLSTM, export_numpy_weights
+
+
+def to_numpy_state(model):
+    """Converte o state_dict do modelo para arrays NumPy."""
+    return {key: value.detach().numpy() for key, value in model.state_dict().items()}
+
+
+@pytest.mark.parametrize("num_layers,hidden", [(1, 16), (2, 8), (3, 32)])
+def test_matches_torch(num_layers, hidden):
+    """As saídas devem coincidir com as do PyTorch dentro da tolerância."""
+    torch.manual_seed(0)
+    model = LSTMModel(input_size=1, hidden_layer_size=hidden, output_size=1, num_layers=num_layers).eval()
+    batch = np.random.default_rng(0).random((7, 60, 1), dtype=np.float32)
+
+    with torch.no_grad():
+        expected = model(torch.from_numpy(batch)).numpy()
+    actual = NumpyLSTM(to_numpy_state(model)).forward(batch)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+def test_large_inputs_do_not_overflow():
+    """Entradas extremas não devem gerar NaN/inf na sigmoide."""
+    model = LSTMModel(input_size=1, hidden_layer_size=4, output_size=1, num_layers=1).eval()
+    batch = np.full((1, 60, 1), 1e4, dtype=np.float32)
+
+    assert np.all(np.isfinite(NumpyLSTM(to_numpy_state(model)).forward(batch)))
+
+
+def test_npz_round_trip(tmp_path):
+    """Pesos exportados em .npz devem reproduzir a mesma saída."""
+    model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=2).eval()
+    path = export_numpy_weights(model, str(tmp_path / "model.npz"))
+    batch = np.random.default_rng(1).random((3, 60, 1), dtype=np.float32)
+
+    loaded = NumpyLSTM.from_npz(path)
+
+    assert loaded.num_layers == 2
+    np.testing.assert_allclose(loaded.forward(batch), NumpyLSTM(to_numpy_state(model)).forward(batch))
+
+
+def test_predict_windows_with_numpy_backend():
+    """predict_windows deve produzir o mesmo preço com os backends torch e NumPy."""
+    model = LSTMModel(input_size=1, hidden_layer_size=16, output_size=1, num_layers=1).eval()
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    windows = [[100.0 + i for i in range(60)], [200.0 - i for i in range(60)]]
+
+    torch_prices = predict_windows(model, scaler, windows)
+    numpy_prices = predict_windows(NumpyBackend(NumpyLSTM(to_numpy_state(model))), scaler, windows)
+
+    np.testing.assert_allclose(numpy_prices, torch_prices, rtol=1e-5)
+
+
+def test_load_serving_model_numpy_backend(tmp_path):
+    """O backend NumPy deve vir do .npz ou, na falta dele, do modelo carregado."""
+    model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=1).eval()
+    npz_path = tmp_path / "lstm_model.npz"
+
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "numpy"), \
+         patch("app.utils.inference_backend.NUMPY_WEIGHTS_PATH", str(npz_path)):
+        converted = load_serving_model(model)
+        export_numpy_weights(model, str(npz_path))
+        loaded = load_serving_model(None)
+
+    assert isinstance(converted, NumpyBackend)
+    assert isinstance(loaded, NumpyBackend)
+
+
+def test_stale_npz_is_ignored(tmp_path):
+    """Um .npz exportado de outros pesos não deve ser servido."""
+    from src.model_bundle import write_artifact_version
+
+    old_model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=1).eval()
+    new_model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=1).eval()
+    npz_path = str(tmp_path / "lstm_model.npz")
+    export_numpy_weights(old_model, npz_path)
+    write_artifact_version(npz_path, "v1")
+    batch = np.random.default_rng(2).random((2, 60, 1), dtype=np.float32)
+
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "numpy"), \
+         patch("app.utils.inference_backend.NUMPY_WEIGHTS_PATH", npz_path):
+        served = load_serving_model(new_model, version="v2")
+
+    np.testing.assert_allclose(served.predict(batch), NumpyLSTM(to_numpy_state(new_model)).forward(batch), atol=1e-6)
+
+
+def test_numpy_backend_loads_bundle_without_torch_model(tmp_path):
+    """Com o backend NumPy, o bundle vira um NumpyBackend sem instanciar o LSTMModel."""
+    from app.utils.model_loader import load_serving_bundle
+    from src.model_bundle import export_model_bundle
+
+    model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=2).eval()
+    config = {"input_size": 1, "hidden_layer_size": 8, "output_size": 1, "num_layers": 2, "dropout": 0.0}
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    path = export_model_bundle(model, str(tmp_path / "model.lstmb"), config, scaler)
+    batch = np.random.default_rng(3).random((2, 60, 1), dtype=np.float32)
+
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "numpy"), \
+         patch("src.model_bundle.bundle_to_torch_model") as to_torch:
+        loaded = load_serving_bundle(path)
+
+    to_torch.assert_not_called()
+    assert isinstance(loaded.model, NumpyBackend)
+    assert load_serving_model(loaded.model, version=loaded.version) is loaded.model
+    with torch.no_grad():
+        expected = model(torch.from_numpy(batch)).numpy()
+    np.testing.assert_allclose(loaded.model.predict(batch), expected, atol=1e-5)
+
+
+def test_inference_app_imports_without_torch():
+    """No modo de inferência com backend NumPy, importar a API não carrega o PyTorch."""
+    import os
+    import subprocess
+    import sys
+
+    code = "import sys; from app.main import app; print('torch' in sys.modules)"
+    env = dict(os.environ, APP_MODE="inference", INFERENCE_BACKEND="numpy")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+    assert result.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,144 @@
+"""
+Testes para a exportação ONNX e o backend onnxruntime.
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import MinMaxScaler
+
+from src.lstm_model import LSTMModel
+from src.ensemble import EnsembleLSTMModel
+from src.onnx_export import export_to_onnx, max_onnx_deviation
+from src.benchmark import benchmark_latency, torch_predict_fn
+
+ort = pytest.importorskip("onnxruntime")
+
+from app.utils.inference_backend import OnnxBackend, load_serving_model  # noqa: E402
+from app.routes.predict_route import predict_windows  # noqa: E402
+
+
+@pytest.fixture
+def trained_like_model():
+    """Modelo LSTM pequeno com pesos fixos."""
+    torch.manual_seed(0)
+    return LSTMModel(input_size=1, hidden_layer_size=16, output_size=1, num_layers=1).eval()
+
+
+def test_export_creates_file(trained_like_model, tmp_path):
+    """A exportação deve gerar o arquivo .onnx."""
+    path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    assert (tmp_path / "model.onnx").exists()
+    assert path.endswith("model.onnx")
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 32])
+def test_onnx_parity_with_torch(trained_like_model, tmp_path, batch_size):
+    """As saídas do onnxruntime devem coincidir com as do PyTorch (batch dinâmico)."""
+    path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    batch = np.random.default_rng(1).random((batch_size, 60, 1), dtype=np.float32)
+
+    assert max_onnx_deviation(trained_like_model, path, batch) < 1e-5
+
+
+def test_onnx_parity_two_layers(tmp_path):
+    """Modelos com mais de uma camada também devem manter a paridade."""
+    model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=2, dropout=0.3).eval()
+    path = export_to_onnx(model, str(tmp_path / "model.onnx"))
+    batch = np.random.default_rng(2).random((4, 60, 1), dtype=np.float32)
+
+    assert max_onnx_deviation(model, path, batch) < 1e-5
+
+
+def test_onnx_parity_ensemble(tmp_path):
+    """O ensemble vetorizado também deve ser exportável."""
+    model = EnsembleLSTMModel(ensemble_size=3, input_size=1, hidden_layer_size=8, output_size=1, num_layers=1).eval()
+    path = export_to_onnx(model, str(tmp_path / "ensemble.onnx"))
+    batch = np.random.default_rng(3).random((5, 60, 1), dtype=np.float32)
+
+    assert max_onnx_deviation(model, path, batch) < 1e-5
+
+
+def test_predict_windows_with_onnx_backend(trained_like_model, tmp_path):
+    """predict_windows deve produzir o mesmo preço com os dois backends."""
+    path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    windows = [[100.0 + i for i in range(60)], [200.0 - i for i in range(60)]]
+
+    torch_prices = predict_windows(trained_like_model, scaler, windows)
+    onnx_prices = predict_windows(OnnxBackend(path), scaler, windows)
+
+    np.testing.assert_allclose(onnx_prices, torch_prices, rtol=1e-5)
+
+
+def test_load_serving_model_falls_back_to_torch(trained_like_model, tmp_path):
+    """Sem o arquivo .onnx, o modelo PyTorch deve continuar sendo servido."""
+    from app.config import get_settings
+
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "onnx"), \
+         patch("app.utils.inference_backend.ONNX_MODEL_PATH", str(tmp_path / "missing.onnx")):
+        assert load_serving_model(trained_like_model) is trained_like_model
+
+    path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "onnx"), \
+         patch("app.utils.inference_backend.ONNX_MODEL_PATH", path):
+        assert isinstance(load_serving_model(trained_like_model), OnnxBackend)
+
+
+def test_load_serving_model_rejects_onnx_of_other_weights(trained_like_model, tmp_path):
+    """Um .onnx exportado de outros pesos não deve ser servido no lugar do modelo atual."""
+    from app.config import get_settings
+    from src.model_bundle import write_artifact_version
+
+    path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "onnx"), \
+         patch("app.utils.inference_backend.ONNX_MODEL_PATH", path):
+        # Sem registro de versão: não é possível garantir que é o mesmo modelo
+        assert load_serving_model(trained_like_model, version="v2") is trained_like_model
+
+        write_artifact_version(path, "v1")
+        assert load_serving_model(trained_like_model, version="v2") is trained_like_model
+        assert isinstance(load_serving_model(trained_like_model, version="v1"), OnnxBackend)
+
+def test_onnx_backend_loads_bundle_without_torch(trained_like_model, tmp_path):
+    """Com o backend ONNX, o bundle é servido pelo onnxruntime sem importar o PyTorch."""
+    import os
+    import subprocess
+    import sys
+
+    from src.model_bundle import export_model_bundle, read_bundle_version, write_artifact_version
+
+    config = {"input_size": 1, "hidden_layer_size": 16, "output_size": 1, "num_layers": 1, "dropout": 0.0}
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    bundle_path = export_model_bundle(trained_like_model, str(tmp_path / "model.lstmb"), config, scaler)
+    onnx_path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    write_artifact_version(onnx_path, read_bundle_version(bundle_path))
+
+    code = (
+        "import sys\n"
+        "import app.utils.inference_backend as backends\n"
+        f"backends.ONNX_MODEL_PATH = {onnx_path!r}\n"
+        "from app.utils.model_loader import load_serving_bundle\n"
+        f"loaded = load_serving_bundle({bundle_path!r})\n"
+        "print(type(loaded.model).__name__, 'torch' in sys.modules)\n"
+    )
+    env = dict(os.environ, INFERENCE_BACKEND="onnx")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+    assert result.stdout.strip().splitlines()[-1] == "OnnxBackend False"
+
+
+def test_latency_comparison(trained_like_model, tmp_path):
+    """O benchmark deve medir os dois backends sobre o mesmo lote."""
+    path = export_to_onnx(trained_like_model, str(tmp_path / "model.onnx"))
+    batch = np.random.default_rng(4).random((32, 60, 1), dtype=np.float32)
+    onnx_backend = OnnxBackend(path)
+
+    torch_stats = benchmark_latency(torch_predict_fn(trained_like_model), batch, warmup=2, runs=10)
+    onnx_stats = benchmark_latency(onnx_backend.predict, batch, warmup=2, runs=10)
+
+    for stats in (torch_stats, onnx_stats):
+        assert stats["p50_ms"] > 0
+        assert stats["p95_ms"] >= stats["p50_ms"]
@@ -0,0 +1,96 @@
+"""
+Testes para a rota de predição em lote (/predict/batch).
+"""
+
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+from app.main import app
+from src.lstm_model import LSTMModel
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def serving_settings():
+    """Settings mockado com um modelo LSTM real e um scaler ajustado."""
+    model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=1).eval()
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+
+    with patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = model
+        mock_settings.SCALER = scaler
+        mock_settings.PREDICT_FETCH_CONCURRENCY = 4
+        yield mock_settings
+
+
+def fake_download(symbol, **kwargs):
+    """Simula o yfinance: 'SHORT' retorna poucos dados."""
+    if symbol == "SHORT":
+        return pd.DataFrame({"Close": [100.0] * 10})
+    base = 100.0 if symbol == "AAA" else 200.0
+    return pd.DataFrame({"Close": [base + i for i in range(80)]})
+
+
+def test_batch_matches_single_predictions(serving_settings):
+    """Cada resultado do lote deve ser igual à predição individual."""
+    window = [120.0 + i * 0.5 for i in range(60)]
+
+    with patch("yfinance.download", side_effect=fake_download):
+        batch = client.post("/predict/batch", json={"symbols": ["AAA", "BBB"], "windows": [window]})
+        single_aaa = client.post("/predict", json={"symbol": "AAA"})
+        single_window = client.post("/predict", json={"last_60_days_prices": window})
+
+    assert batch.status_code == 200
+    results = batch.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["symbol"] == "AAA"
+    assert results[0]["predicted_price"] == pytest.approx(single_aaa.json()["predicted_price"], rel=1e-5)
+    assert results[2]["predicted_price"] == pytest.approx(single_window.json()["predicted_price"], rel=1e-5)
+
+
+def test_batch_reports_errors_per_item(serving_settings):
+    """Itens inválidos recebem erro sem impedir os demais."""
+    with patch("yfinance.download", side_effect=fake_download):
+        response = client.post("/predict/batch", json={"symbols": ["AAA", "SHORT"], "windows": [[1.0] * 10]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["predicted_price"] is not None
+    assert results[1]["predicted_price"] is None
+    assert "SHORT" in results[1]["error"]
+    assert "60" in results[2]["error"]
+
+
+def test_batch_single_forward(serving_settings):
+    """Todas as janelas válidas devem ser avaliadas em um único forward."""
+    spy_model = MagicMock(wraps=serving_settings.MODEL)
+    spy_model.parameters.side_effect = serving_settings.MODEL.parameters
+    serving_settings.MODEL = spy_model
+
+    windows = [[100.0 + i] * 60 for i in range(5)]
+    response = client.post("/predict/batch", json={"windows": windows})
+
+    assert response.status_code == 200
+    assert spy_model.call_count == 1
+    assert spy_model.call_args[0][0].shape == (5, 60, 1)
+
+
+def test_batch_requires_items():
+    """Requisição sem itens deve ser rejeitada."""
+    response = client.post("/predict/batch", json={})
+    assert response.status_code == 422
+
+
+def test_batch_model_not_loaded():
+    """Sem modelo carregado, deve retornar 503."""
+    with patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = None
+        mock_settings.PREDICT_FETCH_CONCURRENCY = 4
+        response = client.post("/predict/batch", json={"windows": [[1.0] * 60]})
+    assert response.status_code == 503
@@ -0,0 +1,116 @@
+"""
+Testes para a previsão recursiva de vários passos (/predict/horizon).
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+from app.main import app
+from app.routes.predict_route import predict_horizon_windows
+from app.utils.inference_backend import InferenceBackend, NumpyBackend
+from src.ensemble import EnsembleLSTMModel
+from src.lstm_model import LSTMModel, forecast_recursive
+from src.numpy_lstm import NumpyLSTM
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def model():
+    """LSTMModel pequeno em modo de avaliação."""
+    torch.manual_seed(0)
+    return LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=1).eval()
+
+
+@pytest.fixture
+def serving_settings(model):
+    """Settings mockado com um modelo LSTM real e um scaler ajustado."""
+    with patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = model
+        mock_settings.SCALER = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+        mock_settings.PREDICT_FETCH_CONCURRENCY = 4
+        yield mock_settings
+
+
+def test_forecast_slides_window(model):
+    """Cada passo deve ser o forward sobre a janela de 60 passos deslizada."""
+    x = torch.rand(2, 60, 1)
+    with torch.no_grad():
+        forecast = forecast_recursive(model, x, steps=3)
+        expected_first = model(x)
+        expected_third = model(torch.cat([x[:, 2:], forecast[:, :2].unsqueeze(-1)], dim=1))
+
+    assert forecast.shape == (2, 3)
+    assert torch.allclose(forecast[:, :1], expected_first, atol=1e-6)
+    assert torch.allclose(forecast[:, 2:3], expected_third, atol=1e-5)
+
+
+def test_forecast_slides_window_for_ensemble():
+    """Modelos sem estado exposto devem deslizar a janela de 60 passos."""
+    ensemble = EnsembleLSTMModel(ensemble_size=2, input_size=1, hidden_layer_size=4, output_size=1, num_layers=1).eval()
+    x = torch.rand(3, 60, 1)
+    with torch.no_grad():
+        forecast = forecast_recursive(ensemble, x, steps=2)
+        expected_second = ensemble(torch.cat([x[:, 1:], forecast[:, :1].unsqueeze(-1)], dim=1))
+
+    assert torch.allclose(forecast[:, 1:2], expected_second, atol=1e-6)
+
+
+def test_horizon_with_numpy_backend():
+    """Backends sem PyTorch devem usar a janela deslizante em NumPy."""
+    class MeanBackend(InferenceBackend):
+        def predict(self, batch):
+            return batch.mean(axis=1)
+
+    scaler = MinMaxScaler().fit(np.array([[0.0], [1.0]]))
+    forecast = predict_horizon_windows(MeanBackend(), scaler, [[0.5] * 60], horizon=4)
+
+    np.testing.assert_allclose(forecast, [[0.5] * 4], rtol=1e-6)
+
+
+def test_horizon_same_for_torch_and_numpy_backends(model):
+    """O horizonte não deve depender do backend de inferência."""
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    windows = [[120.0 + i * 0.5 for i in range(60)], [200.0 - i for i in range(60)]]
+    state = {key: value.detach().numpy() for key, value in model.state_dict().items()}
+
+    torch_forecast = predict_horizon_windows(model, scaler, windows, horizon=5)
+    numpy_forecast = predict_horizon_windows(NumpyBackend(NumpyLSTM(state)), scaler, windows, horizon=5)
+
+    np.testing.assert_allclose(numpy_forecast, torch_forecast, rtol=1e-4)
+
+
+def fake_download(symbol, **kwargs):
+    """Simula o yfinance: 'SHORT' retorna poucos dados."""
+    if symbol == "SHORT":
+        return pd.DataFrame({"Close": [100.0] * 10})
+    return pd.DataFrame({"Close": [100.0 + i for i in range(80)]})
+
+
+def test_horizon_endpoint(serving_settings):
+    """O primeiro passo deve coincidir com /predict e erros devem ser por item."""
+    window = [120.0 + i * 0.5 for i in range(60)]
+
+    with patch("yfinance.download", side_effect=fake_download):
+        response = client.post("/predict/horizon", json={"symbols": ["AAA", "SHORT"], "windows": [window], "horizon": 5})
+        single = client.post("/predict", json={"last_60_days_prices": window})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["horizon"] == 5
+    results = body["results"]
+    assert len(results[0]["predicted_prices"]) == 5
+    assert results[1]["predicted_prices"] is None and results[1]["error"]
+    assert results[2]["predicted_prices"][0] == pytest.approx(single.json()["predicted_price"], rel=1e-5)
+
+
+def test_horizon_validation():
+    """Horizonte fora dos limites deve ser rejeitado."""
+    response = client.post("/predict/horizon", json={"windows": [[1.0] * 60], "horizon": 0})
+    assert response.status_code == 422
@@ -0,0 +1,113 @@
+"""
+Testes para o cache de predições por símbolo (app/utils/prediction_cache.py).
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.prediction_cache import PredictionCache, compute_model_version, make_prediction_key
+
+client = TestClient(app)
+
+
+class FakeClock:
+    """Relógio controlável para testar expiração."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_and_miss_counts():
+    """Acertos e falhas devem ser contabilizados na taxa de acerto."""
+    cache = PredictionCache(max_entries=10, ttl_s=60)
+    key = make_prediction_key("aapl", None, "2024-01-01", "v1")
+
+    assert cache.get(key) is None
+    cache.set(key, 150.0)
+    assert cache.get(key) == 150.0
+    assert cache.get(make_prediction_key("AAPL ", None, "2024-01-01", "v1")) == 150.0
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 2 / 3
+
+
+def test_ttl_expiration():
+    """Entradas expiradas não devem ser retornadas."""
+    clock = FakeClock()
+    cache = PredictionCache(ttl_s=10, clock=clock)
+    cache.set("k", 1.0)
+
+    clock.now = 9.0
+    assert cache.get("k") == 1.0
+    clock.now = 10.5
+    assert cache.get("k") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    """A entrada menos usada recentemente deve ser removida primeiro."""
+    cache = PredictionCache(max_entries=2, ttl_s=60)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    cache.get("a")
+    cache.set("c", 3.0)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1.0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_model_version_changes_key_and_invalidate_clears():
+    """Versões diferentes do modelo não compartilham entradas."""
+    cache = PredictionCache()
+    cache.set(make_prediction_key("AAPL", None, None, "v1"), 1.0)
+
+    assert cache.get(make_prediction_key("AAPL", None, None, "v2")) is None
+    cache.invalidate()
+    assert cache.get(make_prediction_key("AAPL", None, None, "v1")) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_compute_model_version(tmp_path):
+    """A versão deve depender do conteúdo dos pesos."""
+    path = tmp_path / "model.pth"
+    path.write_bytes(b"pesos-1")
+    v1 = compute_model_version(str(path))
+    path.write_bytes(b"pesos-2")
+
+    assert v1 != compute_model_version(str(path))
+    assert compute_model_version(str(tmp_path / "missing.pth")) is None
+
+
+def test_predict_route_uses_cache():
+    """Chamadas repetidas ao mesmo símbolo não devem buscar dados novamente."""
+    with patch("app.routes.predict_route.fetch_recent_prices", return_value=[100.0] * 60) as mock_fetch, \
+         patch("app.routes.predict_route.predict_windows", return_value=np.array([123.0])), \
+         patch("app.routes.predict_route.get_inference_batcher", return_value=None), \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = object()
+        mock_settings.SCALER = object()
+        mock_settings.MODEL_VERSION = "cache-test-v1"
+
+        first = client.post("/predict", json={"symbol": "CACHED", "end_date": "2024-01-01"})
+        second = client.post("/predict", json={"symbol": "CACHED", "end_date": "2024-01-01"})
+        assert mock_fetch.call_count == 1
+
+        # Novo modelo: a entrada anterior não deve ser reutilizada
+        mock_settings.MODEL_VERSION = "cache-test-v2"
+        client.post("/predict", json={"symbol": "CACHED", "end_date": "2024-01-01"})
+        assert mock_fetch.call_count == 2
+
+    assert first.json()["predicted_price"] == second.json()["predicted_price"] == 123.0
+
+    stats = client.get("/predict/cache/stats").json()
+    assert stats["enabled"] is True
+    assert stats["hits"] >= 1
@@ -0,0 +1,114 @@
+"""
+Testes para a quantização dinâmica int8 do modelo (src/quantization.py).
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import MinMaxScaler
+from torch.utils.data import DataLoader, TensorDataset
+
+from app.config import get_settings
+from app.routes.predict_route import predict_windows
+from app.utils.inference_backend import load_serving_model
+from src.benchmark import benchmark_latency, torch_predict_fn
+from src.lstm_model import LSTMModel
+from src.quantization import (
+    evaluate_quantized,
+    load_quantized_model,
+    model_size_bytes,
+    passes_accuracy_gate,
+    quantize_model,
+)
+
+
+@pytest.fixture
+def float_model():
+    """Modelo float32 com pesos fixos."""
+    torch.manual_seed(0)
+    return LSTMModel(input_size=1, hidden_layer_size=64, output_size=1, num_layers=1).eval()
+
+
+def test_quantized_output_close_to_float(float_model):
+    """A saída int8 deve ficar próxima da saída float32."""
+    quantized = quantize_model(float_model)
+    batch = torch.rand(8, 60, 1)
+
+    with torch.no_grad():
+        diff = (quantized(batch) - float_model(batch)).abs().max().item()
+
+    assert diff < 0.05
+    assert isinstance(float_model.lstm, torch.nn.LSTM)  # original não é alterado
+
+
+def test_quantized_model_is_smaller(float_model):
+    """Os pesos int8 devem ocupar menos espaço que os float32."""
+    assert model_size_bytes(quantize_model(float_model)) < model_size_bytes(float_model)
+
+
+def test_save_and_load_round_trip(float_model, tmp_path):
+    """Os pesos int8 salvos devem reproduzir a mesma saída ao carregar."""
+    quantized = quantize_model(float_model)
+    path = tmp_path / "model_int8.pth"
+    torch.save(quantized.state_dict(), path)
+
+    loaded = load_quantized_model(LSTMModel(input_size=1, hidden_layer_size=64, output_size=1, num_layers=1), str(path))
+    batch = torch.rand(4, 60, 1)
+    with torch.no_grad():
+        assert torch.allclose(loaded(batch), quantized(batch))
+
+
+def test_accuracy_gate():
+    """O gate deve aceitar apenas aumentos de MAPE dentro do limite."""
+    assert passes_accuracy_gate(2.0, 2.3, 0.5)
+    assert not passes_accuracy_gate(2.0, 2.6, 0.5)
+    assert not passes_accuracy_gate(2.0, float("nan"), 0.5)
+
+
+def test_evaluate_quantized_returns_metrics(float_model):
+    """A avaliação do modelo int8 deve retornar MAE, RMSE e MAPE."""
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    loader = DataLoader(TensorDataset(torch.rand(10, 60, 1), torch.rand(10, 1) + 0.5), batch_size=5)
+
+    metrics = evaluate_quantized(quantize_model(float_model), loader, scaler)
+
+    assert set(metrics) == {"mae", "rmse", "mape"}
+    assert np.isfinite(metrics["mape"])
+
+
+def test_predict_windows_with_quantized_model(float_model):
+    """predict_windows deve funcionar com o modelo int8 (sem parâmetros float)."""
+    scaler = MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+    windows = [[100.0 + i for i in range(60)]]
+
+    float_price = predict_windows(float_model, scaler, windows)
+    quantized_price = predict_windows(quantize_model(float_model), scaler, windows)
+
+    np.testing.assert_allclose(quantized_price, float_price, atol=10.0)
+
+
+def test_load_serving_model_uses_quantized_variant(float_model, tmp_path):
+    """Com USE_QUANTIZED_MODEL, a variante int8 deve ser servida se existir."""
+    path = tmp_path / "lstm_model_int8.pth"
+
+    with patch.object(get_settings(), "USE_QUANTIZED_MODEL", True), \
+         patch("app.utils.inference_backend.QUANTIZED_MODEL_PATH", str(path)):
+        assert load_serving_model(float_model) is float_model
+
+        torch.save(quantize_model(float_model).state_dict(), path)
+        served = load_serving_model(float_model)
+
+    assert served is not float_model
+    assert type(served.lstm) is not torch.nn.LSTM
+
+
+def test_latency_benchmark_float_vs_int8(float_model):
+    """O benchmark deve medir as duas variantes sobre o mesmo lote."""
+    batch = np.random.default_rng(0).random((32, 60, 1), dtype=np.float32)
+
+    float_stats = benchmark_latency(torch_predict_fn(float_model), batch, warmup=2, runs=10)
+    int8_stats = benchmark_latency(torch_predict_fn(quantize_model(float_model)), batch, warmup=2, runs=10)
+
+    assert float_stats["p50_ms"] > 0 and int8_stats["p50_ms"] > 0
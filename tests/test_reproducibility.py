@@ -8,7 +8,7 @@ quando o treinamento é executado com os mesmos parâmetros.
 import pytest
 import torch
 import numpy as np
-from src.seed_manager import set_seed, worker_init_fn, get_worker_seed
+from src.seed_manager import set_seed, worker_init_fn, get_worker_seed, JobRNG, configure_determinism
 from src.train import run_training_pipeline
 from src.lstm_model import LSTMModel
 
@@ -89,6 +89,59 @@ class TestSeedManager:
         assert values1 == values2, "worker_init_fn não é reproduzível"
 
 
+class TestJobRNG:
+    """Testes para geradores isolados por job (JobRNG)."""
+
+    def test_job_rng_reproducible(self):
+        """Verifica se dois JobRNG com a mesma seed geram os mesmos valores."""
+        rng1, rng2 = JobRNG(42), JobRNG(42)
+
+        assert torch.allclose(torch.rand(5, generator=rng1.torch), torch.rand(5, generator=rng2.torch))
+
+    def test_configure_determinism_sets_cudnn_flags(self):
+        """Verifica se as flags do cuDNN que set_seed definia continuam configuradas."""
+        torch.backends.cudnn.deterministic = False
+        torch.backends.cudnn.benchmark = True
+
+        configure_determinism()
+
+        assert torch.backends.cudnn.deterministic is True
+        assert torch.backends.cudnn.benchmark is False
+
+    def test_model_init_ignores_global_rng(self):
+        """Verifica se a inicialização com gerador dedicado independe do RNG global."""
+        torch.manual_seed(1)
+        model1 = LSTMModel(input_size=1, hidden_layer_size=16, output_size=1, generator=JobRNG(7).torch)
+
+        torch.manual_seed(999)
+        torch.rand(100)  # Outro "job" consumindo o RNG global
+        model2 = LSTMModel(input_size=1, hidden_layer_size=16, output_size=1, generator=JobRNG(7).torch)
+
+        for p1, p2 in zip(model1.parameters(), model2.parameters()):
+            assert torch.equal(p1, p2), "Pesos dependem do RNG global"
+
+    def test_interleaved_jobs_shuffle_independently(self):
+        """Verifica se jobs intercalados mantêm a ordem de shuffle reproduzível."""
+        from torch.utils.data import DataLoader, TensorDataset
+
+        dataset = TensorDataset(torch.arange(20).float())
+
+        def first_epoch_order(generator):
+            return torch.cat([batch[0] for batch in DataLoader(dataset, batch_size=5, shuffle=True, generator=generator)])
+
+        expected = first_epoch_order(JobRNG(3).torch)
+
+        job_a, job_b = JobRNG(3), JobRNG(11)
+        iter_a = iter(DataLoader(dataset, batch_size=5, shuffle=True, generator=job_a.torch))
+        iter_b = iter(DataLoader(dataset, batch_size=5, shuffle=True, generator=job_b.torch))
+        order_a = []
+        for batch_a, _ in zip(iter_a, iter_b):
+            torch.rand(10)  # Perturba o RNG global entre os batches
+            order_a.append(batch_a[0])
+
+        assert torch.equal(torch.cat(order_a), expected)
+
+
 class TestTrainingReproducibility:
     """Testes de reprodutibilidade do pipeline de treinamento."""
     
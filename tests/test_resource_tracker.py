@@ -0,0 +1,132 @@
+"""
+Testes para a contabilização de recursos dos jobs (src/resource_tracker.py).
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.resource_tracker import (
+    ResourceTracker,
+    flatten_for_mlflow,
+    get_current_rss_mb,
+    get_memory_usage_mb,
+    get_peak_rss_mb,
+)
+
+
+class TestResourceTracker:
+    """Testes para ResourceTracker."""
+
+    def test_stage_accumulates_duration(self):
+        """Etapas com o mesmo nome devem ser somadas."""
+        tracker = ResourceTracker()
+        with tracker.stage("plotting"):
+            time.sleep(0.01)
+        with tracker.stage("plotting"):
+            time.sleep(0.01)
+
+        assert tracker.stage_durations["plotting"] >= 0.02
+
+    def test_stage_recorded_on_exception(self):
+        """A duração deve ser registrada mesmo se a etapa falhar."""
+        tracker = ResourceTracker()
+        try:
+            with tracker.stage("download"):
+                raise ValueError("falha")
+        except ValueError:
+            pass
+
+        assert "download" in tracker.stage_durations
+
+    def test_summary_fields(self):
+        """O resumo deve conter as métricas esperadas."""
+        tracker = ResourceTracker()
+        with tracker.stage("training"):
+            time.sleep(0.01)
+
+        summary = tracker.summary(epoch_durations=[0.5, 0.4], num_samples=100)
+
+        assert summary["epoch_durations_s"] == [0.5, 0.4]
+        assert summary["samples_per_second"] > 0
+        assert summary["thread_cpu_time_s"] >= 0
+        assert summary["process_cpu_time_s"] >= 0
+        assert "training" in summary["stage_durations_s"]
+        assert "training" in summary["stage_thread_cpu_times_s"]
+        assert "process_peak_rss_mb" in summary
+
+    def test_stage_thread_cpu_ignores_other_threads(self):
+        """O CPU da etapa é o da thread do job, sem o trabalho de outras threads."""
+        def spin():
+            end = time.perf_counter() + 0.3
+            while time.perf_counter() < end:
+                pass
+
+        tracker = ResourceTracker()
+        with tracker.stage("training"):
+            other = threading.Thread(target=spin)
+            other.start()
+            other.join()
+
+        assert tracker.stage_thread_cpu_times["training"] < 0.1
+
+    def test_rss_peak_is_sampled_during_stages(self):
+        """O pico de RSS do job deve refletir uma alocação feita (e liberada) durante a etapa."""
+        if get_current_rss_mb() is None:
+            pytest.skip("RSS atual indisponível nesta plataforma")
+        tracker = ResourceTracker(sample_interval_s=0.01)
+        with tracker.stage("training"):
+            block = bytearray(64 * 1024 * 1024)
+            block[::4096] = b"x" * len(block[::4096])
+            time.sleep(0.1)
+            del block
+
+        summary = tracker.summary(epoch_durations=[], num_samples=0)
+
+        assert summary["rss_growth_mb"] >= 32
+        assert summary["rss_peak_mb"] >= summary["rss_end_mb"]
+        assert tracker._sampler is None
+
+    def test_summary_without_training_stage(self):
+        """Sem etapa de treino, a vazão deve ser zero."""
+        summary = ResourceTracker().summary(epoch_durations=[], num_samples=10)
+        assert summary["samples_per_second"] == 0.0
+
+
+def test_peak_rss_positive():
+    """O pico de RSS deve ser positivo quando disponível."""
+    peak = get_peak_rss_mb()
+    assert peak is None or peak > 0
+
+
+def test_memory_usage_parses_smaps_rollup(tmp_path):
+    """RSS, PSS e as partes compartilhada e privada devem vir do smaps_rollup."""
+    smaps = tmp_path / "smaps_rollup"
+    smaps.write_text(
+        "00400000-7fff [rollup]\n"
+        "Rss:               20480 kB\n"
+        "Pss:               12288 kB\n"
+        "Shared_Clean:       8192 kB\n"
+        "Shared_Dirty:          0 kB\n"
+        "Private_Clean:      2048 kB\n"
+        "Private_Dirty:     10240 kB\n"
+    )
+
+    usage = get_memory_usage_mb(str(smaps))
+
+    assert usage == {"rss_mb": 20.0, "pss_mb": 12.0, "shared_mb": 8.0, "private_mb": 12.0}
+    assert get_memory_usage_mb(str(tmp_path / "missing")) is None
+
+
+def test_flatten_for_mlflow():
+    """Listas são omitidas e dicionários viram métricas com prefixo."""
+    summary = {
+        "thread_cpu_time_s": 1.5,
+        "rss_growth_mb": None,
+        "epoch_durations_s": [0.1, 0.2],
+        "stage_durations_s": {"training": 2.0},
+    }
+    metrics = flatten_for_mlflow(summary)
+
+    assert metrics == {"resource_thread_cpu_time_s": 1.5, "resource_stage_durations_s_training": 2.0}
@@ -0,0 +1,84 @@
+"""
+Testes para o snapshot imutável do modelo em serviço (troca atômica no hot-reload).
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from app.config import Settings
+from app.routes.predict_route import resolve_serving_model
+from app.routes.train_route import JOBS, train_model_task
+from app.schemas import TrainRequest
+from app.utils.serving_state import ServingState, current_serving_state, publish_serving_state
+
+
+def test_settings_fields_are_views_of_the_snapshot():
+    """MODEL, SCALER e MODEL_VERSION devem refletir o snapshot publicado."""
+    settings = Settings()
+    publish_serving_state(settings, ServingState(model="m1", scaler="s1", version="v1"))
+
+    assert (settings.MODEL, settings.SCALER, settings.MODEL_VERSION) == ("m1", "s1", "v1")
+
+    previous = settings.SERVING_STATE
+    settings.MODEL = "m2"
+    assert settings.SERVING_STATE is not previous
+    assert previous.model == "m1"
+    assert current_serving_state(settings) == ServingState(model="m2", scaler="s1", version="v1")
+
+
+def test_current_state_from_legacy_attributes():
+    """Objetos sem SERVING_STATE (ex: Settings simulado) viram um snapshot equivalente."""
+    legacy = MagicMock()
+    legacy.MODEL = "model"
+    legacy.SCALER = "scaler"
+    legacy.MODEL_VERSION = "v"
+
+    assert current_serving_state(legacy) == ServingState(model="model", scaler="scaler", version="v")
+
+
+def test_readers_never_see_mixed_state():
+    """Leituras concorrentes a trocas sucessivas sempre veem modelo e scaler do mesmo snapshot."""
+    settings = Settings()
+    publish_serving_state(settings, ServingState(model=1, scaler=1, version=1))
+    stop = threading.Event()
+    mismatches = []
+
+    def publisher():
+        version = 1
+        while not stop.is_set():
+            version += 1
+            publish_serving_state(settings, ServingState(model=version, scaler=version, version=version))
+
+    with patch("app.routes.predict_route.__SETTINGS__", settings), \
+         patch("app.routes.predict_route.get_model_registry", return_value=None):
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        try:
+            for _ in range(20000):
+                model, scaler, version = resolve_serving_model(None)
+                if not model == scaler == version:
+                    mismatches.append((model, scaler, version))
+        finally:
+            stop.set()
+            thread.join()
+
+    assert mismatches == []
+
+
+def test_hot_reload_keeps_state_when_model_is_missing():
+    """Sem o arquivo do modelo, o scaler novo não deve ser publicado sozinho."""
+    job_id = "test-serving-state-missing-model"
+    JOBS[job_id] = {"job_id": job_id, "status": "pending", "result": None, "error": None}
+    settings = Settings()
+    original = ServingState(model="old-model", scaler="old-scaler", version="old")
+    publish_serving_state(settings, original)
+
+    with patch("app.routes.train_route.run_training_pipeline", return_value={"mae": 0.1, "is_best_model": True}), \
+         patch("app.routes.train_route.load_serving_bundle", return_value=None), \
+         patch("app.routes.train_route.os.path.exists", side_effect=lambda path: "lstm_model.pth" not in path), \
+         patch("joblib.load", return_value="new-scaler"), \
+         patch("app.config.get_settings", return_value=settings):
+        train_model_task(job_id, TrainRequest(symbol="TEST", epochs=1))
+
+    assert JOBS[job_id]["status"] == "completed"
+    assert settings.SERVING_STATE is original
@@ -0,0 +1,117 @@
+"""
+Testes para a coalescência de buscas concorrentes (app/utils/single_flight.py).
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+import pytest
+
+from app.main import app
+from app.utils.single_flight import SingleFlight
+
+
+def make_counting_fn(calls, result="ok", delay=0.05):
+    """Cria uma fábrica de corrotinas que conta execuções."""
+    async def run():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return lambda: run()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_execution():
+    """Chamadas concorrentes com a mesma chave devem executar uma única vez."""
+    calls = []
+    flights = SingleFlight()
+
+    results = await asyncio.gather(*(flights.do("AAPL", make_counting_fn(calls)) for _ in range(10)))
+
+    assert results == ["ok"] * 10
+    assert len(calls) == 1
+    assert flights.stats() == {"executions": 1, "shared": 9, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    """Chaves diferentes não devem ser agrupadas."""
+    calls = []
+    flights = SingleFlight()
+
+    await asyncio.gather(flights.do("AAPL", make_counting_fn(calls)), flights.do("MSFT", make_counting_fn(calls)))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_key_released_after_completion():
+    """Após terminar, uma nova chamada deve executar novamente."""
+    calls = []
+    flights = SingleFlight()
+
+    await flights.do("AAPL", make_counting_fn(calls))
+    await flights.do("AAPL", make_counting_fn(calls))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_shared_with_all_callers():
+    """Uma falha deve ser repassada a todos os chamadores agrupados."""
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("falha na busca")
+
+    results = await asyncio.gather(*(flights.do("X", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Cancelar um chamador não deve interromper a execução compartilhada."""
+    calls = []
+    flights = SingleFlight()
+
+    first = asyncio.ensure_future(flights.do("AAPL", make_counting_fn(calls, delay=0.05)))
+    second = asyncio.ensure_future(flights.do("AAPL", make_counting_fn(calls, delay=0.05)))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "ok"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_predict_route_coalesces_fetches():
+    """Requisições /predict concorrentes para o mesmo símbolo devem gerar um só download."""
+    calls = []
+    lock = threading.Lock()
+
+    def slow_fetch(symbol, start_date, end_date):
+        with lock:
+            calls.append(symbol)
+        time.sleep(0.1)
+        return [100.0] * 60
+
+    transport = httpx.ASGITransport(app=app)
+    with patch("app.routes.predict_route.fetch_recent_prices", side_effect=slow_fetch), \
+         patch("app.routes.predict_route.predict_windows", side_effect=lambda m, s, w: np.full(len(w), 1.0)), \
+         patch("app.routes.predict_route.get_prediction_cache", return_value=None), \
+         patch("app.routes.predict_route.get_inference_batcher", return_value=None), \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = object()
+        mock_settings.SCALER = object()
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            responses = await asyncio.gather(*(ac.post("/predict", json={"symbol": "HOT"}) for _ in range(8)))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert calls == ["HOT"]
@@ -0,0 +1,196 @@
+"""
+Testes para a inferência incremental com estado por símbolo.
+"""
+
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+from app.main import app
+from app.utils.stateful_inference import StatefulPredictor
+from src.lstm_model import LSTMModel
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def model():
+    """LSTMModel pequeno em modo de avaliação."""
+    torch.manual_seed(0)
+    return LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=2).eval()
+
+
+@pytest.fixture
+def scaler():
+    """Scaler ajustado a uma faixa de preços fixa."""
+    return MinMaxScaler().fit(np.array([[50.0], [250.0]]))
+
+
+def prices(start, length=60):
+    """Série de preços sintética começando no dia `start`."""
+    return [100.0 + 10 * np.sin(0.3 * day) for day in range(start, start + length)]
+
+
+def full_forward(model, scaler, window):
+    """Predição de referência com o forward completo da sequência."""
+    x = torch.tensor(scaler.transform(np.array(window).reshape(-1, 1)), dtype=torch.float32).view(1, -1, 1)
+    with torch.no_grad():
+        return float(scaler.inverse_transform(model(x).numpy())[0, 0])
+
+
+def test_forward_with_state_matches_full_forward(model):
+    """Processar em duas partes com o estado deve igualar o forward completo."""
+    x = torch.rand(3, 60, 1)
+    with torch.no_grad():
+        full = model(x)
+        _, state = model.forward_with_state(x[:, :59])
+        incremental, _ = model.forward_with_state(x[:, 59:], state)
+
+    assert torch.allclose(full, incremental, atol=1e-6)
+
+
+def test_first_call_runs_full_window(model, scaler):
+    """A primeira predição de um símbolo deve usar a janela completa."""
+    predictor = StatefulPredictor(resync_steps=5)
+
+    price = predictor.predict("AAPL", prices(0), model, scaler)
+
+    assert price == pytest.approx(full_forward(model, scaler, prices(0)), rel=1e-5)
+    assert predictor.stats()["full_forwards"] == 1
+
+
+def test_new_close_advances_one_step(model, scaler):
+    """Uma janela deslocada em um dia deve avançar o estado em um único passo."""
+    predictor = StatefulPredictor(resync_steps=5)
+    predictor.predict("AAPL", prices(0), model, scaler)
+
+    price = predictor.predict("AAPL", prices(1), model, scaler)
+
+    # O estado incremental equivale ao forward sobre os 61 dias processados
+    assert price == pytest.approx(full_forward(model, scaler, prices(0, 61)), rel=1e-5)
+    assert predictor.stats()["incremental_steps"] == 1
+
+
+def test_same_window_is_reused(model, scaler):
+    """A mesma janela não deve gerar novo forward."""
+    predictor = StatefulPredictor()
+    first = predictor.predict("AAPL", prices(0), model, scaler)
+
+    assert predictor.predict("AAPL", prices(0), model, scaler) == first
+    assert predictor.stats()["reused"] == 1
+
+
+def test_periodic_resync(model, scaler):
+    """Após `resync_steps` passos, o próximo deve ser um forward completo."""
+    predictor = StatefulPredictor(resync_steps=2)
+    for day in range(4):
+        price = predictor.predict("AAPL", prices(day), model, scaler)
+
+    stats = predictor.stats()
+    assert stats["incremental_steps"] == 2
+    assert stats["full_forwards"] == 2
+    assert price == pytest.approx(full_forward(model, scaler, prices(3)), rel=1e-5)
+
+
+def test_gap_or_model_change_forces_resync(model, scaler):
+    """Janelas não contíguas ou troca de modelo devem reiniciar o estado."""
+    predictor = StatefulPredictor(resync_steps=10)
+    predictor.predict("AAPL", prices(0), model, scaler)
+    predictor.predict("AAPL", prices(5), model, scaler)
+
+    new_model = LSTMModel(input_size=1, hidden_layer_size=8, output_size=1, num_layers=2).eval()
+    price = predictor.predict("AAPL", prices(6), new_model, scaler)
+
+    assert predictor.stats()["full_forwards"] == 3
+    assert price == pytest.approx(full_forward(new_model, scaler, prices(6)), rel=1e-5)
+
+
+def test_symbols_do_not_wait_for_each_other(model, scaler):
+    """O forward de um símbolo não bloqueia a predição de outro símbolo."""
+    predictor = StatefulPredictor(resync_steps=10)
+    started = threading.Event()
+    release = threading.Event()
+    forward = StatefulPredictor._forward
+
+    def slow_forward(model_, scaler_, window, state):
+        if window == prices(0):
+            started.set()
+            release.wait(timeout=5)
+        return forward(model_, scaler_, window, state)
+
+    with patch.object(StatefulPredictor, "_forward", side_effect=slow_forward):
+        slow = threading.Thread(target=predictor.predict, args=("AAPL", prices(0), model, scaler))
+        slow.start()
+        assert started.wait(timeout=5)
+        price = predictor.predict("MSFT", prices(3), model, scaler)
+        release.set()
+        slow.join(timeout=5)
+
+    assert price == pytest.approx(full_forward(model, scaler, prices(3)), rel=1e-5)
+    assert predictor.stats()["symbols"] == 2
+
+
+def test_states_are_bounded_lru(model, scaler):
+    """Acima de max_symbols, o estado (e o lock) do símbolo menos usado sai."""
+    predictor = StatefulPredictor(max_symbols=2)
+    predictor.predict("AAPL", prices(0), model, scaler)
+    predictor.predict("MSFT", prices(0), model, scaler)
+    predictor.predict("AAPL", prices(0), model, scaler)
+    predictor.predict("GOOG", prices(0), model, scaler)
+
+    assert set(predictor._slots) == {"AAPL", "GOOG"}
+    assert predictor.stats()["evictions"] == 1
+    predictor.predict("MSFT", prices(0), model, scaler)
+    assert predictor.stats()["full_forwards"] == 4
+
+
+def test_lock_in_use_is_never_replaced(model, scaler):
+    """clear() e o limite de tamanho não podem trocar o lock de um símbolo em uso."""
+    predictor = StatefulPredictor(max_symbols=1)
+    started = threading.Event()
+    release = threading.Event()
+    forward = StatefulPredictor._forward
+
+    def slow_forward(model_, scaler_, window, state):
+        if window == prices(0):
+            started.set()
+            release.wait(timeout=5)
+        return forward(model_, scaler_, window, state)
+
+    with patch.object(StatefulPredictor, "_forward", side_effect=slow_forward):
+        slow = threading.Thread(target=predictor.predict, args=("AAPL", prices(0), model, scaler))
+        slow.start()
+        assert started.wait(timeout=5)
+        held_lock = predictor._slots["AAPL"].lock
+        predictor.clear()
+        predictor.predict("MSFT", prices(3), model, scaler)
+
+        assert predictor._slots["AAPL"].lock is held_lock
+        release.set()
+        slow.join(timeout=5)
+
+    # Com AAPL em uso, a única entrada livre a sair pelo limite era MSFT
+    assert set(predictor._slots) == {"AAPL"}
+
+
+def test_predict_route_uses_stateful_mode(model, scaler):
+    """Com o modo habilitado, /predict deve avançar o estado do símbolo."""
+    windows = iter([prices(0), prices(1)])
+
+    with patch("app.routes.predict_route.fetch_recent_prices", side_effect=lambda *args: next(windows)), \
+         patch("app.routes.predict_route.get_prediction_cache", return_value=None), \
+         patch("app.routes.predict_route.get_stateful_predictor", return_value=StatefulPredictor()) as mock_get, \
+         patch("app.routes.predict_route.__SETTINGS__") as mock_settings:
+        mock_settings.MODEL = model
+        mock_settings.SCALER = scaler
+
+        assert client.post("/predict", json={"symbol": "aapl"}).status_code == 200
+        response = client.post("/predict", json={"symbol": "AAPL"})
+
+    assert response.status_code == 200
+    assert mock_get.return_value.stats()["incremental_steps"] == 1
@@ -302,3 +302,127 @@ def test_train_model_task_missing_model():
         train_model_task(job_id, request)
         
         assert JOBS[job_id]["status"] == "completed"
+
+
+def test_train_model_task_cancelled():
+    """Testa que TrainingCancelledError marca o job como cancelado."""
+    from app.routes.train_route import TrainingCancelledError
+
+    job_id = "test-cancelled-job"
+    JOBS[job_id] = {
+        "job_id": job_id,
+        "status": "pending",
+        "result": None,
+        "error": None
+    }
+
+    request = TrainRequest(symbol="TEST", epochs=1)
+
+    with patch("app.routes.train_route.run_training_pipeline",
+               side_effect=TrainingCancelledError("Treinamento cancelado na época 0")):
+        train_model_task(job_id, request)
+
+        assert JOBS[job_id]["status"] == "cancelled"
+
+
+def test_train_model_task_cancelling_is_not_completed():
+    """Testa que um job cancelado durante o pipeline não é concluído nem recarregado."""
+    import threading
+    from app.routes.train_route import CANCEL_EVENTS
+
+    job_id = "test-cancelling-job"
+    JOBS[job_id] = {
+        "job_id": job_id,
+        "status": "pending",
+        "result": None,
+        "error": None
+    }
+    stop_event = threading.Event()
+    CANCEL_EVENTS[job_id] = stop_event
+
+    def pipeline_then_cancel(**kwargs):
+        # DELETE /train/{job_id} chega quando o pipeline já terminou
+        JOBS[job_id]["status"] = "cancelling"
+        stop_event.set()
+        return {"mae": 0.1, "is_best_model": True}
+
+    request = TrainRequest(symbol="TEST", epochs=1)
+
+    with patch("app.routes.train_route.run_training_pipeline", side_effect=pipeline_then_cancel), \
+         patch("app.routes.train_route.load_serving_bundle") as mock_load_bundle, \
+         patch("app.routes.train_route.publish_serving_state") as mock_publish:
+        train_model_task(job_id, request)
+
+    assert JOBS[job_id]["status"] == "cancelled"
+    assert JOBS[job_id]["result"] is None
+    mock_load_bundle.assert_not_called()
+    mock_publish.assert_not_called()
+
+
+def test_cancel_pending_job():
+    """Testa o cancelamento de um job pendente via DELETE /train/{job_id}."""
+    import threading
+    from app.routes.train_route import CANCEL_EVENTS
+
+    job_id = "test-cancel-pending-job"
+    JOBS[job_id] = {
+        "job_id": job_id,
+        "status": "pending",
+        "result": None,
+        "error": None
+    }
+    CANCEL_EVENTS[job_id] = threading.Event()
+
+    response = client.delete(f"/train/{job_id}")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "cancelled"
+    assert CANCEL_EVENTS[job_id].is_set()
+
+    # A tarefa em background não deve executar o pipeline
+    with patch("app.routes.train_route.run_training_pipeline") as mock_pipeline:
+        train_model_task(job_id, TrainRequest(symbol="TEST", epochs=1))
+        mock_pipeline.assert_not_called()
+    assert JOBS[job_id]["status"] == "cancelled"
+
+
+def test_cancel_running_job_signals_event():
+    """Testa que cancelar um job em execução aciona o sinal de parada."""
+    import threading
+    from app.routes.train_route import CANCEL_EVENTS
+
+    job_id = "test-cancel-running-job"
+    JOBS[job_id] = {
+        "job_id": job_id,
+        "status": "running",
+        "result": None,
+        "error": None
+    }
+    CANCEL_EVENTS[job_id] = threading.Event()
+
+    response = client.delete(f"/train/{job_id}")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "cancelling"
+    assert CANCEL_EVENTS[job_id].is_set()
+    CANCEL_EVENTS.pop(job_id, None)
+
+
+def test_cancel_finished_job_conflict():
+    """Testa que não é possível cancelar um job finalizado."""
+    job_id = "test-cancel-finished-job"
+    JOBS[job_id] = {
+        "job_id": job_id,
+        "status": "completed",
+        "result": {"mae": 0.1},
+        "error": None
+    }
+
+    response = client.delete(f"/train/{job_id}")
+    assert response.status_code == 409
+
+
+def test_cancel_unknown_job():
+    """Testa 404 ao cancelar job inexistente."""
+    response = client.delete("/train/fake-id-cancel")
+    assert response.status_code == 404
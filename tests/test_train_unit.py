@@ -43,8 +43,12 @@ def test_model_trainer_train_step(mock_model, mock_dataloader):
     
     assert len(loss_history) == 1
     assert isinstance(loss_history[0], float)
+    assert len(trainer.epoch_durations) == 1
     trainer.model.train.assert_called()
 
+@patch("src.train.export_model_bundle")
+@patch("src.train.export_numpy_weights")
+@patch("src.train.export_to_onnx")
 @patch("src.train.mlflow")
 @patch("src.train.DataProcessor")
 @patch("src.train.LSTMModel")
@@ -61,7 +65,8 @@ def test_model_trainer_train_step(mock_model, mock_dataloader):
 def test_run_training_pipeline_success(
     mock_torch_save, mock_exists, mock_makedirs, mock_joblib, mock_save, 
     mock_plot_pred, mock_plot_loss, mock_calc_metrics, mock_evaluate_loss,
-    mock_trainer_cls, mock_lstm_cls, mock_processor_cls, mock_mlflow
+    mock_trainer_cls, mock_lstm_cls, mock_processor_cls, mock_mlflow, mock_export_onnx, mock_export_numpy,
+    mock_export_bundle
 ):
     """Testa o pipeline de treinamento com sucesso."""
     
@@ -113,6 +118,8 @@ def test_run_training_pipeline_success(
     assert "rmse" in result
     assert "test_loss" in result
     assert "is_best_model" in result
+    assert "resources" in result
+    assert "stage_durations_s" in result["resources"]
     assert result["symbol"] == "TEST"
     
     # Verify calls
@@ -120,6 +127,11 @@ def test_run_training_pipeline_success(
     mock_mlflow.log_params.assert_called()
     mock_mlflow.log_metrics.assert_called()
     mock_save.assert_called()
+    mock_export_onnx.assert_called_once()
+    mock_export_numpy.assert_called_once()
+    # Bundle global (promoção) e bundle do símbolo
+    assert mock_export_bundle.call_count == 2
+    assert result["is_best_symbol_model"] is True
 
 @patch("src.train.DataProcessor")
 def test_run_training_pipeline_error(mock_processor_cls):
@@ -131,3 +143,114 @@ def test_run_training_pipeline_error(mock_processor_cls):
     
     assert "error" in result
     assert result["error"] == "Erro de dados"
+
+
+def test_model_trainer_stops_on_cancel(mock_dataloader):
+    """Testa que o treino é interrompido quando o sinal de parada está ativo."""
+    import threading
+    from src.train import TrainingCancelledError
+
+    model = LSTMModel(input_size=1, hidden_layer_size=4, output_size=1, num_layers=1)
+    trainer = ModelTrainer(model)
+    stop_event = threading.Event()
+    stop_event.set()
+
+    with pytest.raises(TrainingCancelledError):
+        trainer.train(mock_dataloader, epochs=1, stop_event=stop_event)
+
+
+@patch("src.train.plot_predictions")
+@patch("src.train.plot_losses")
+@patch("src.train.export_model_bundle")
+@patch("src.train.mlflow")
+@patch("src.train.DataProcessor")
+@patch("src.train.ModelTrainer")
+@patch("src.train.evaluate_with_loss")
+@patch("src.train.save_model")
+@patch("src.train.joblib.dump")
+@patch("src.train.torch.save")
+def test_run_training_pipeline_cancelled_after_training(
+    mock_torch_save, mock_joblib, mock_save, mock_evaluate_loss,
+    mock_trainer_cls, mock_processor_cls, mock_mlflow, mock_export_bundle,
+    mock_plot_losses, mock_plot_predictions
+):
+    """Testa que um cancelamento após o treino não avalia, plota, registra nem promove o modelo."""
+    import threading
+    from src.train import TrainingCancelledError
+
+    mock_processor = mock_processor_cls.return_value
+    mock_processor.get_train_test_data.return_value = (
+        torch.randn(10, 5, 1), torch.randn(10, 1),
+        torch.randn(5, 5, 1), torch.randn(5, 1)
+    )
+    stop_event = threading.Event()
+
+    def train_then_cancel(*args, **kwargs):
+        # O cancelamento chega depois da última época
+        stop_event.set()
+        return [0.1]
+
+    mock_trainer = mock_trainer_cls.return_value
+    mock_trainer.train.side_effect = train_then_cancel
+
+    with pytest.raises(TrainingCancelledError):
+        run_training_pipeline(symbol='TEST', epochs=1, batch_size=2, stop_event=stop_event)
+
+    mock_evaluate_loss.assert_not_called()
+    mock_plot_losses.assert_not_called()
+    mock_plot_predictions.assert_not_called()
+    mock_mlflow.log_metric.assert_not_called()
+    mock_mlflow.log_metrics.assert_not_called()
+    mock_mlflow.log_artifact.assert_not_called()
+    mock_save.assert_not_called()
+    mock_joblib.assert_not_called()
+    mock_torch_save.assert_not_called()
+    mock_export_bundle.assert_not_called()
+
+
+@patch("src.train.export_model_bundle", side_effect=OSError("disco cheio"))
+@patch("src.train.export_numpy_weights")
+@patch("src.train.export_to_onnx")
+@patch("src.train.mlflow")
+@patch("src.train.DataProcessor")
+@patch("src.train.LSTMModel")
+@patch("src.train.ModelTrainer")
+@patch("src.train.evaluate_with_loss")
+@patch("src.train.calculate_metrics")
+@patch("src.train.plot_losses")
+@patch("src.train.plot_predictions")
+@patch("src.train.save_model")
+@patch("src.train.joblib.dump")
+@patch("src.train.os.makedirs")
+@patch("src.train.os.path.exists")
+@patch("src.train.torch.save")
+def test_run_training_pipeline_bundle_failure_keeps_previous_model(
+    mock_torch_save, mock_exists, mock_makedirs, mock_joblib, mock_save,
+    mock_plot_pred, mock_plot_loss, mock_calc_metrics, mock_evaluate_loss,
+    mock_trainer_cls, mock_lstm_cls, mock_processor_cls, mock_mlflow, mock_export_onnx, mock_export_numpy,
+    mock_export_bundle
+):
+    """Testa que uma falha no bundle impede a promoção sem sobrescrever os outros artefatos."""
+    import numpy as np
+
+    mock_processor = mock_processor_cls.return_value
+    mock_processor.get_train_test_data.return_value = (
+        torch.randn(10, 5, 1), torch.randn(10, 1),
+        torch.randn(5, 5, 1), torch.randn(5, 1)
+    )
+    mock_trainer = mock_trainer_cls.return_value
+    mock_trainer.train.return_value = [0.1]
+    mock_evaluate_loss.return_value = (np.array([[1.0]]), np.array([[1.1]]), 0.0025)
+    mock_calc_metrics.return_value = {"mae": 2.5, "rmse": 3.2, "mape": 1.8}
+    mock_exists.return_value = False
+
+    with patch("src.train.quantize_model", side_effect=RuntimeError("sem quantização")):
+        result = run_training_pipeline(symbol='TEST', epochs=1, batch_size=2)
+
+    assert result["is_best_model"] is False
+    assert result["is_best_symbol_model"] is False
+    mock_save.assert_not_called()
+    mock_joblib.assert_not_called()
+    mock_torch_save.assert_not_called()
+    mock_export_onnx.assert_not_called()
+    mock_export_numpy.assert_not_called()
@@ -0,0 +1,112 @@
+"""
+Testes para o cache de resultados de treinamento (app/utils/training_cache.py)
+e para a deduplicação de requisições na rota /train.
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes.train_route import JOBS, TRAINING_CACHE
+from app.utils.training_cache import (
+    TrainingResultCache,
+    compute_data_snapshot,
+    compute_request_fingerprint,
+)
+
+client = TestClient(app)
+
+
+class TestFingerprint:
+    """Testes para o cálculo de fingerprint."""
+
+    def test_same_params_same_fingerprint(self):
+        """Parâmetros idênticos devem gerar o mesmo fingerprint."""
+        params = {"symbol": "AAPL", "start_date": "2020-01-01", "end_date": "2021-01-01", "seed": 42}
+        assert compute_request_fingerprint(params) == compute_request_fingerprint(dict(params))
+
+    def test_different_seed_different_fingerprint(self):
+        """Seeds diferentes devem gerar fingerprints diferentes."""
+        base = {"symbol": "AAPL", "start_date": "2020-01-01", "end_date": "2021-01-01"}
+        assert compute_request_fingerprint({**base, "seed": 1}) != compute_request_fingerprint({**base, "seed": 2})
+
+    def test_snapshot_clamped_to_today(self):
+        """Intervalos que alcançam o futuro dependem da data atual."""
+        snapshot = compute_data_snapshot("2020-01-01", "2099-01-01", today=date(2025, 1, 2))
+        assert snapshot == "2020-01-01:2025-01-02"
+
+    def test_open_range_changes_with_day(self):
+        """O fingerprint de um intervalo aberto muda a cada dia."""
+        params = {"symbol": "AAPL", "start_date": "2020-01-01", "end_date": "2099-01-01"}
+        day1 = compute_request_fingerprint(params, today=date(2025, 1, 2))
+        day2 = compute_request_fingerprint(params, today=date(2025, 1, 3))
+        assert day1 != day2
+
+
+class TestTrainingResultCache:
+    """Testes para TrainingResultCache."""
+
+    def test_claim_new_fingerprint(self):
+        """Primeiro claim registra o job e retorna None."""
+        cache = TrainingResultCache()
+        assert cache.claim("fp", "job-1") is None
+
+    def test_claim_inflight_returns_existing(self):
+        """Requisição concorrente é anexada ao job em andamento."""
+        cache = TrainingResultCache()
+        cache.claim("fp", "job-1")
+        assert cache.claim("fp", "job-2") == "job-1"
+
+    def test_complete_keeps_result(self):
+        """Job concluído continua sendo reaproveitado."""
+        cache = TrainingResultCache()
+        cache.claim("fp", "job-1")
+        cache.complete("fp", "job-1")
+        assert cache.claim("fp", "job-2") == "job-1"
+
+    def test_release_allows_retry(self):
+        """Job que falhou libera o fingerprint para nova tentativa."""
+        cache = TrainingResultCache()
+        cache.claim("fp", "job-1")
+        cache.release("fp", "job-1")
+        assert cache.claim("fp", "job-2") is None
+
+    def test_completed_is_bounded_lru(self):
+        """Acima do limite, os jobs concluídos menos usados são esquecidos."""
+        cache = TrainingResultCache(max_completed=2)
+        for i in range(3):
+            cache.claim(f"fp-{i}", f"job-{i}")
+            cache.complete(f"fp-{i}", f"job-{i}")
+
+        assert cache.claim("fp-0", "job-new") is None
+        assert cache.claim("fp-2", "job-x") == "job-2"
+
+    def test_unknown_existing_job_is_replaced(self):
+        """Um job equivalente que não existe mais é descartado e o novo job assume."""
+        cache = TrainingResultCache()
+        cache.claim("fp", "job-1")
+        cache.complete("fp", "job-1")
+
+        assert cache.claim("fp", "job-2", known_jobs={}) is None
+        assert cache.claim("fp", "job-3", known_jobs={"job-2"}) == "job-2"
+
+
+def test_identical_train_requests_reuse_job():
+    """Duas requisições idênticas à rota /train retornam o mesmo job."""
+    TRAINING_CACHE.clear()
+    payload = {"symbol": "CACHE_TEST", "start_date": "2020-01-01", "end_date": "2021-01-01", "epochs": 1}
+
+    with patch("app.routes.train_route.run_training_pipeline") as mock_pipeline:
+        mock_pipeline.return_value = {"mae": 0.1, "is_best_model": False}
+
+        first = client.post("/train", json=payload)
+        second = client.post("/train", json=payload)
+
+        assert first.status_code == 202
+        assert second.status_code == 202
+        assert first.json()["job_id"] == second.json()["job_id"]
+        assert second.json()["status"] == "completed"
+        assert mock_pipeline.call_count == 1
+        assert JOBS[first.json()["job_id"]]["result"] == {"mae": 0.1, "is_best_model": False}
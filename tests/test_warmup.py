@@ -0,0 +1,120 @@
+"""
+Testes para o warmup do modelo e os endpoints /health e /ready.
+"""
+
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+from app.config import Settings, get_settings
+from app.main import app
+from app.utils.inference_backend import InferenceBackend
+from app.utils.serving_state import ServingState, publish_serving_state
+from app.utils.warmup import parse_batch_sizes, synthetic_windows, warm_serving_state, warmup_model
+from src.lstm_model import LSTMModel
+
+client = TestClient(app)
+
+
+def make_state():
+    """Snapshot com um LSTMModel pequeno e um scaler ajustado."""
+    model = LSTMModel(input_size=1, hidden_layer_size=4, output_size=1, num_layers=1).eval()
+    return ServingState(model=model, scaler=MinMaxScaler().fit(np.array([[50.0], [250.0]])), version="v1")
+
+
+def test_parse_batch_sizes():
+    """Tamanhos inválidos e repetidos devem ser descartados."""
+    assert parse_batch_sizes("32, 1,8,1,0") == [1, 8, 32]
+
+
+def test_synthetic_windows_within_scaler_range():
+    """As janelas sintéticas devem ficar dentro da faixa vista no treino."""
+    windows = synthetic_windows(MinMaxScaler().fit(np.array([[50.0], [250.0]])), 3)
+
+    assert len(windows) == 3 and all(len(window) == 60 for window in windows)
+    assert 50.0 <= np.min(windows) and np.max(windows) <= 250.0
+
+
+def test_warmup_runs_each_batch_size():
+    """Cada tamanho de lote deve ser executado `runs` vezes."""
+    predict_fn = MagicMock()
+    report = warmup_model("model", MinMaxScaler().fit(np.array([[0.0], [1.0]])), batch_sizes=[1, 4], runs=3, predict_fn=predict_fn)
+
+    assert predict_fn.call_count == 6
+    assert set(report["batch_sizes"]) == {"1", "4"}
+    assert [len(call.args[2]) for call in predict_fn.call_args_list] == [1, 1, 1, 4, 4, 4]
+
+
+def test_warm_serving_state_attaches_report():
+    """O snapshot aquecido deve carregar o relatório e manter os demais campos."""
+    state = make_state()
+
+    with patch.object(get_settings(), "WARMUP_BATCH_SIZES", "1,2"):
+        warmed = warm_serving_state(state)
+
+    assert warmed.model is state.model and warmed.version == "v1"
+    assert set(warmed.warmup["batch_sizes"]) == {"1", "2"}
+
+
+def test_warmup_failure_does_not_block_publication():
+    """Erros no warmup são registrados sem descartar o snapshot."""
+    class BrokenBackend(InferenceBackend):
+        def predict(self, batch):
+            raise RuntimeError("boom")
+
+    state = ServingState(model=BrokenBackend(), scaler=MinMaxScaler().fit(np.array([[0.0], [1.0]])))
+
+    warmed = warm_serving_state(state)
+
+    assert warmed.ready
+    assert "boom" in warmed.warmup["error"]
+
+
+def test_ready_and_health_endpoints():
+    """/health responde sempre; /ready apenas com modelo publicado."""
+    settings = Settings()
+
+    with patch("app.routes.health_route.__SETTINGS__", settings):
+        assert client.get("/health").status_code == 200
+        not_ready = client.get("/ready")
+
+        publish_serving_state(settings, replace(make_state(), warmup={"total_s": 0.1}))
+        ready = client.get("/ready")
+        health = client.get("/health")
+
+    assert not_ready.status_code == 503
+    assert not_ready.json()["status"] == "not_ready"
+    assert ready.status_code == 200
+    assert ready.json()["model_version"] == "v1"
+    assert ready.json()["warmup"] == {"total_s": 0.1}
+    assert health.json()["model_loaded"] is True
+
+
+def test_hot_reload_warms_before_publishing():
+    """O hot-reload deve aquecer o snapshot novo antes de publicá-lo."""
+    from app.routes.train_route import JOBS, train_model_task
+    from app.schemas import TrainRequest
+    from app.utils.model_loader import LoadedModel
+
+    job_id = "test-warmup-reload"
+    JOBS[job_id] = {"job_id": job_id, "status": "pending", "result": None, "error": None}
+    state = make_state()
+    loaded = LoadedModel(model=state.model, scaler=state.scaler, config={}, version="v2", path="bundle")
+    settings = Settings()
+    published = []
+
+    def fake_publish(target, new_state):
+        published.append(new_state)
+
+    with patch("app.routes.train_route.run_training_pipeline", return_value={"mae": 0.1, "is_best_model": True}), \
+         patch("app.routes.train_route.load_serving_bundle", return_value=loaded), \
+         patch("app.routes.train_route.publish_serving_state", side_effect=fake_publish), \
+         patch("app.config.get_settings", return_value=settings):
+        train_model_task(job_id, TrainRequest(symbol="TEST", epochs=1))
+
+    assert len(published) == 1
+    assert published[0].version == "v2"
+    assert published[0].warmup is not None and "batch_sizes" in published[0].warmup